@@ -1,41 +1,31 @@
 
 import json
 import os
+import sys
 
-def normalize_code(code):
-    if not code: return ""
-    return code.split('-root')[0].strip()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def compare_codes(code_a, code_b):
-    a = normalize_code(code_a)
-    b = normalize_code(code_b)
-    if a == b: return 0
-    
-    parts_a = [int(p) if p.isdigit() else 0 for p in a.split('.')]
-    parts_b = [int(p) if p.isdigit() else 0 for p in b.split('.')]
-    
-    for i in range(max(len(parts_a), len(parts_b))):
-        val_a = parts_a[i] if i < len(parts_a) else 0
-        val_b = parts_b[i] if i < len(parts_b) else 0
-        if val_a < val_b: return -1
-        if val_a > val_b: return 1
-    return 0
+from criterion_ids import normalize_code, pack, pack_link  # noqa: E402
 
 def transform_links(data):
-    # 1. Build a map of all links
-    link_map = {item['criteria']: set(item.get('linked_criteria', [])) for item in data}
+    # 1. Build a map of all links, keyed by packed IDs (tag kept in bit 0)
+    link_map = {pack_link(item['criteria']): set(map(pack_link, item.get('linked_criteria', []))) for item in data}
     
     # 2. Break mutual links by prioritizing Standard (Low ID) following Detail (High ID)
     for entry in data:
         cid = entry['criteria']
+        cid_key = pack(cid)
+        cid_link = pack_link(cid)
         links = list(entry.get('linked_criteria', []))
         new_links = []
         for l in links:
             l_clean = normalize_code(l)
-            if l_clean in link_map and cid in link_map[l_clean]:
+            l_key = pack(l_clean)
+            l_link = pack_link(l_clean)
+            if l_link in link_map and cid_link in link_map[l_link]:
                 # Mutual link detected! A <-> B
                 # Rule: We want Small ID to follow Large ID (Standard follows Detail)
-                if compare_codes(cid, l_clean) < 0:
+                if cid_key < l_key:
                     # Current ID is smaller. We are the Standard. 
                     # We KEEP the link to the larger Detail.
                     print(f"Keeping mutual forward link: {cid} -> {l_clean} (Standard follows Detail)")
@@ -51,11 +41,11 @@ def transform_links(data):
 
     # 3. Apply -root tags to remaining backward links
     for entry in data:
-        cid = entry['criteria']
+        cid_key = pack(entry['criteria'])
         links = entry.get('linked_criteria', [])
         tagged_links = []
         for l in links:
-            if compare_codes(l, cid) < 0:
+            if pack(l) < cid_key:
                 tagged_links.append(f"{l}-root({l})")
             else:
                 tagged_links.append(l)
@@ -74,5 +64,6 @@ def process_file(filepath):
         json.dump(data, f, indent=4)
     print(f"Transformed {filepath}")
 
-process_file('src/assets/ems_links.json')
-process_file('Matrix/reextracted_ems_links.json')
+if __name__ == "__main__":
+    process_file('src/assets/ems_links.json')
+    process_file('Matrix/reextracted_ems_links.json')
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from criterion_ids import is_root, sort_codes  # noqa: E402
+from scoring_service import normalize_criterion_code  # noqa: E402
+
+# Root criterion -> sub-criteria used by the scoring helpers, written as the
+# flat map the app and scoring_service load as is:
+#
+#   {"1.2.6.1": ["1.2.6.2", "1.2.6.3", ...], ...}
+#
+# For the hospital the root/sub pairs come from the curated "Criteria and Sub
+# Criteria for computation" list (SOURCES); they are not in the matrix. Other
+# facilities (or --from-links) take each criterion's forward links from the
+# links graph. Either way every code is normalized and kept only if it is a
+# criterion of the config, so the app does no clean-up at startup. The
+# Dashboard settings view is derived from this map as well.
+
+ASSETS_DIR = os.path.join(ROOT_DIR, "src", "assets")
+SOURCES = {
+    "hospital": os.path.join(ROOT_DIR, "Matrix", "hospital_compute_criteria_source.json"),
+}
+
+
+def output_path(facility):
+    return os.path.join(ASSETS_DIR, f"{facility}_compute_criteria.json")
+
+
+def load_config_ids(facility):
+    with open(os.path.join(ASSETS_DIR, f"{facility}_config.json"), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    ids = set()
+    for se in config.get(f"{facility}_full_configuration", []):
+        for section in se.get('sections', []):
+            for standard in section.get('standards', []):
+                for crit in standard.get('criteria', []):
+                    if crit.get('id'):
+                        ids.add(crit['id'])
+    return ids
+
+
+def pairs_from_source(path):
+    """``(root, [subs])`` from the curated service-element document."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for config in data.values():
+        for se in config.get('service_elements', []):
+            for root in se.get('root_criteria', []):
+                yield root.get('id'), root.get('sub_criteria') or []
+
+
+def pairs_from_links(links):
+    """``(criterion, [forward links])`` from a links file; ``-root`` links point back up."""
+    for item in links:
+        subs = [code for code in item.get('linked_criteria', []) if not is_root(code)]
+        yield item.get('criteria'), sort_codes(subs)
+
+
+def build_compute_map(pairs, valid_ids):
+    """Normalize and filter ``pairs`` into ``{root: [subs]}``.
+
+    Sub-criteria keep their order; duplicates, self references and codes
+    that are not criteria of the config are dropped, as are roots left
+    without sub-criteria. Returns the map and the number of dropped codes.
+    """
+    result = {}
+    dropped = 0
+    for root, subs in pairs:
+        root_code = normalize_criterion_code(root)
+        if root_code not in valid_ids:
+            dropped += 1 + len(subs)
+            continue
+        kept = result.setdefault(root_code, [])
+        for sub in subs:
+            code = normalize_criterion_code(sub)
+            if code in valid_ids and code != root_code and code not in kept:
+                kept.append(code)
+            else:
+                dropped += 1
+    for root_code in [code for code, subs in result.items() if not subs]:
+        del result[root_code]
+    return {code: result[code] for code in sort_codes(result)}, dropped
+
+
+def generate(facility, from_links=False, links=None):
+    """Write ``src/assets/<facility>_compute_criteria.json``; return the map."""
+    valid_ids = load_config_ids(facility)
+    source = SOURCES.get(facility)
+    if source and not from_links:
+        pairs = pairs_from_source(source)
+        origin = os.path.relpath(source, ROOT_DIR)
+    else:
+        if links is None:
+            with open(os.path.join(ASSETS_DIR, f"{facility}_links.json"), 'r', encoding='utf-8') as f:
+                links = json.load(f)
+        pairs = pairs_from_links(links)
+        origin = f"{facility}_links.json"
+
+    compute_map, dropped = build_compute_map(pairs, valid_ids)
+    out_path = output_path(facility)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(compute_map, f, indent=2)
+    subs = sum(len(v) for v in compute_map.values())
+    print(f"[COMPUTE] {facility}: {len(compute_map)} roots, {subs} sub-criteria from {origin} "
+          f"({dropped} codes not in the config dropped) -> {os.path.relpath(out_path, ROOT_DIR)}")
+    return compute_map
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate <facility>_compute_criteria.json root -> sub-criteria maps.")
+    parser.add_argument("--facility", action="append", choices=["clinics", "ems", "hospital", "mortuary"],
+                        help="Facility to generate (repeatable; default: hospital)")
+    parser.add_argument("--from-links", action="store_true",
+                        help="Derive the hospital map from hospital_links.json instead of the curated list")
+    args = parser.parse_args()
+    for fac in args.facility or ["hospital"]:
+        generate(fac, from_links=args.from_links)
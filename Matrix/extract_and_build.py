@@ -1,7 +1,20 @@
 
-import fitz
 import re
 import json
+import os
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+# Criterion IDs start in the leftmost table column; anything left of this
+# fraction of the page width counts as that column.
+CRITERION_COLUMN_MAX_X = 0.15
+# Linked IDs are top-aligned with their row; allow for small baseline jitter.
+ROW_TOLERANCE = 3.0
+PAGES_PER_TASK = 8
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_backends import open_document
 
 def load_valid_ids(config_path):
     with open(config_path, 'r', encoding='utf-8') as f:
@@ -15,12 +28,11 @@ def load_valid_ids(config_path):
     return valid_ids
 
 def parse_pdf_columns(pdf_path, valid_ids):
-    doc = fitz.open(pdf_path)
+    # The line heuristics below were tuned on PyMuPDF's text layout.
     lines = []
-    for page in doc:
-        text = page.get_text("text")
-        lines.extend(text.splitlines())
-    doc.close()
+    with open_document(pdf_path, reference="pymupdf") as doc:
+        for i in range(doc.page_count):
+            lines.extend(doc.page_text(i).splitlines())
 
     id_pattern = r'\d+\.\d+\.\d+\.\d+'
     relationships = set()
@@ -56,6 +68,67 @@ def parse_pdf_columns(pdf_path, valid_ids):
 
     return relationships
 
+def _page_cells(pdf_path, page_numbers):
+    """Criterion anchors and linked IDs per page, from word coordinates.
+
+    Returns ``[(anchors, links), ...]`` in page order, where ``anchors`` is a
+    y-sorted list of ``(y0, criterion_id)`` found in the criterion column and
+    ``links`` a list of ``(y0, criterion_id)`` found anywhere right of it.
+    """
+    import fitz
+
+    id_regex = re.compile(r'\d+\.\d+\.\d+\.\d+')
+    doc = fitz.open(pdf_path)
+    pages = []
+    for number in page_numbers:
+        page = doc[number]
+        max_x = page.rect.width * CRITERION_COLUMN_MAX_X
+        anchors, links = [], []
+        for x0, y0, x1, y1, word, *_ in page.get_text("words"):
+            for cid in id_regex.findall(word):
+                (anchors if x0 < max_x else links).append((y0, cid))
+        anchors.sort()
+        pages.append((anchors, links))
+    doc.close()
+    return pages
+
+
+def parse_pdf_words(pdf_path, valid_ids, workers=None):
+    """Layout-aware variant of :func:`parse_pdf_columns`.
+
+    Each ID is placed by position instead of by line heuristics: IDs in the
+    criterion column open a row, and every other ID belongs to the row whose
+    top edge is nearest above it (or to the last row of the previous page,
+    for rows that break across pages). Pages are read in chunks across a
+    process pool, so long matrices scale with the number of cores.
+    """
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+    chunks = [list(range(i, min(i + PAGES_PER_TASK, page_count))) for i in range(0, page_count, PAGES_PER_TASK)]
+    workers = workers or min(len(chunks), os.cpu_count() or 1)
+
+    if workers <= 1 or len(chunks) <= 1:
+        pages = [p for chunk in chunks for p in _page_cells(pdf_path, chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pages = [p for result in pool.map(_page_cells, [pdf_path] * len(chunks), chunks) for p in result]
+
+    relationships = set()
+    current_target = None
+    for anchors, links in pages:
+        ys = [y for y, _ in anchors]
+        for y, source in links:
+            idx = bisect_right(ys, y + ROW_TOLERANCE) - 1
+            target = anchors[idx][1] if idx >= 0 else current_target
+            if target in valid_ids and source in valid_ids and source != target:
+                relationships.add((target, source))
+        if anchors:
+            current_target = anchors[-1][1]
+    return relationships
+
+
 def build_schema(relationships, valid_ids):
     final_data = {}
     
@@ -95,9 +168,15 @@ def build_schema(relationships, valid_ids):
     return results
 
 if __name__ == "__main__":
+    import sys
+
     valid_ids = load_valid_ids("src/assets/ems_config.json")
     pdf_path = "Matrix/Matrix-NHQS-for-Emergency-Medical-Services-06.01.2026 (2).pdf"
-    rels = parse_pdf_columns(pdf_path, valid_ids)
+    # --layout places IDs by word coordinates (parallel over pages) instead of line heuristics.
+    if "--layout" in sys.argv[1:]:
+        rels = parse_pdf_words(pdf_path, valid_ids)
+    else:
+        rels = parse_pdf_columns(pdf_path, valid_ids)
     
     links_json = build_schema(rels, valid_ids)
     
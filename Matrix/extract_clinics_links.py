@@ -1,6 +1,11 @@
 import re
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from id_automaton import automaton_for  # noqa: E402
 
 def load_valid_ids(config_path):
     with open(config_path, 'r', encoding='utf-8') as f:
@@ -22,17 +27,11 @@ def parse_links(text_path, valid_ids):
     current_item = None
     
     # ID pattern: allow for some OCR errors like double dots or missing dots
+    # (only used to strip IDs from description text now)
     id_pattern = r'\b\d+[\.\s]+\d+[\.\s]+\d+[\.\s]+\d+\b'
     
-    def normalize_id(raw_id):
-        clean = re.sub(r'[\s\.]+', '.', raw_id).strip('.')
-        parts = clean.split('.')
-        if len(parts) == 4:
-            return ".".join(parts)
-        # Handle cases like 1.1.13 -> 1.1.1.3 (heuristic)
-        if len(parts) == 3 and len(parts[2]) == 2:
-            return f"{parts[0]}.{parts[1]}.{parts[2][0]}.{parts[2][1]}"
-        return clean
+    # Valid IDs as written in the text, separators folded
+    automaton = automaton_for(valid_ids)
 
     def is_header(line):
         return ("Criteria" in line and "Description" in line)
@@ -46,11 +45,7 @@ def parse_links(text_path, valid_ids):
             continue
 
         # Look for IDs in the line
-        found_ids = []
-        for match in re.finditer(id_pattern, line):
-            norm = normalize_id(match.group())
-            if norm in valid_ids:
-                found_ids.append((norm, match.start(), match.end()))
+        found_ids = automaton.scan(line)
 
         # A main criterion usually starts with an ID at the very beginning
         if found_ids and found_ids[0][1] < 10: # Increased threshold slightly
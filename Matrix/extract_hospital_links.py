@@ -1,8 +1,15 @@
+import os
 import re
+import sys
 import json
 import zipfile
 import xml.etree.ElementTree as ET
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from criterion_ids import sort_codes  # noqa: E402
+from id_automaton import automaton_for  # noqa: E402
+
 
 def load_valid_ids(config_path):
     with open(config_path, 'r', encoding='utf-8') as f:
@@ -18,52 +25,112 @@ def load_valid_ids(config_path):
     return valid_ids
 
 
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def iter_docx_table_rows(docx_path):
+    """Yield each table row of a DOCX as a list of non-empty cell texts.
+
+    Streams ``word/document.xml`` straight out of the zip with iterparse and
+    clears every row once it has been yielded (and every table once it is
+    finished), so memory stays bounded by roughly one table rather than the
+    whole document tree.
+    """
+    tr_tag, tc_tag, t_tag, tbl_tag = W_NS + 'tr', W_NS + 'tc', W_NS + 't', W_NS + 'tbl'
+    with zipfile.ZipFile(docx_path) as z, z.open('word/document.xml') as xml_stream:
+        for _, elem in ET.iterparse(xml_stream, events=('end',)):
+            if elem.tag == tr_tag:
+                cells = []
+                for tc in elem.findall(tc_tag):
+                    texts = [t.text for t in tc.iter(t_tag) if t.text]
+                    cell_text = ' '.join(texts).strip()
+                    if cell_text:
+                        cells.append(cell_text)
+                elem.clear()
+                if cells:
+                    yield cells
+            elif elem.tag == tbl_tag:
+                elem.clear()
+
+
+def iter_docx_table_cells(docx_path):
+    """Yield each table row of a DOCX as its full list of cell texts.
+
+    Unlike :func:`iter_docx_table_rows`, empty cells are kept so column
+    positions survive: ``[criterion, description, linked..., ...]``.
+    """
+    tr_tag, tc_tag, t_tag, tbl_tag = W_NS + 'tr', W_NS + 'tc', W_NS + 't', W_NS + 'tbl'
+    with zipfile.ZipFile(docx_path) as z, z.open('word/document.xml') as xml_stream:
+        for _, elem in ET.iterparse(xml_stream, events=('end',)):
+            if elem.tag == tr_tag:
+                row = [' '.join(t.text for t in tc.iter(t_tag) if t.text).strip() for tc in elem.findall(tc_tag)]
+                elem.clear()
+                if any(row):
+                    yield row
+            elif elem.tag == tbl_tag:
+                elem.clear()
+
+
+def iter_docx_table_lines(docx_path):
+    """Rows as the space-joined lines written to the matrix text file."""
+    for row in iter_docx_table_rows(docx_path):
+        yield ' '.join(row)
+
+
 def export_docx_tables_to_text(docx_path, text_path):
     """Extract table rows from a DOCX into a simple line-based text file."""
-    with zipfile.ZipFile(docx_path) as z:
-        xml_bytes = z.read('word/document.xml')
-    root = ET.fromstring(xml_bytes)
-    ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-
-    lines = []
-    for tbl in root.findall('.//w:tbl', ns):
-        for tr in tbl.findall('w:tr', ns):
-            cells = []
-            for tc in tr.findall('w:tc', ns):
-                texts = [t.text for t in tc.findall('.//w:t', ns) if t.text]
-                cell_text = ' '.join(texts).strip()
-                if cell_text:
-                    cells.append(cell_text)
-            if cells:
-                lines.append(' '.join(cells))
+    with open(text_path, 'w', encoding='utf-8') as f:
+        for line in iter_docx_table_lines(docx_path):
+            f.write(line + '\n')
+
+
+def tee_rows(rows, text_path):
+    """Like :func:`tee_lines` for cell rows, writing the same flattened lines."""
+    with open(text_path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(' '.join(cell for cell in row if cell) + '\n')
+            yield row
+
 
+def tee_lines(lines, text_path):
+    """Pass ``lines`` through while also writing them to ``text_path``."""
     with open(text_path, 'w', encoding='utf-8') as f:
         for line in lines:
             f.write(line + '\n')
+            yield line
 
 
 def parse_links(text_path, valid_ids):
     with open(text_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+        return parse_link_lines(f, valid_ids)
+
+
+# Allow some OCR/spacing variation, then normalize. Links are found with the
+# valid-ID automaton; the pattern is still used to strip IDs from text.
+id_pattern = r'\b\d+[\.\s]+\d+[\.\s]+\d+[\.\s]+\d+\b'
+id_regex = re.compile(id_pattern)
 
-    results = []
-    current_item = None
 
-    # Allow some OCR/spacing variation, then normalize
-    id_pattern = r'\b\d+[\.\s]+\d+[\.\s]+\d+[\.\s]+\d+\b'
+def normalize_id(raw_id: str) -> str:
+    clean = re.sub(r'[\s\.]+', '.', raw_id).strip('.')
+    parts = clean.split('.')
+    if len(parts) == 4:
+        return '.'.join(parts)
+    if len(parts) == 3 and len(parts[2]) == 2:
+        return f"{parts[0]}.{parts[1]}.{parts[2][0]}.{parts[2][1]}"
+    return clean
 
-    def normalize_id(raw_id: str) -> str:
-        clean = re.sub(r'[\s\.]+', '.', raw_id).strip('.')
-        parts = clean.split('.')
-        if len(parts) == 4:
-            return '.'.join(parts)
-        if len(parts) == 3 and len(parts[2]) == 2:
-            return f"{parts[0]}.{parts[1]}.{parts[2][0]}.{parts[2][1]}"
-        return clean
 
-    def is_header(line: str) -> bool:
-        l = line.lower()
-        return ('criteria' in l and 'description' in l) or 'matrix' in l
+def is_header(line: str) -> bool:
+    l = line.lower()
+    return ('criteria' in l and 'description' in l) or 'matrix' in l
+
+
+def parse_link_lines(lines, valid_ids):
+    """Build the links schema from matrix lines (any iterable of str)."""
+    results = []
+    current_item = None
+    automaton = automaton_for(valid_ids)
 
     for raw_line in lines:
         line = raw_line.replace('\n', ' ').strip()
@@ -74,11 +141,7 @@ def parse_links(text_path, valid_ids):
         if is_header(line):
             continue
 
-        found_ids = []
-        for m in re.finditer(id_pattern, line):
-            norm = normalize_id(m.group())
-            if norm in valid_ids:
-                found_ids.append((norm, m.start(), m.end()))
+        found_ids = automaton.scan(line)
 
         if found_ids and found_ids[0][1] < 10:
             main_id, start, end = found_ids[0]
@@ -117,6 +180,11 @@ def parse_links(text_path, valid_ids):
     if current_item:
         results.append(current_item)
 
+    return finalize_links(results, valid_ids)
+
+
+def finalize_links(results, valid_ids):
+    """Dedupe, tidy descriptions, add unlinked criteria and fill ``root``."""
     seen = set()
     cleaned = []
     for item in results:
@@ -130,7 +198,8 @@ def parse_links(text_path, valid_ids):
 
     criteria_map = {item['criteria']: item for item in cleaned}
 
-    for vid in valid_ids:
+    # In ID order, not set order, so the output is the same on every run.
+    for vid in sort_codes(valid_ids):
         if vid not in criteria_map:
             new_item = {'criteria': vid, 'description': '', 'linked_criteria': [], 'root': []}
             cleaned.append(new_item)
@@ -148,14 +217,93 @@ def parse_links(text_path, valid_ids):
     return cleaned
 
 
+def parse_link_cells(rows, valid_ids):
+    """Build the links schema from cell rows of the matrix tables.
+
+    Column 0 holds the criterion, column 1 its description and every later
+    column linked criteria. Rows with an empty criterion cell continue the
+    previous criterion (long link lists wrap onto extra rows), so IDs are
+    never guessed from their position inside a flattened line.
+    """
+    results = []
+    current_item = None
+    automaton = automaton_for(valid_ids)
+    after_header = False
+    # A row split by a page break can put the description (and some links)
+    # above the repeated header and the ID below it with an empty
+    # description cell; hold such a fragment for the next criterion row.
+    pending = None
+
+    for row in rows:
+        if len(row) < 2:
+            continue
+        if is_header(' '.join(row[:2])):
+            after_header = True
+            continue
+        crit_cell, desc_cell, link_cells = row[0], row[1], row[2:]
+
+        links = [cid for cell in link_cells for cid, _, _ in automaton.scan(cell)]
+
+        main_id = normalize_id(crit_cell) if crit_cell else None
+        if main_id in valid_ids:
+            if current_item:
+                results.append(current_item)
+            current_item = {'criteria': main_id, 'description': desc_cell, 'linked_criteria': [], 'root': []}
+            if pending:
+                pending_desc, pending_links = pending
+                if not desc_cell:
+                    current_item['description'] = pending_desc
+                links = pending_links + links
+                pending = None
+        elif not crit_cell and desc_cell and after_header:
+            pending = (desc_cell, links)
+            after_header = False
+            continue
+        elif current_item is None:
+            continue
+        elif desc_cell:
+            current_item['description'] = f"{current_item['description']} {desc_cell}".strip()
+        after_header = False
+
+        for link_id in links:
+            if link_id != current_item['criteria'] and link_id not in current_item['linked_criteria']:
+                current_item['linked_criteria'].append(link_id)
+
+    if current_item:
+        results.append(current_item)
+
+    return finalize_links(results, valid_ids)
+
+
+def extract_links_from_docx(docx_path, valid_ids, text_path=None, cells=False):
+    """Stream DOCX table rows straight into the link parser.
+
+    When ``text_path`` is given the rows are also written there, so the
+    intermediate matrix text stays available for diffing and review.
+    With ``cells=True`` rows keep their columns and go through
+    :func:`parse_link_cells` instead of the flattened-line heuristics.
+    """
+    if cells:
+        rows = iter_docx_table_cells(docx_path)
+        if text_path:
+            rows = tee_rows(rows, text_path)
+        return parse_link_cells(rows, valid_ids)
+
+    lines = iter_docx_table_lines(docx_path)
+    if text_path:
+        lines = tee_lines(lines, text_path)
+    return parse_link_lines(lines, valid_ids)
+
+
 if __name__ == '__main__':
     config_path = 'src/assets/hospital_config.json'
     docx_path = 'Matrix/Matrix-NHQS_Hospital_Version_2025.docx'
-    text_path = 'Matrix/hospital_matrix_text.txt'
+    # Pass --no-text to skip writing the intermediate Matrix/hospital_matrix_text.txt,
+    # --cells to read links per table column instead of from flattened lines.
+    text_path = None if '--no-text' in sys.argv[1:] else 'Matrix/hospital_matrix_text.txt'
 
     valid_ids = load_valid_ids(config_path)
-    export_docx_tables_to_text(docx_path, text_path)
-    links = parse_links(text_path, valid_ids)
+    links = extract_links_from_docx(docx_path, valid_ids, text_path, cells='--cells' in sys.argv[1:])
 
     out_path = 'src/assets/hospital_links.json'
     with open(out_path, 'w', encoding='utf-8') as f:
@@ -163,3 +311,7 @@ if __name__ == '__main__':
 
     print(f'Extraction complete. Found {len(links)} criteria items for Hospital.')
 
+    # Root -> sub-criteria map for scoring, filtered against the same config.
+    from build_compute_criteria import generate
+    generate('hospital', links=links)
+
@@ -0,0 +1,424 @@
+import argparse
+import contextlib
+import copy
+import glob
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MATRIX_DIR = os.path.join(ROOT_DIR, "Matrix")
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+ASSETS_DIR = os.path.join(ROOT_DIR, "src", "assets")
+HISTORY_PATH = os.path.join(ROOT_DIR, "bench_history.json")
+
+for _path in (ROOT_DIR, MATRIX_DIR, SCRIPTS_DIR):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+from pipeline_stats import _peak_rss_mb, count_criteria, count_lines  # noqa: E402
+
+# facility -> (text directory, config key, matrix text or None)
+FACILITY_SOURCES = {
+    "clinics": ("Botswananhq_clinics", "clinics_full_configuration", "clinics_matrix_text.txt"),
+    "ems": ("Botswananhq_ems", "ems_full_configuration", None),
+    "hospital": ("Botswananhq_hospital", "hospital_full_configuration", "hospital_matrix_text.txt"),
+    "mortuary": ("Botswanahq_motuary", "mortuary_full_configuration", "mortuary_matrix_text.txt"),
+}
+
+DEFAULT_THRESHOLD = 0.10
+
+
+class StageSkipped(Exception):
+    """Raised by a stage setup when its inputs or dependencies are unavailable."""
+
+
+class BenchCase:
+    """One benchmarkable unit: untimed ``prepare()`` then timed ``run(arg)``.
+
+    ``run`` returns the number of criteria (or items) it produced; ``lines``
+    is the amount of input text the stage consumed, used for throughput.
+    """
+
+    def __init__(self, run, lines: int, prepare=None):
+        self.run = run
+        self.lines = lines
+        self.prepare = prepare or (lambda: None)
+
+
+# -----------------------
+# Corpus helpers
+# -----------------------
+
+def _se_sort_key(path: str) -> int:
+    m = re.search(r"se_(\d+)\.txt$", path)
+    return int(m.group(1)) if m else 0
+
+
+def _text_files(corpus: dict, facility: str) -> list[str]:
+    if corpus["kind"] == "synthetic":
+        text_dir = os.path.join(corpus["dir"], "extracted_text")
+    else:
+        text_dir = os.path.join(ROOT_DIR, FACILITY_SOURCES[facility][0], "extracted_text")
+    files = sorted(glob.glob(os.path.join(text_dir, "se_*.txt")), key=_se_sort_key)
+    if not files:
+        raise StageSkipped(f"no text files in {text_dir}")
+    return files
+
+
+def _load_config(facility: str) -> dict:
+    with open(os.path.join(ASSETS_DIR, f"{facility}_config.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _config_ids(config: dict) -> set[str]:
+    return {
+        crit["id"]
+        for key, ses in config.items()
+        if key.endswith("_full_configuration")
+        for se in ses
+        for section in se.get("sections", [])
+        for standard in section.get("standards", [])
+        for crit in standard.get("criteria", [])
+        if crit.get("id")
+    }
+
+
+def _synthetic_config(corpus: dict) -> dict:
+    import parse_hospital_text
+
+    return parse_hospital_text.parse_text(_text_files(corpus, "hospital"))
+
+
+def _links_input(corpus: dict, facility: str) -> tuple[str, set[str]]:
+    """Return ``(matrix_text_path, valid_ids)`` for a link stage."""
+    if corpus["kind"] == "synthetic":
+        return os.path.join(corpus["dir"], "matrix_text.txt"), _config_ids(_synthetic_config(corpus))
+    matrix_name = FACILITY_SOURCES[facility][2]
+    path = os.path.join(MATRIX_DIR, matrix_name)
+    if not os.path.exists(path):
+        raise StageSkipped(f"{path} not found")
+    return path, _config_ids(_load_config(facility))
+
+
+def _links_data(corpus: dict) -> list[dict]:
+    if corpus["kind"] == "synthetic":
+        import extract_hospital_links
+
+        path, valid_ids = _links_input(corpus, "hospital")
+        return extract_hospital_links.parse_links(path, valid_ids)
+    with open(os.path.join(ASSETS_DIR, "hospital_links.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -----------------------
+# Stages
+# -----------------------
+
+def stage_extract_pdf(corpus: dict) -> BenchCase:
+    if corpus["kind"] != "real":
+        raise StageSkipped("PDF extraction only runs on the real corpus")
+    from extract_pdf_v2 import extract_to_file
+    from pdf_backends import available_backends
+
+    if not available_backends():
+        raise StageSkipped("no PDF backend installed (pypdf or pymupdf)")
+
+    pdfs = sorted(glob.glob(os.path.join(ROOT_DIR, "Botswananhq_ems", "*.pdf")))
+    if not pdfs:
+        raise StageSkipped("no EMS PDFs found")
+
+    def run(_):
+        with tempfile.TemporaryDirectory(prefix="bench_pdf_") as out_dir:
+            outputs = [os.path.join(out_dir, f"{i}.txt") for i in range(len(pdfs))]
+            for pdf, out in zip(pdfs, outputs):
+                extract_to_file(pdf, 1, 999, out)
+            case.lines = count_lines(outputs)
+        return len(pdfs)
+
+    case = BenchCase(run, 0)
+    return case
+
+
+def _make_parse_stage(facility: str):
+    def stage(corpus: dict) -> BenchCase:
+        module = __import__(f"parse_{facility}_text")
+        files = _text_files(corpus, facility)
+        return BenchCase(lambda _: count_criteria(module.parse_text(files)), count_lines(files))
+
+    return stage
+
+
+def _make_links_stage(facility: str):
+    def stage(corpus: dict) -> BenchCase:
+        module = __import__(f"extract_{facility}_links")
+        path, valid_ids = _links_input(corpus, facility)
+        return BenchCase(lambda _: len(module.parse_links(path, valid_ids)), count_lines([path]))
+
+    return stage
+
+
+def stage_build_schema(corpus: dict) -> BenchCase:
+    from rebuild_array_schema import build_schema
+
+    links = _links_data(corpus)
+    valid_ids = {item["criteria"] for item in links}
+    relationships = set()
+    for item in links:
+        for link in item.get("linked_criteria", []):
+            source = link.split("-root")[0]
+            if source in valid_ids and source != item["criteria"]:
+                relationships.add((item["criteria"], source))
+    return BenchCase(lambda _: len(build_schema(relationships, valid_ids)), len(relationships))
+
+
+def stage_transform_links(corpus: dict) -> BenchCase:
+    from apply_correct_hierarchy import transform_links
+
+    links = _links_data(corpus)
+    lines = sum(len(item.get("linked_criteria", [])) for item in links)
+    return BenchCase(lambda data: len(transform_links(data)), lines, prepare=lambda: copy.deepcopy(links))
+
+
+def stage_csv_import(corpus: dict) -> BenchCase:
+    if corpus["kind"] != "real":
+        raise StageSkipped("the CSV importer only runs on the real corpus")
+    import generate_ems_config_from_csv
+
+    return BenchCase(
+        lambda _: sum(map(count_criteria, generate_ems_config_from_csv.build_configs_from_csv().values())),
+        count_lines([generate_ems_config_from_csv.CSV_PATH]),
+    )
+
+
+def stage_json_emit(corpus: dict) -> BenchCase:
+    config = _synthetic_config(corpus) if corpus["kind"] == "synthetic" else _load_config("hospital")
+    criteria = count_criteria(config)
+
+    def run(_):
+        text = json.dumps(config, indent=2, ensure_ascii=False)
+        case.lines = text.count("\n") + 1
+        return criteria
+
+    case = BenchCase(run, 0)
+    return case
+
+
+STAGES = {
+    "extract_pdf": stage_extract_pdf,
+    **{f"parse_{fac}": _make_parse_stage(fac) for fac in FACILITY_SOURCES},
+    **{f"links_{fac}": _make_links_stage(fac) for fac in ("clinics", "hospital", "mortuary")},
+    "build_schema": stage_build_schema,
+    "transform_links": stage_transform_links,
+    "csv_import": stage_csv_import,
+    "json_emit": stage_json_emit,
+}
+
+
+# -----------------------
+# Runner
+# -----------------------
+
+def run_stage(stage: str, corpus: dict, repeat: int) -> dict:
+    """Run one stage in the current process and return its measurements.
+
+    Intended to execute inside a fresh child process so ``peak_rss_mb``
+    reflects only this stage and its inputs.
+    """
+
+    sink = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sink):
+            case = STAGES[stage](corpus)
+            baseline_rss = _peak_rss_mb()
+            timings = []
+            produced = 0
+            for _ in range(repeat):
+                arg = case.prepare()
+                start = time.perf_counter()
+                produced = case.run(arg)
+                timings.append(time.perf_counter() - start)
+    except StageSkipped as e:
+        return {"status": "skipped", "reason": str(e)}
+    except Exception as e:
+        return {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+
+    best = min(timings)
+    peak = _peak_rss_mb()
+    return {
+        "status": "ok",
+        "wall_s": round(best, 6),
+        "wall_s_all": [round(t, 6) for t in timings],
+        "peak_rss_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - baseline_rss, 1),
+        "lines": case.lines,
+        "criteria": produced,
+        "lines_per_s": round(case.lines / best, 1) if best > 0 else None,
+        "criteria_per_s": round(produced / best, 1) if best > 0 else None,
+    }
+
+
+def _isolated(stage: str, corpus: dict, repeat: int) -> dict:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_stage, stage, corpus, repeat).result()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str = HISTORY_PATH) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(history: list[dict], path: str = HISTORY_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+
+
+def run_benchmarks(stages, scales, repeat: int, label: str | None) -> dict:
+    """Benchmark ``stages`` on the real corpus and each synthetic ``scale``."""
+
+    from generate_synthetic_corpus import generate_corpus
+
+    corpora = [("real", {"kind": "real"})]
+    tmp_root = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        for scale in scales:
+            out_dir = os.path.join(tmp_root, f"x{scale:g}")
+            generate_corpus(out_dir, scale=scale)
+            corpora.append((f"synthetic_x{scale:g}", {"kind": "synthetic", "dir": out_dir}))
+
+        results = {}
+        for corpus_name, corpus in corpora:
+            for stage in stages:
+                key = f"{stage}[{corpus_name}]"
+                res = _isolated(stage, corpus, repeat)
+                results[key] = res
+                if res["status"] == "ok":
+                    print(
+                        f"[BENCH] {key:<36} {res['wall_s'] * 1000:10.1f} ms  "
+                        f"{res['peak_rss_mb']:8.1f} MB  {res['lines_per_s'] or 0:12.0f} lines/s  "
+                        f"{res['criteria_per_s'] or 0:10.0f} criteria/s"
+                    )
+                else:
+                    print(f"[BENCH] {key:<36} {res['status']}: {res['reason']}")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": label,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _find_run(history: list[dict], ref: str | None, default_index: int) -> dict:
+    if ref is None:
+        return history[default_index]
+    if re.fullmatch(r"-?\d+", ref):
+        return history[int(ref)]
+    for run in reversed(history):
+        if ref in (run.get("label"), run.get("commit")):
+            return run
+    raise SystemExit(f"ERROR: no benchmark run matching '{ref}'")
+
+
+def compare_runs(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Return per-stage wall-time/RSS ratios, flagging those above ``1 + threshold``."""
+
+    rows = []
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if not base or base.get("status") != "ok" or cur.get("status") != "ok":
+            continue
+        row = {"stage": key}
+        for metric in ("wall_s", "peak_rss_mb"):
+            ratio = cur[metric] / base[metric] if base[metric] else None
+            row[metric] = (base[metric], cur[metric], ratio)
+        row["regressed"] = any(
+            ratio is not None and ratio > 1 + threshold
+            for _, _, ratio in (row["wall_s"], row["peak_rss_mb"])
+        )
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the config/links pipeline stages.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run benchmarks and append them to the history file")
+    run_p.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=list(STAGES))
+    run_p.add_argument("--scale", type=float, nargs="*", default=[10.0], help="Synthetic corpus scales")
+    run_p.add_argument("--repeat", type=int, default=3)
+    run_p.add_argument("--label")
+    run_p.add_argument("--history", default=HISTORY_PATH)
+
+    cmp_p = sub.add_parser("compare", help="Compare two runs from the history file")
+    cmp_p.add_argument("--baseline", help="Index, label or commit (default: second-to-last run)")
+    cmp_p.add_argument("--current", help="Index, label or commit (default: last run)")
+    cmp_p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    cmp_p.add_argument("--history", default=HISTORY_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        record = run_benchmarks(args.stages, args.scale, args.repeat, args.label)
+        history = load_history(args.history)
+        history.append(record)
+        save_history(history, args.history)
+        print(f"\nRecorded run #{len(history) - 1} in {args.history}")
+        return 0
+
+    history = load_history(args.history)
+    if len(history) < 2 and not (args.baseline and args.current):
+        print("ERROR: need at least two runs in the history to compare.")
+        return 2
+    baseline = _find_run(history, args.baseline, -2)
+    current = _find_run(history, args.current, -1)
+
+    rows = compare_runs(baseline, current, args.threshold)
+    print(f"Baseline: {baseline.get('label') or baseline['timestamp']}  Current: {current.get('label') or current['timestamp']}")
+    print(f"{'stage':<36} {'wall base':>10} {'wall now':>10} {'ratio':>7} {'rss base':>9} {'rss now':>9} {'ratio':>7}")
+    for row in rows:
+        wb, wc, wr = row["wall_s"]
+        rb, rc, rr = row["peak_rss_mb"]
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['stage']:<36} {wb * 1000:9.1f}ms {wc * 1000:9.1f}ms {wr or 0:7.2f} "
+            f"{rb:8.1f}M {rc:8.1f}M {rr or 0:7.2f}{flag}"
+        )
+    regressions = [row["stage"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond {args.threshold:.0%}.")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
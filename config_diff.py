@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Structural diff of facility configs and links files.
+#
+# Every node of the SE -> section -> standard -> criterion tree gets a hash of
+# its own fields plus its children's keys and hashes (a Merkle tree), so two
+# versions are compared by descending only into children whose hashes
+# differ. Links files are a flat list keyed by "criteria" and hash the same
+# way one level deep. The JSON output (--json) is what delta packages and
+# incremental rebuilds consume.
+#
+# Hashes are SHA-256 (first 32 hex digits) over compact sorted-key JSON, so a
+# browser can recompute them with WebCrypto. A node's hash covers its fields,
+# then each child's key (as JSON) and hash in order; key order inside a dict
+# and file formatting do not matter.
+
+# (kind, key field, children field) per level below the *_full_configuration list.
+CONFIG_LEVELS = (
+    ("se", "se_id", "sections"),
+    ("section", "section_pi_id", "standards"),
+    ("standard", "standard_id", "criteria"),
+    ("criterion", "id", None),
+)
+LINK_LEVELS = (("link", "criteria", None),)
+LEAF_KINDS = frozenset(level[0] for level in CONFIG_LEVELS + LINK_LEVELS if level[2] is None)
+
+
+def _canonical(value) -> bytes:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Node:
+    """One tree node: its scalar ``fields``, ordered ``children`` and hash.
+
+    ``value`` is the raw JSON the node was built from, so added or changed
+    subtrees can be emitted whole.
+    """
+
+    __slots__ = ("kind", "key", "fields", "children", "hash", "value")
+
+    def __init__(self, kind, key, fields, children, value=None):
+        self.kind = kind
+        self.key = key
+        self.fields = fields
+        self.children = children
+        self.value = value
+        h = hashlib.sha256()
+        h.update(_canonical(fields))
+        for child_key, child in children.items():
+            h.update(_canonical(child_key))
+            h.update(child.hash.encode("ascii"))
+        self.hash = h.hexdigest()[:32]
+
+
+def child_key(item: dict, key_field: str, seen: dict) -> str:
+    """Key of a list item; repeated keys get an ``#n`` suffix so none are lost."""
+    key = str(item.get(key_field))
+    n = seen.get(key, 0)
+    seen[key] = n + 1
+    return key if n == 0 else f"{key}#{n}"
+
+
+def _build(items, levels) -> dict:
+    kind, key_field, children_field = levels[0]
+    nodes = {}
+    seen = {}
+    for item in items:
+        key = child_key(item, key_field, seen)
+        if children_field is None:
+            nodes[key] = Node(kind, key, item, {}, value=item)
+        else:
+            fields = {k: v for k, v in item.items() if k != children_field}
+            nodes[key] = Node(kind, key, fields, _build(item.get(children_field) or [], levels[1:]), value=item)
+    return nodes
+
+
+def build_tree(data) -> Node:
+    """Merkle tree of a parsed config (dict) or links file (list)."""
+    if isinstance(data, list):
+        return Node("links", "", {}, _build(data, LINK_LEVELS), value=data)
+    fields = {k: v for k, v in data.items() if not k.endswith("_full_configuration")}
+    children = {
+        k: Node("facility", k, {}, _build(v, CONFIG_LEVELS), value=v)
+        for k, v in data.items()
+        if k.endswith("_full_configuration")
+    }
+    return Node("document", "", fields, children, value=data)
+
+
+def content_hash(data) -> str:
+    """Root hash of ``data``; equal for structurally equal documents."""
+    return build_tree(data).hash
+
+
+def _field_changes(old: dict, new: dict) -> dict:
+    return {k: [old.get(k), new.get(k)] for k in sorted(set(old) | set(new)) if old.get(k) != new.get(k)}
+
+
+def _leaves(node: Node, path: list[str]):
+    """``(path, leaf)`` for every leaf under ``node``."""
+    if node.kind in LEAF_KINDS:
+        yield path, node
+        return
+    for key, child in node.children.items():
+        yield from _leaves(child, path + [key])
+
+
+def diff_trees(old: Node, new: Node) -> dict:
+    """Compare two trees; only subtrees with different hashes are visited.
+
+    Returns ``{"old", "new", "leaves": {"added", "removed", "changed"},
+    "nodes": [...], "visited"}``. Leaves are criteria (configs) or link
+    entries (links files); ``path`` lists the keys from the facility
+    down to the leaf. ``nodes`` records structural changes above the leaves:
+    added (with their ``value``) and removed subtrees, changed fields, and
+    an ``order`` wherever removing the old children and appending the added
+    ones would not give the new child order.
+    """
+    result = {
+        "old": old.hash,
+        "new": new.hash,
+        "leaves": {"added": [], "removed": [], "changed": []},
+        "nodes": [],
+        "visited": 0,
+    }
+    leaves = result["leaves"]
+
+    def walk(a: Node, b: Node, path: list[str]) -> None:
+        result["visited"] += 1
+        if a.hash == b.hash:
+            return
+        if a.kind in LEAF_KINDS:
+            leaves["changed"].append({"path": path, "fields": _field_changes(a.fields, b.fields), "value": b.value})
+            return
+        changes = _field_changes(a.fields, b.fields)
+        if changes:
+            result["nodes"].append({"kind": b.kind, "path": path, "change": "changed", "fields": changes})
+        for key, child in a.children.items():
+            if key not in b.children:
+                result["nodes"].append({"kind": child.kind, "path": path + [key], "change": "removed"})
+                leaves["removed"].extend({"path": p} for p, _ in _leaves(child, path + [key]))
+        for key, child in b.children.items():
+            if key not in a.children:
+                result["nodes"].append({"kind": child.kind, "path": path + [key], "change": "added", "value": child.value})
+                leaves["added"].extend({"path": p, "value": leaf.value} for p, leaf in _leaves(child, path + [key]))
+            else:
+                walk(a.children[key], child, path + [key])
+        expected = [k for k in a.children if k in b.children] + [k for k in b.children if k not in a.children]
+        if expected != list(b.children):
+            result["nodes"].append({"kind": b.kind, "path": path, "change": "reordered", "order": list(b.children)})
+
+    walk(old, new, [])
+    return result
+
+
+def diff_documents(old_data, new_data) -> dict:
+    return diff_trees(build_tree(old_data), build_tree(new_data))
+
+
+def load_json(path: str, rev: str | None = None):
+    """Parse ``path`` from the working tree, or as committed at ``rev``."""
+    if rev is None:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    rel = os.path.relpath(os.path.abspath(path), ROOT_DIR).replace(os.sep, "/")
+    out = subprocess.run(["git", "show", f"{rev}:{rel}"], cwd=ROOT_DIR, capture_output=True, check=True)
+    return json.loads(out.stdout.decode("utf-8"))
+
+
+def format_report(result: dict) -> str:
+    lines = []
+    leaves = result["leaves"]
+    if result["old"] == result["new"]:
+        return "No structural changes."
+    for node in result["nodes"]:
+        where = " / ".join(node["path"])
+        if node["change"] == "changed":
+            fields = ", ".join(node["fields"])
+            lines.append(f"~ {node['kind']} {where}: {fields}")
+        elif node["change"] == "reordered":
+            lines.append(f"~ {node['kind']} {where or '(top)'}: children order changed")
+        else:
+            sign = "+" if node["change"] == "added" else "-"
+            lines.append(f"{sign} {node['kind']} {where}")
+    for item in leaves["changed"]:
+        for field, (a, b) in item["fields"].items():
+            lines.append(f"~ {item['path'][-1]} {field}: {_short(a)} -> {_short(b)}")
+    lines.append(
+        f"{len(leaves['added'])} added, {len(leaves['removed'])} removed, "
+        f"{len(leaves['changed'])} changed ({result['visited']} nodes visited)"
+    )
+    return "\n".join(lines)
+
+
+def _short(value, width: int = 60) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Structural diff of two config/links JSON files (or one file against a git revision)."
+    )
+    parser.add_argument("old", help="Old file, or the only file when comparing against --rev")
+    parser.add_argument("new", nargs="?", help="New file (default: OLD as committed at --rev vs the working tree)")
+    parser.add_argument("--rev", default="HEAD", help="Revision to compare a single file against (default: HEAD)")
+    parser.add_argument("--json", action="store_true", help="Print the machine-readable diff")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.new:
+        old_data, new_data = load_json(args.old), load_json(args.new)
+    else:
+        old_data, new_data = load_json(args.old, args.rev), load_json(args.old)
+    loaded = time.perf_counter()
+    old_tree, new_tree = build_tree(old_data), build_tree(new_data)
+    hashed = time.perf_counter()
+    result = diff_trees(old_tree, new_tree)
+    done = time.perf_counter()
+
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        print(format_report(result))
+        print(f"[DIFF] parse {1000 * (loaded - start):.0f} ms, hash {1000 * (hashed - loaded):.0f} ms, "
+              f"diff {1000 * (done - hashed):.1f} ms")
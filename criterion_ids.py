@@ -0,0 +1,88 @@
+from array import array
+from functools import lru_cache
+
+# Criterion IDs packed into fixed-width integers: "12.3.1.4" becomes one int
+# whose order is the numeric order of the dotted ID, so ordering decisions in
+# the link transforms are single integer comparisons. Links keep the
+# "-root(...)" tag in the lowest bit (pack_link), so a tagged and an untagged
+# link to the same criterion stay distinct in sets. With LEVELS components of
+# BITS bits each, a link code fits an unsigned 64-bit array('Q').
+LEVELS = 5
+BITS = 12
+MAX_PART = (1 << BITS) - 1
+ROOT_TAG = "-root"
+
+
+def normalize_code(code: str) -> str:
+    """The bare dotted ID: ``-root(...)`` tags and ``PREFIX_`` prefixes removed."""
+    if not code:
+        return ""
+    code = code.split(ROOT_TAG)[0]
+    return code.rsplit("_", 1)[-1].strip()
+
+
+def pack_parts(parts) -> int:
+    """Pack integer components; missing trailing components count as 0."""
+    if len(parts) > LEVELS:
+        if any(parts[LEVELS:]):
+            raise ValueError(f"criterion ID {'.'.join(map(str, parts))} has more than {LEVELS} levels")
+        parts = parts[:LEVELS]
+    key = 0
+    for part in parts:
+        if part > MAX_PART:
+            raise ValueError(f"criterion ID component {part} exceeds {MAX_PART}")
+        key = (key << BITS) | part
+    return key << (BITS * (LEVELS - len(parts)))
+
+
+def unpack(key: int, levels: int = 4) -> tuple[int, ...]:
+    """The first ``levels`` components of a key from :func:`pack_parts`."""
+    parts = []
+    for i in range(LEVELS - 1, LEVELS - 1 - levels, -1):
+        parts.append((key >> (i * BITS)) & MAX_PART)
+    return tuple(parts)
+
+
+@lru_cache(maxsize=None)
+def pack(code: str) -> int:
+    """Order key of a criterion ID; non-numeric components count as 0."""
+    return pack_parts([int(p) if p.isdigit() else 0 for p in normalize_code(code).split(".")])
+
+
+def is_root(code: str) -> bool:
+    return ROOT_TAG in code
+
+
+def pack_link(code: str) -> int:
+    """:func:`pack` shifted left one bit, with the ``-root`` tag in bit 0."""
+    return (pack(code) << 1) | is_root(code)
+
+
+def compare_codes(code_a: str, code_b: str) -> int:
+    """-1, 0 or 1 as ``code_a`` sorts before, with or after ``code_b``."""
+    a, b = pack(code_a), pack(code_b)
+    return (a > b) - (a < b)
+
+
+def pack_many(codes) -> array:
+    """Link codes of ``codes`` as an ``array('Q')``."""
+    return array("Q", map(pack_link, codes))
+
+
+def sort_codes(codes, unique: bool = False) -> list[str]:
+    """``codes`` in numeric ID order (untagged before tagged on ties).
+
+    With ``unique``, codes with equal link keys are collapsed to the first
+    one seen.
+    """
+    codes = list(codes)
+    seen = set()
+    pairs = []
+    for code, key in zip(codes, pack_many(codes)):
+        if unique:
+            if key in seen:
+                continue
+            seen.add(key)
+        pairs.append((key, code))
+    pairs.sort(key=lambda pair: pair[0])
+    return [code for _, code in pairs]
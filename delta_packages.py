@@ -0,0 +1,302 @@
+import argparse
+import copy
+import glob
+import json
+import os
+import re
+import subprocess
+
+from config_diff import CONFIG_LEVELS, LINK_LEVELS, build_tree, child_key, diff_trees
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Delta packages for offline clients.
+#
+# Every regenerated src/assets/<facility>_config.json / _links.json gets a
+# patch from the previously published version to the new one, addressed by
+# the config_diff content hashes of both:
+#
+#   public/deltas/<asset>/index.json              current hash + patch chain
+#   public/deltas/<asset>/<from>_<to>.json        one patch
+#   public/deltas/<asset>/<current>.json          the published version itself
+#
+# The next patch is made against that snapshot, so publishing twice without
+# committing the assets in between still chains from what clients last got.
+# A client holding version <from> fetches index.json, follows patches until
+# it reaches "current" and checks the result's content hash; when its hash
+# is not in the chain it downloads the full asset instead. apply_patch() is
+# the reference implementation of the patch semantics:
+#
+#   {"op": "remove",  "path": [...]}                 drop the node
+#   {"op": "replace", "path": [...], "value": {...}} swap a criterion/link entry
+#   {"op": "fields",  "path": [...], "set": {...}, "unset": [...]}
+#   {"op": "add",     "path": [...], "value": ...}   append a new subtree
+#   {"op": "order",   "path": [...], "order": [...]} reorder a node's children
+#
+# Paths are keys from the top of the document (config key, se_id,
+# section_pi_id, standard_id, id; or the criteria code for links), with the
+# "#n" suffix of config_diff.child_key() for repeated keys. Ops are applied in
+# order.
+
+ASSETS_DIR = os.path.join(ROOT_DIR, "src", "assets")
+DELTAS_DIR = os.path.join(ROOT_DIR, "public", "deltas")
+FACILITIES = ["clinics", "ems", "hospital", "mortuary"]
+PATCH_FORMAT = 1
+SNAPSHOT_NAME = re.compile(r"^[0-9a-f]+\.json$")
+
+
+def assets_for(facility: str) -> list[str]:
+    return [f"{facility}_config.json", f"{facility}_links.json"]
+
+
+def _position(items: list, key_field: str, key: str) -> int:
+    seen = {}
+    for idx, item in enumerate(items):
+        if child_key(item, key_field, seen) == key:
+            return idx
+    raise KeyError(key)
+
+
+def _children(doc, path: list[str]):
+    """``(container, key_field)`` holding the children of the node at ``path``.
+
+    The document's own children (the ``*_full_configuration`` lists) are
+    dict entries, reported with ``key_field`` None.
+    """
+    if isinstance(doc, list):
+        items, levels, rest = doc, LINK_LEVELS, path
+    elif not path:
+        return doc, None
+    else:
+        items, levels, rest = doc[path[0]], CONFIG_LEVELS, path[1:]
+    for key in rest:
+        _, key_field, children_field = levels[0]
+        item = items[_position(items, key_field, key)]
+        items, levels = item.setdefault(children_field, []), levels[1:]
+    return items, levels[0][1]
+
+
+def _node(doc, path: list[str]):
+    if not path:
+        return doc
+    container, key_field = _children(doc, path[:-1])
+    if key_field is None:
+        return container[path[-1]]
+    return container[_position(container, key_field, path[-1])]
+
+
+def apply_patch(doc, patch: dict):
+    """Return a copy of ``doc`` with ``patch`` applied; ``doc`` is left as is."""
+    doc = copy.deepcopy(doc)
+    for op in patch["ops"]:
+        kind, path = op["op"], op["path"]
+        if kind == "fields":
+            node = _node(doc, path)
+            node.update(op.get("set", {}))
+            for field in op.get("unset", []):
+                node.pop(field, None)
+            continue
+        if kind == "order":
+            container, key_field = _children(doc, path)
+            if key_field is None:
+                entries = {key: container.pop(key) for key in op["order"]}
+                container.update(entries)
+            else:
+                seen = {}
+                by_key = {child_key(item, key_field, seen): item for item in container}
+                container[:] = [by_key[key] for key in op["order"]]
+            continue
+
+        container, key_field = _children(doc, path[:-1])
+        if key_field is None:
+            if kind == "remove":
+                del container[path[-1]]
+            else:
+                container[path[-1]] = op["value"]
+        elif kind == "add":
+            container.append(op["value"])
+        else:
+            idx = _position(container, key_field, path[-1])
+            if kind == "remove":
+                del container[idx]
+            elif kind == "replace":
+                container[idx] = op["value"]
+            else:
+                raise ValueError(f"unknown patch op {kind!r}")
+    return doc
+
+
+def _tree_node(tree, path: list[str]):
+    for key in path:
+        tree = tree.children[key]
+    return tree
+
+
+def make_patch(old_data, new_data, asset: str = "") -> dict:
+    """Patch turning ``old_data`` into ``new_data``, built from their structural diff."""
+    old_tree, new_tree = build_tree(old_data), build_tree(new_data)
+    diff = diff_trees(old_tree, new_tree)
+
+    removes, updates, adds, orders = [], [], [], []
+    for node in diff["nodes"]:
+        change, path = node["change"], node["path"]
+        if change == "removed":
+            removes.append({"op": "remove", "path": path})
+        elif change == "added":
+            adds.append({"op": "add", "path": path, "value": node["value"]})
+        elif change == "changed":
+            fields = _tree_node(new_tree, path).fields
+            op = {"op": "fields", "path": path}
+            present = {f: fields[f] for f in node["fields"] if f in fields}
+            missing = [f for f in node["fields"] if f not in fields]
+            if present:
+                op["set"] = present
+            if missing:
+                op["unset"] = missing
+            updates.append(op)
+        elif change == "reordered":
+            orders.append({"op": "order", "path": path, "order": node["order"]})
+    for leaf in diff["leaves"]["changed"]:
+        updates.append({"op": "replace", "path": leaf["path"], "value": leaf["value"]})
+
+    # Repeated keys are numbered by position, so later duplicates go first.
+    removes.reverse()
+    return {
+        "format": PATCH_FORMAT,
+        "asset": asset,
+        "from": diff["old"],
+        "to": diff["new"],
+        "ops": removes + updates + adds + orders,
+    }
+
+
+def dumps_patch(patch: dict) -> str:
+    return json.dumps(patch, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stem(asset: str) -> str:
+    return os.path.splitext(asset)[0]
+
+
+def load_index(asset: str) -> dict:
+    path = os.path.join(DELTAS_DIR, _stem(asset), "index.json")
+    if not os.path.exists(path):
+        return {"format": PATCH_FORMAT, "asset": asset, "current": None, "patches": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _git(*args: str) -> bytes:
+    return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, check=True).stdout
+
+
+def snapshot_path(asset: str, content_hash: str) -> str:
+    return os.path.join(DELTAS_DIR, _stem(asset), f"{content_hash}.json")
+
+
+def load_snapshot(asset: str, content_hash: str):
+    """The published version ``content_hash`` of ``asset``, or None if it was not kept."""
+    path = snapshot_path(asset, content_hash)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if build_tree(data).hash != content_hash:
+        raise ValueError(f"{path} does not match its content hash")
+    return data
+
+
+def write_snapshot(asset: str, content_hash: str, data) -> None:
+    """Keep ``data`` as the published snapshot, replacing the previous one."""
+    out_dir = os.path.join(DELTAS_DIR, _stem(asset))
+    keep = f"{content_hash}.json"
+    for path in glob.glob(os.path.join(glob.escape(out_dir), "*.json")):
+        name = os.path.basename(path)
+        if SNAPSHOT_NAME.match(name) and name != keep:
+            os.remove(path)
+    with open(os.path.join(out_dir, keep), "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+
+def _git_version(asset: str, rev: str):
+    try:
+        return json.loads(_git("show", f"{rev}:src/assets/{asset}").decode("utf-8"))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_version(asset: str, index: dict, rev: str | None):
+    """The version to diff against: ``rev`` if given, else the published snapshot."""
+    if rev is not None:
+        return _git_version(asset, rev)
+    current = index.get("current")
+    if not current:
+        return None
+    data = load_snapshot(asset, current)
+    if data is None:
+        # Published before snapshots were kept; HEAD only helps if it is that version.
+        data = _git_version(asset, "HEAD")
+        if data is None or build_tree(data).hash != current:
+            print(f"[DELTA] {asset}: no snapshot of the published version {current}; "
+                  f"clients holding it download the full asset")
+            return None
+    return data
+
+
+def build_delta(asset: str, rev: str | None = None) -> dict | None:
+    """Publish the patch from the previous version of ``asset`` to the current file.
+
+    Returns the patch, or None when there is nothing to publish.
+    """
+    with open(os.path.join(ASSETS_DIR, asset), "r", encoding="utf-8") as f:
+        new_data = json.load(f)
+    index = load_index(asset)
+    new_hash = build_tree(new_data).hash
+    out_dir = os.path.join(DELTAS_DIR, _stem(asset))
+
+    if index.get("current") == new_hash:
+        if not os.path.exists(snapshot_path(asset, new_hash)):
+            write_snapshot(asset, new_hash, new_data)
+        print(f"[DELTA] {asset}: {new_hash} already published")
+        return None
+    old_data = _previous_version(asset, index, rev)
+    patch = None
+    if old_data is not None:
+        patch = make_patch(old_data, new_data, asset)
+        if patch["from"] == patch["to"]:
+            patch = None
+
+    os.makedirs(out_dir, exist_ok=True)
+    if patch is not None:
+        if apply_patch(old_data, patch) != new_data:
+            raise RuntimeError(f"{asset}: patch {patch['from']} -> {patch['to']} does not reproduce the asset")
+        name = f"{patch['from']}_{patch['to']}.json"
+        text = dumps_patch(patch)
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+        full_size = os.path.getsize(os.path.join(ASSETS_DIR, asset))
+        index["patches"][patch["from"]] = {"to": patch["to"], "file": name, "bytes": len(text.encode("utf-8"))}
+        print(f"[DELTA] {asset}: {patch['from']} -> {patch['to']}, {len(patch['ops'])} ops, "
+              f"{len(text.encode('utf-8')) / 1024:.1f} KB (full asset {full_size / 1024:.0f} KB)")
+    elif old_data is None:
+        print(f"[DELTA] {asset}: no previous version, clients download the full asset")
+    else:
+        print(f"[DELTA] {asset}: published {new_hash} (same content as the previous version)")
+    index["asset"] = asset
+    index["current"] = new_hash
+    write_snapshot(asset, new_hash, new_data)
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return patch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish config/links delta patches for offline clients.")
+    parser.add_argument("--facility", action="append", choices=FACILITIES,
+                        help="Facility to publish (repeatable; default: all)")
+    parser.add_argument("--rev", help="Diff against this git revision instead of the published snapshot")
+    args = parser.parse_args()
+    for fac in args.facility or FACILITIES:
+        for asset in assets_for(fac):
+            build_delta(asset, args.rev)
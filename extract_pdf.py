@@ -1,56 +1,202 @@
-import pypdf
 import sys
+import os
 import re
 import io
+import tempfile
 
-# Ensure stdout reflects utf-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from pdf_backends import open_document
+from find_se_starts import clip_span, page_se_span
 
 def analyze_pdf(pdf_path):
     try:
-        reader = pypdf.PdfReader(pdf_path)
-        num_pages = len(reader.pages)
-        print(f"Total Pages: {num_pages}")
-        
-        # Search for SE headers to find page ranges
-        se_ranges = {}
-        for i in range(num_pages):
-            try:
-                page_text = reader.pages[i].extract_text()
-            except:
-                continue
-            # Match "X [A-Z]+ [A-Z ]+"
-            matches = re.finditer(r'(SE|Service Element)\s*(\d+)', page_text, re.IGNORECASE)
-            for match in matches:
-                se_num = match.group(2)
-                if se_num not in se_ranges:
-                    se_ranges[se_num] = i + 1
-                    print(f"Found SE {se_num} at page {i + 1}")
-        
+        with open_document(pdf_path) as doc:
+            num_pages = doc.page_count
+            print(f"Total Pages: {num_pages}")
+
+            # Search for SE headers to find page ranges
+            se_ranges = {}
+            for i in range(num_pages):
+                try:
+                    page_text = doc.page_text(i)
+                except:
+                    continue
+                # Match "X [A-Z]+ [A-Z ]+"
+                matches = re.finditer(r'(SE|Service Element)\s*(\d+)', page_text, re.IGNORECASE)
+                for match in matches:
+                    se_num = match.group(2)
+                    if se_num not in se_ranges:
+                        se_ranges[se_num] = i + 1
+                        print(f"Found SE {se_num} at page {i + 1}")
+
         return se_ranges
     except Exception as e:
         return f"Error: {e}"
 
 def extract_pages(pdf_path, start_page, end_page):
     try:
-        reader = pypdf.PdfReader(pdf_path)
-        text = ""
-        for i in range(start_page - 1, min(end_page, len(reader.pages))):
-            text += f"--- Page {i+1} ---\n"
-            try:
-                text += reader.pages[i].extract_text() + "\n"
-            except:
-                text += "[Extraction Error]\n"
+        with open_document(pdf_path) as doc:
+            text = ""
+            for i in range(start_page - 1, min(end_page, doc.page_count)):
+                text += f"--- Page {i+1} ---\n"
+                try:
+                    text += doc.page_text(i) + "\n"
+                except:
+                    text += "[Extraction Error]\n"
         return text
     except Exception as e:
         return f"Error: {e}"
 
+
+class SeTextWriter:
+    """One ``se_N.txt`` file, numbering pages from the SE's first page like
+    :func:`extract_pdf_v2.extract_to_file` does for a per-SE PDF."""
+
+    def __init__(self, out_dir, se, start_page):
+        self.se = se
+        self.start_page = start_page
+        self.end_page = start_page
+        self.path = os.path.join(out_dir, f"se_{se}.txt")
+        self._f = open(self.path, 'w', encoding='utf-8')
+
+    def write_page(self, page, text):
+        self._f.write(f"--- Page {page - self.start_page + 1} ---\n")
+        self._f.write(text + "\n")
+        self.end_page = page
+
+    def close(self):
+        self._f.close()
+
+
+class PendingPages:
+    """Pages without SE markers, held on disk until the next marked page
+    tells whether they close the current SE or open the next one."""
+
+    def __init__(self):
+        self._f = None
+        self.first_page = None
+
+    def __bool__(self):
+        return self.first_page is not None
+
+    def add(self, page, text):
+        if self._f is None:
+            # newline='' keeps \r in page text as is, so the character
+            # count in each header still matches what is read back.
+            self._f = tempfile.TemporaryFile('w+', encoding='utf-8', newline='')
+        if self.first_page is None:
+            self.first_page = page
+        self._f.write(f"{page}\t{len(text)}\n{text}")
+
+    def flush_to(self, writer):
+        if not self:
+            return
+        self._f.seek(0)
+        while True:
+            header = self._f.readline()
+            if not header:
+                break
+            page, length = header.split('\t')
+            writer.write_page(int(page), self._f.read(int(length)))
+        self._f.seek(0)
+        self._f.truncate()
+        self.first_page = None
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+
+def split_book(pdf_path, out_dir, first_page=20, max_se=None, backend=None):
+    """Write ``se_N.txt`` files for a combined standards book in one pass.
+
+    Each page's SE is read as in :func:`find_se_starts.page_se_span`, so the
+    boundaries agree with :func:`find_se_starts.locate_se_ranges`: unmarked
+    pages between two SEs (covers, completion guides) open the following SE,
+    and a page where the next SE starts part-way down is written to both
+    files. Only the current page is held in memory; unmarked pages wait in a
+    temporary file until the next marked page decides where they go.
+
+    Returns ``{se: [start_page, end_page]}`` in book page numbers.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    ranges = {}
+    current = None
+    pending = PendingPages()
+
+    def open_se(se, start_page):
+        writer = SeTextWriter(out_dir, se, start_page)
+        print(f"[SPLIT] SE {se} starts at page {start_page} -> {writer.path}")
+        return writer
+
+    def close_se(writer):
+        writer.close()
+        ranges[writer.se] = [writer.start_page, writer.end_page]
+
+    try:
+        with open_document(pdf_path, backend) as doc:
+            for index in range(first_page - 1, doc.page_count):
+                page = index + 1
+                try:
+                    text = doc.page_text(index)
+                except Exception as e:
+                    text = f"[Extraction Error on Page {page}: {e}]"
+                span = clip_span(page_se_span(text), max_se)
+
+                if span is None:
+                    pending.add(page, text)
+                    continue
+                lo, hi = span
+
+                if current is None or lo > current.se:
+                    # A new SE: any unmarked pages before it are its front matter.
+                    if current is not None:
+                        close_se(current)
+                    current = open_se(lo, pending.first_page or page)
+                    pending.flush_to(current)
+                else:
+                    # Unmarked pages followed by more of the same SE belong to it.
+                    pending.flush_to(current)
+                current.write_page(page, text)
+
+                # The page also starts later SEs (shared boundary page).
+                for se in range(current.se + 1, hi + 1):
+                    close_se(current)
+                    current = open_se(se, page)
+                    current.write_page(page, text)
+
+            if current is not None:
+                pending.flush_to(current)
+                close_se(current)
+            elif pending:
+                print(f"[SPLIT] No SE markers found after page {first_page - 1} in {pdf_path}")
+    finally:
+        pending.close()
+        if current is not None and current.se not in ranges:
+            current.close()
+
+    return ranges
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python extract_pdf.py <pdf_path> [start_page] [end_page]")
-    elif len(sys.argv) == 2:
-        print(analyze_pdf(sys.argv[1]))
+    import argparse
+
+    # Ensure stdout reflects utf-8
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description="Inspect a standards PDF, dump a page range, or split a combined book.")
+    parser.add_argument("pdf_path")
+    parser.add_argument("start_page", nargs="?", type=int)
+    parser.add_argument("end_page", nargs="?", type=int)
+    parser.add_argument("--split", metavar="OUT_DIR", help="Write one se_N.txt per SE into OUT_DIR in a single pass")
+    parser.add_argument("--first-page", type=int, default=20, help="First page after the TOC/introduction (with --split)")
+    parser.add_argument("--max-se", type=int, help="Highest SE number in the book (with --split)")
+    parser.add_argument("--backend", help="PDF backend (pypdf, pymupdf or auto)")
+    args = parser.parse_args()
+
+    if args.split:
+        ranges = split_book(args.pdf_path, args.split, args.first_page, args.max_se, args.backend)
+        print(f"[SPLIT] Wrote {len(ranges)} SE text file(s) to {args.split}")
+    elif args.start_page is None:
+        print(analyze_pdf(args.pdf_path))
     else:
-        start = int(sys.argv[2])
-        end = int(sys.argv[3])
-        print(extract_pages(sys.argv[1], start, end))
+        print(extract_pages(args.pdf_path, args.start_page, args.end_page or args.start_page))
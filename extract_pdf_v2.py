@@ -1,16 +1,16 @@
-import pypdf
 import sys
 import re
 import io
 
-def extract_to_file(pdf_path, start_page, end_page, output_path):
+from pdf_backends import open_document
+
+def extract_to_file(pdf_path, start_page, end_page, output_path, backend=None):
     try:
-        reader = pypdf.PdfReader(pdf_path)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for i in range(start_page - 1, min(end_page, len(reader.pages))):
+        with open_document(pdf_path, backend) as doc, open(output_path, 'w', encoding='utf-8') as f:
+            for i in range(start_page - 1, min(end_page, doc.page_count)):
                 f.write(f"--- Page {i+1} ---\n")
                 try:
-                    text = reader.pages[i].extract_text()
+                    text = doc.page_text(i)
                     f.write(text + "\n")
                 except Exception as e:
                     f.write(f"[Extraction Error on Page {i+1}: {e}]\n")
@@ -1,17 +1,18 @@
-import pypdf
 import sys
 import re
 
-def find_header(pdf_path, header_pattern):
+from pdf_backends import open_document
+
+def find_header(pdf_path, header_pattern, backend=None):
     try:
-        reader = pypdf.PdfReader(pdf_path)
-        for i in range(len(reader.pages)):
-            page_text = reader.pages[i].extract_text()
-            if re.search(header_pattern, page_text, re.IGNORECASE):
-                print(f"Found '{header_pattern}' at page {i + 1}")
-                # Print a snippet of the page
-                print(f"Snippet: {page_text[:500]}...")
-                return i + 1
+        with open_document(pdf_path, backend) as doc:
+            for i in range(doc.page_count):
+                page_text = doc.page_text(i)
+                if re.search(header_pattern, page_text, re.IGNORECASE):
+                    print(f"Found '{header_pattern}' at page {i + 1}")
+                    # Print a snippet of the page
+                    print(f"Snippet: {page_text[:500]}...")
+                    return i + 1
         return None
     except Exception as e:
         print(f"Error: {e}")
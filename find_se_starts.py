@@ -1,15 +1,30 @@
-import pypdf
-import sys
 import re
+import os
+import json
+
+from pdf_backends import BACKEND_ENV, open_document
+
+# Standard/criterion IDs at the start of a line ("1.2.3", "Criterion  1.2.3.4");
+# their first component is the SE the page belongs to.
+PAGE_ID_PATTERN = re.compile(r'^\s*(?:Criterion\s+)?(\d+)\.\d+\.\d+(?:\.\d+)?\b', re.MULTILINE)
+# Running header naming the SE ("1.Management and Leadership", "SE 2 Human ..."),
+# looked for only near the top of the page so numbered lists in the body don't
+# match; form lines such as "1.NAME OF HOSPITAL/CLINIC:____" are excluded.
+PAGE_HEADER_PATTERN = re.compile(r'^\s*(?:SE\s*)?(\d+)\s*\.?\s*[A-Z][A-Za-z&,.()\- ]+$')
+HEADER_LINES = 8
+# Nearest pages tried on either side when a probe lands on a page without IDs.
+PROBE_RADIUS = 3
+
 
 def find_se_starts(pdf_path):
-    reader = pypdf.PdfReader(pdf_path)
+    """Linear scan for SE heading pages; see :func:`locate_se_ranges` for the fast path."""
+    with open_document(pdf_path) as doc:
+        pages = [doc.page_text(i) for i in range(19, doc.page_count)]
     se_starts = {}
-    
+
     # We expect headers like "1 MANAGEMENT AND LEADERSHIP", "2 HUMAN RESOURCE MANAGEMENT", etc.
     # We'll start searching from page 20 to avoid TOC.
-    for i in range(19, len(reader.pages)):
-        text = reader.pages[i].extract_text()
+    for i, text in enumerate(pages, start=19):
         # Look for "X [A-Z]+ [A-Z ]+" at the beginning of the text or after a newline
         # Example: "\n1 MANAGEMENT AND LEADERSHIP"
         match = re.search(r'^\s*(\d+)\s+([A-Z][A-Z\s]+)', text, re.MULTILINE)
@@ -19,13 +34,182 @@ def find_se_starts(pdf_path):
             if se_num not in se_starts and int(se_num) <= 10:
                 se_starts[se_num] = {"page": i + 1, "name": se_name}
                 print(f"Found SE {se_num}: {se_name} at page {i + 1}")
-    
+
     return se_starts
 
+
+def page_se_span(text):
+    """``(lowest, highest)`` SE seen in the page's header and IDs, or ``None``."""
+    ses = {int(m.group(1)) for m in PAGE_ID_PATTERN.finditer(text)}
+    head = [line for line in text.splitlines() if line.strip()][:HEADER_LINES]
+    for line in head:
+        m = PAGE_HEADER_PATTERN.match(line)
+        if m:
+            ses.add(int(m.group(1)))
+            break
+    if not ses:
+        return None
+    return min(ses), max(ses)
+
+
+def clip_span(span, max_se=None):
+    """Drop IDs beyond the last SE: those are cross-references, not structure."""
+    if span is None or not max_se:
+        return span
+    return (span[0], min(span[1], max_se)) if span[0] <= max_se else None
+
+
+class PageProbe:
+    """Extracts pages on demand and remembers what each one contained."""
+
+    def __init__(self, doc, max_se=None):
+        self.doc = doc
+        self.max_se = max_se
+        self.spans = {}
+
+    def span(self, page):
+        """SE span of the 1-based ``page`` (extracting it at most once)."""
+        if page not in self.spans:
+            self.spans[page] = clip_span(page_se_span(self.doc.page_text(page - 1)), self.max_se)
+        return self.spans[page]
+
+    def nearest(self, lo, hi):
+        """A page strictly between ``lo`` and ``hi`` with IDs, nearest the middle."""
+        mid = (lo + hi) // 2
+        for offset in range(0, PROBE_RADIUS + 1):
+            for page in (mid + offset, mid - offset):
+                if lo < page < hi and self.span(page):
+                    return page
+        return None
+
+
+def locate_se_ranges(pdf_path, first_page=20, max_se=None, backend=None):
+    """Map each SE to its ``[start, end]`` page range by bisection.
+
+    SE numbers only increase through a standards book, so the SE of a page
+    (taken from its running header and the IDs at the start of its lines)
+    is monotone. Instead of
+    extracting every page, the interval between two probed pages is split
+    only while its end pages belong to different SEs; a book with S service
+    elements needs roughly ``S * log2(pages / S)`` page extractions.
+
+    Unmarked pages between two SEs (covers, completion guides) are given to
+    the following SE. When an SE starts part-way down a page, that page is
+    included in the previous SE's range as well as starting the next one.
+    """
+    with open_document(pdf_path, backend) as doc:
+        page_count = doc.page_count
+        probe = PageProbe(doc, max_se)
+
+        # Anchor both ends on pages that carry IDs.
+        lo = next((p for p in range(first_page, page_count + 1) if probe.span(p)), None)
+        hi = next((p for p in range(page_count, first_page - 1, -1) if probe.span(p)), None)
+        if lo is None:
+            return {}, {"pages": page_count, "extracted": len(probe.spans), "backend": doc.name}
+
+        # Unmarked pages before the first marked one belong to the first SE.
+        starts = {probe.span(lo)[0]: first_page}
+        stack = [(lo, hi)]
+        while stack:
+            lo, hi = stack.pop()
+            if probe.span(lo)[1] == probe.span(hi)[1] or hi - lo <= 1:
+                if hi - lo <= 1:
+                    for se in range(probe.span(lo)[1] + 1, probe.span(hi)[1] + 1):
+                        starts.setdefault(se, hi)
+                continue
+            mid = probe.nearest(lo, hi)
+            if mid is None:
+                # Only unmarked pages in between (covers, completion guides):
+                # they are front matter of the SE that follows.
+                for se in range(probe.span(lo)[1] + 1, probe.span(hi)[1] + 1):
+                    starts.setdefault(se, lo + 1)
+                continue
+            stack.append((mid, hi))
+            stack.append((lo, mid))
+
+        ranges = {}
+        ordered = sorted(starts.items())
+        for idx, (se, start) in enumerate(ordered):
+            if idx + 1 < len(ordered):
+                next_start = ordered[idx + 1][1]
+                span = probe.spans.get(next_start)
+                shared = span is not None and span[0] <= se
+                end = next_start if shared else next_start - 1
+            else:
+                end = page_count
+            ranges[se] = [start, max(start, end)]
+
+    stats = {"pages": page_count, "extracted": len(probe.spans), "backend": doc.name}
+    return ranges, stats
+
+
+def default_map_path(pdf_path):
+    return os.path.splitext(pdf_path)[0] + ".se_map.json"
+
+
+def load_se_map(pdf_path, map_path=None, first_page=20, max_se=None, backend=None, refresh=False):
+    """Cached :func:`locate_se_ranges`: reuse the saved map while the PDF is unchanged.
+
+    The map is only reused when it was located with the same ``first_page``
+    and ``max_se``, and with the same backend when one is pinned (argument
+    or ``$PDF_BACKEND``); an automatic choice accepts the saved backend.
+    """
+    map_path = map_path or default_map_path(pdf_path)
+    st = os.stat(pdf_path)
+    signature = [st.st_size, st.st_mtime_ns]
+    pinned = backend or os.environ.get(BACKEND_ENV)
+    if pinned == "auto":
+        pinned = None
+    if not refresh and os.path.exists(map_path):
+        with open(map_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if (
+            saved.get("signature") == signature
+            and saved.get("first_page") == first_page
+            and saved.get("max_se") == max_se
+            and (pinned is None or saved.get("backend") == pinned)
+        ):
+            return {int(se): rng for se, rng in saved["ranges"].items()}
+
+    ranges, stats = locate_se_ranges(pdf_path, first_page=first_page, max_se=max_se, backend=backend)
+    if not ranges:
+        # Image-only PDF or --first-page past the content; don't cache that.
+        print(f"No SEs found: none of pages {first_page}-{stats['pages']} carry criterion IDs "
+              f"({stats['backend']} text); map not saved")
+        return ranges
+    with open(map_path, 'w', encoding='utf-8') as f:
+        json.dump(
+            {
+                "pdf": os.path.basename(pdf_path),
+                "signature": signature,
+                "first_page": first_page,
+                "max_se": max_se,
+                "backend": stats["backend"],
+                "ranges": {str(se): rng for se, rng in sorted(ranges.items())},
+                "stats": stats,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Located {len(ranges)} SEs from {stats['extracted']} of {stats['pages']} pages; map saved to {map_path}")
+    return ranges
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python find_se_starts.py <pdf_path>")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find where each SE starts in a combined standards book.")
+    parser.add_argument("pdf_path")
+    parser.add_argument("--first-page", type=int, default=20, help="First page after the TOC/introduction")
+    parser.add_argument("--max-se", type=int, help="Highest SE number in the book")
+    parser.add_argument("--map", help="Where to save the SE -> page range map (default: next to the PDF)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore a saved map")
+    parser.add_argument("--scan", action="store_true", help="Old behaviour: read every page, match SE headers")
+    args = parser.parse_args()
+
+    if args.scan:
+        results = find_se_starts(args.pdf_path)
     else:
-        results = find_se_starts(sys.argv[1])
-        import json
-        print(json.dumps(results, indent=2))
+        ranges = load_se_map(args.pdf_path, args.map, args.first_page, args.max_se, refresh=args.refresh)
+        results = {str(se): {"start": rng[0], "end": rng[1]} for se, rng in sorted(ranges.items())}
+    print(json.dumps(results, indent=2))
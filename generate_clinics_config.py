@@ -2,6 +2,7 @@ import os
 import re
 import json
 import parse_clinics_text
+from pipeline_stats import StageRecorder, count_criteria
 
 PDF_DIR = "Botswananhq_clinics"
 TEXT_SUBDIR = "extracted_text"
@@ -33,46 +34,69 @@ def build_se_name_map(pdf_files):
             se_name_map[se_id] = se_name
     return se_name_map
 
+def build_config(pdf_files, text_paths, stats=None):
+    """Parse the SE texts, take the SE names from the PDF filenames and write
+    both JSON files. Returns the config; ``stats`` times the stages."""
+    if stats is None:
+        stats = StageRecorder("CLINICS")
+
+    with stats.stage("parse") as st:
+        config = parse_clinics_text.parse_text(text_paths, stage=st)
+        st.criteria = count_criteria(config)
+
+    with stats.stage("name_override"):
+        se_name_map = build_se_name_map(pdf_files)
+        for se in config.get("clinics_full_configuration", []):
+            se_id = se.get("se_id")
+            if se_id in se_name_map:
+                se["se_name"] = se_name_map[se_id]
+
+    # Write output
+    with stats.stage("write") as st:
+        for path in (OUTPUT_JSON_MAIN, OUTPUT_JSON_UTF8):
+            dirname = os.path.dirname(path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+            print(f"[CLINICS JSON] Wrote {path}")
+        st.criteria = count_criteria(config)
+
+    return config
+
 def main():
+    stats = StageRecorder("CLINICS")
+
     if not os.path.isdir(PDF_DIR):
         print(f"ERROR: PDF directory '{PDF_DIR}' not found.")
+        stats.report()
         return
 
-    pdf_files = find_pdf_files(PDF_DIR)
+    with stats.stage("discovery"):
+        pdf_files = find_pdf_files(PDF_DIR)
     if not pdf_files:
         print(f"ERROR: No CLINIC standard PDFs found under '{PDF_DIR}'.")
+        stats.report()
         return
 
-    text_dir = os.path.join(PDF_DIR, TEXT_SUBDIR)
-    text_paths = []
-    for se_id, _ in pdf_files:
-        txt_path = os.path.join(text_dir, f"se_{se_id}.txt")
-        if os.path.exists(txt_path):
-            text_paths.append(txt_path)
+    with stats.stage("collect"):
+        text_dir = os.path.join(PDF_DIR, TEXT_SUBDIR)
+        text_paths = []
+        for se_id, _ in pdf_files:
+            txt_path = os.path.join(text_dir, f"se_{se_id}.txt")
+            if os.path.exists(txt_path):
+                text_paths.append(txt_path)
     
     if not text_paths:
         print(f"ERROR: No extracted text files found in {text_dir}")
+        stats.report()
         return
 
     print(f"Parsing {len(text_paths)} text files into Clinics configuration...")
-    config = parse_clinics_text.parse_text(text_paths)
-
-    se_name_map = build_se_name_map(pdf_files)
-    for se in config.get("clinics_full_configuration", []):
-        se_id = se.get("se_id")
-        if se_id in se_name_map:
-            se["se_name"] = se_name_map[se_id]
-
-    # Write output
-    for path in (OUTPUT_JSON_MAIN, OUTPUT_JSON_UTF8):
-        dirname = os.path.dirname(path)
-        if dirname:
-            os.makedirs(dirname, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-        print(f"[CLINICS JSON] Wrote {path}")
+    build_config(pdf_files, text_paths, stats)
 
     print("\nDone. Clinics configuration has been generated.")
+    stats.report()
 
 if __name__ == "__main__":
     main()
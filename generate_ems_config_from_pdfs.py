@@ -2,8 +2,8 @@ import os
 import re
 import json
 
-from extract_pdf_v2 import extract_to_file
 import parse_ems_text
+from pipeline_stats import StageRecorder, count_criteria, count_lines
 
 
 PDF_DIR = "Botswananhq_ems"
@@ -46,6 +46,9 @@ def extract_all_pdfs_to_text(pdf_files, pdf_dir: str):
 
     Returns list of text file paths in SE order.
     """
+    # Imported here so the helpers above stay usable without pypdf installed.
+    from extract_pdf_v2 import extract_to_file
+
     text_dir = os.path.join(pdf_dir, TEXT_SUBDIR)
     os.makedirs(text_dir, exist_ok=True)
 
@@ -63,20 +66,55 @@ def extract_all_pdfs_to_text(pdf_files, pdf_dir: str):
 def write_config(config: dict):
     """Write config JSON to both main and UTF8 files."""
     for path in (OUTPUT_JSON_MAIN, OUTPUT_JSON_UTF8):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(config, f, indent=2, ensure_ascii=False)
         print(f"[EMS JSON] Wrote {path}")
 
 
+def build_config(pdf_files, text_paths, stats=None):
+    """Parse the SE texts, take the SE names from the PDF filenames and write
+    both JSON files. Returns the config.
+
+    ``stats`` times the parse, name_override and write stages; the watcher
+    (``watch_pipeline.py``) calls this without one.
+    """
+    if stats is None:
+        stats = StageRecorder("EMS")
+
+    with stats.stage("parse") as st:
+        config = parse_ems_text.parse_text(text_paths, stage=st)
+        st.criteria = count_criteria(config)
+
+    with stats.stage("name_override"):
+        se_name_map = build_se_name_map(pdf_files)
+        for se in config.get("ems_full_configuration", []):
+            se_id = se.get("se_id")
+            if se_id in se_name_map:
+                se["se_name"] = se_name_map[se_id]
+
+    with stats.stage("write") as st:
+        write_config(config)
+        st.criteria = count_criteria(config)
+
+    return config
+
+
 def main():
+    stats = StageRecorder("EMS")
+
     if not os.path.isdir(PDF_DIR):
         print(f"ERROR: PDF directory '{PDF_DIR}' not found.")
+        stats.report()
         return
 
-    pdf_files = find_pdf_files(PDF_DIR)
+    with stats.stage("discovery"):
+        pdf_files = find_pdf_files(PDF_DIR)
     if not pdf_files:
         print(f"ERROR: No EMS standard PDFs found under '{PDF_DIR}'.")
+        stats.report()
         return
 
     print("Found EMS PDFs:")
@@ -84,22 +122,15 @@ def main():
         print(f"  SE {se_id}: {os.path.basename(path)}")
 
     # 1) Extract each PDF to a text file
-    text_paths = extract_all_pdfs_to_text(pdf_files, PDF_DIR)
+    with stats.stage("extraction") as st:
+        text_paths = extract_all_pdfs_to_text(pdf_files, PDF_DIR)
+        st.lines = count_lines(p for p in text_paths if os.path.exists(p))
 
-    # 2) Parse text files into EMS configuration structure
+    # 2) Parse the texts, override se_name from the PDF filenames and write the JSON files
     print("\nParsing extracted text into EMS configuration ...")
-    config = parse_ems_text.parse_text(text_paths)
-
-    # 3) Override se_name using the official names from the PDF filenames
-    se_name_map = build_se_name_map(pdf_files)
-    for se in config.get("ems_full_configuration", []):
-        se_id = se.get("se_id")
-        if se_id in se_name_map:
-            se["se_name"] = se_name_map[se_id]
-
-    # 4) Write out JSON files used by the app
-    write_config(config)
+    build_config(pdf_files, text_paths, stats)
     print("\nDone. EMS configuration has been regenerated from PDFs.")
+    stats.report()
 
 
 if __name__ == "__main__":
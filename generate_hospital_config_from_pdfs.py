@@ -3,6 +3,7 @@ import re
 import json
 
 import parse_hospital_text
+from pipeline_stats import StageRecorder, count_criteria
 
 
 PDF_DIR = "Botswananhq_hospital"
@@ -41,14 +42,53 @@ def build_se_name_map(pdf_files):
     return se_name_map
 
 
+def build_config(pdf_files, text_paths, stats=None):
+    """Parse the SE texts, take the SE names from the PDF filenames and write
+    both JSON files. Returns the config.
+
+    ``stats`` times the parse, name_override and write stages; the watcher
+    (``watch_pipeline.py``) calls this without one.
+    """
+    if stats is None:
+        stats = StageRecorder("HOSPITAL")
+
+    with stats.stage("parse") as st:
+        config = parse_hospital_text.parse_text(text_paths, stage=st)
+        st.criteria = count_criteria(config)
+
+    with stats.stage("name_override"):
+        se_name_map = build_se_name_map(pdf_files)
+        for se in config.get("hospital_full_configuration", []):
+            se_id = se.get("se_id")
+            if se_id in se_name_map:
+                se["se_name"] = se_name_map[se_id]
+
+    with stats.stage("write") as st:
+        for path in (OUTPUT_JSON_MAIN, OUTPUT_JSON_UTF8):
+            dirname = os.path.dirname(path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+            print(f"[HOSPITAL JSON] Wrote {path}")
+        st.criteria = count_criteria(config)
+
+    return config
+
+
 def main():
+    stats = StageRecorder("HOSPITAL")
+
     if not os.path.isdir(PDF_DIR):
         print(f"ERROR: PDF directory '{PDF_DIR}' not found.")
+        stats.report()
         return
 
-    pdf_files = find_pdf_files(PDF_DIR)
+    with stats.stage("discovery"):
+        pdf_files = find_pdf_files(PDF_DIR)
     if not pdf_files:
         print(f"ERROR: No Hospital standard PDFs found under '{PDF_DIR}'.")
+        stats.report()
         return
 
     print("Found Hospital PDFs:")
@@ -56,40 +96,27 @@ def main():
         print(f"  SE {se_id}: {os.path.basename(path)}")
 
     # 1) Collect extracted text file paths corresponding to each SE
-    text_dir = os.path.join(PDF_DIR, TEXT_SUBDIR)
-    text_paths = []
-    for se_id, _ in pdf_files:
-        txt_path = os.path.join(text_dir, f"se_{se_id}.txt")
-        if os.path.exists(txt_path):
-            text_paths.append(txt_path)
-        else:
-            print(f"WARNING: Text file {txt_path} not found. Did you run extract_hospital_texts.py?")
+    with stats.stage("collect"):
+        text_dir = os.path.join(PDF_DIR, TEXT_SUBDIR)
+        text_paths = []
+        for se_id, _ in pdf_files:
+            txt_path = os.path.join(text_dir, f"se_{se_id}.txt")
+            if os.path.exists(txt_path):
+                text_paths.append(txt_path)
+            else:
+                print(f"WARNING: Text file {txt_path} not found. Did you run extract_hospital_texts.py?")
 
     if not text_paths:
         print(f"ERROR: No extracted text files found in {text_dir}")
+        stats.report()
         return
 
-    # 2) Parse text files into Hospital configuration structure
+    # 2) Parse the texts, override se_name from the PDF filenames and write the JSON files
     print("\nParsing extracted text into Hospital configuration ...")
-    config = parse_hospital_text.parse_text(text_paths)
-
-    # 3) Override se_name using official names from PDF filenames
-    se_name_map = build_se_name_map(pdf_files)
-    for se in config.get("hospital_full_configuration", []):
-        se_id = se.get("se_id")
-        if se_id in se_name_map:
-            se["se_name"] = se_name_map[se_id]
-
-    # 4) Write out JSON files used by the app
-    for path in (OUTPUT_JSON_MAIN, OUTPUT_JSON_UTF8):
-        dirname = os.path.dirname(path)
-        if dirname:
-            os.makedirs(dirname, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-        print(f"[HOSPITAL JSON] Wrote {path}")
+    build_config(pdf_files, text_paths, stats)
 
     print("\nDone. Hospital configuration has been regenerated from PDFs.")
+    stats.report()
 
 
 if __name__ == "__main__":
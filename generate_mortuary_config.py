@@ -8,10 +8,12 @@ import sys
 sys.path.append(os.getcwd())
 
 import parse_mortuary_text
+from pipeline_stats import StageRecorder, count_criteria
 
 PDF_DIR = "Botswanahq_motuary"
 TEXT_SUBDIR = "extracted_text"
 OUTPUT_JSON_MAIN = os.path.join("src", "assets", "mortuary_config.json")
+OUTPUT_JSON_UTF8 = "mortuary_config_utf8.json"
 
 def find_pdf_files(pdf_dir: str):
     pdfs = []
@@ -38,14 +40,48 @@ def build_se_name_map(pdf_files):
             se_name_map[se_id] = se_name
     return se_name_map
 
+def build_config(pdf_files, text_paths, stats=None):
+    """Parse the SE texts, take the SE names from the PDF filenames and write
+    both JSON files. Returns the config; ``stats`` times the stages."""
+    if stats is None:
+        stats = StageRecorder("MORTUARY")
+
+    with stats.stage("parse") as st:
+        config = parse_mortuary_text.parse_text(text_paths, stage=st)
+        st.criteria = count_criteria(config)
+
+    with stats.stage("name_override"):
+        se_name_map = build_se_name_map(pdf_files)
+        for se in config.get("mortuary_full_configuration", []):
+            se_id = se.get("se_id")
+            if se_id in se_name_map:
+                se["se_name"] = se_name_map[se_id]
+
+    with stats.stage("write") as st:
+        os.makedirs(os.path.dirname(OUTPUT_JSON_MAIN), exist_ok=True)
+        with open(OUTPUT_JSON_MAIN, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+
+        # Also write a UTF-8 specific one for safety if needed (following EMS pattern)
+        with open(OUTPUT_JSON_UTF8, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+        st.criteria = count_criteria(config)
+
+    return config
+
 def main():
+    stats = StageRecorder("MORTUARY")
+
     if not os.path.isdir(PDF_DIR):
         print(f"ERROR: PDF directory '{PDF_DIR}' not found.")
+        stats.report()
         return
 
-    pdf_files = find_pdf_files(PDF_DIR)
+    with stats.stage("discovery"):
+        pdf_files = find_pdf_files(PDF_DIR)
     if not pdf_files:
         print(f"ERROR: No Mortuary standard PDFs found under '{PDF_DIR}'.")
+        stats.report()
         return
 
     print("Found Mortuary PDFs:")
@@ -53,36 +89,22 @@ def main():
         print(f"  SE {se_id}: {os.path.basename(path)}")
 
     # 1) Get text paths (already extracted in previous step)
-    text_dir = os.path.join(PDF_DIR, TEXT_SUBDIR)
-    text_paths = []
-    for se_id, _ in pdf_files:
-        txt_path = os.path.join(text_dir, f"se_{se_id}.txt")
-        if os.path.exists(txt_path):
-            text_paths.append(txt_path)
-        else:
-            print(f"WARNING: Text file {txt_path} not found. Did you run extraction?")
-
-    # 2) Parse text files
+    with stats.stage("collect"):
+        text_dir = os.path.join(PDF_DIR, TEXT_SUBDIR)
+        text_paths = []
+        for se_id, _ in pdf_files:
+            txt_path = os.path.join(text_dir, f"se_{se_id}.txt")
+            if os.path.exists(txt_path):
+                text_paths.append(txt_path)
+            else:
+                print(f"WARNING: Text file {txt_path} not found. Did you run extraction?")
+
+    # 2) Parse the texts, override se_name from the PDF filenames and write the JSON files
     print("\nParsing extracted text into Mortuary configuration ...")
-    config = parse_mortuary_text.parse_text(text_paths)
-
-    # 3) Override se_name using the official names from the PDF filenames
-    se_name_map = build_se_name_map(pdf_files)
-    for se in config.get("mortuary_full_configuration", []):
-        se_id = se.get("se_id")
-        if se_id in se_name_map:
-            se["se_name"] = se_name_map[se_id]
-
-    # 4) Write out JSON file
-    os.makedirs(os.path.dirname(OUTPUT_JSON_MAIN), exist_ok=True)
-    with open(OUTPUT_JSON_MAIN, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
-    
-    # Also write a UTF-8 specific one for safety if needed (following EMS pattern)
-    with open("mortuary_config_utf8.json", "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    build_config(pdf_files, text_paths, stats)
 
     print(f"\nDone. Mortuary configuration has been generated to {OUTPUT_JSON_MAIN}")
+    stats.report()
 
 if __name__ == "__main__":
     main()
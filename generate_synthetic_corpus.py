@@ -0,0 +1,274 @@
+import argparse
+import os
+import random
+
+from pipeline_stats import count_criteria
+
+
+# Defaults approximate the real hospital set: 38 SEs, ~8 sections per SE,
+# ~2 standards per section and ~5 criteria per standard (~3k criteria).
+DEFAULT_SES = 38
+DEFAULT_SECTIONS = 8
+DEFAULT_STANDARDS = 2
+DEFAULT_CRITERIA = 5
+
+LINES_PER_PAGE = 45
+WRAP_WIDTH = 32
+MATRIX_WRAP_IDS = 14
+
+SEVERITY_TEXT = {1: "Mild", 2: "Moderate", 3: "Serious", 4: "Very Serious"}
+CATEGORIES = [
+    ("Basic Management + Pat &", "Staff Safety"),
+    ("Basic Process + Patient Care", None),
+    ("Evaluation + Pat & Staff", "Safety"),
+    ("Structure + Legality", None),
+]
+
+# Survey-form fields printed above the SE title on the first page of every
+# real text; "1.NAME OF HOSPITAL" has the shape of an SE heading.
+FORM_PREAMBLE = [
+    "These forms are designed to be used by both hospital personnel and external surveyors.",
+    " ",
+    "1.NAME OF HOSPITAL/CLINIC/FACILITY:________________________________________________",
+    " ",
+    "2. BASELINE/INTERNAL SURVEY INFORMATION:",
+    "Date of survey: __________________________________________________________________________",
+    " ",
+]
+# Footer lines per page; pypdf repeats the "<total> Page <n> of" cell.
+FOOTER_REPEATS = 3
+
+WORDS = (
+    "the organisation ensures that documented policies procedures staff patients "
+    "managers leaders implement monitor review processes services equipment quality "
+    "risk safety records training facilities resources information systems care "
+    "appropriate available regular effective relevant accordance requirements plans "
+    "responsible approved maintained evaluated communicated community clinical"
+).split()
+
+
+def _sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+def _wrap(text: str, width: int = WRAP_WIDTH) -> list[str]:
+    """Break prose into short lines the way pypdf renders the form columns."""
+    lines: list[str] = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def build_se_lines(se_id: int, se_name: str, sections: int, standards: int, criteria: int, rng: random.Random):
+    """Return ``(body_lines, criterion_ids)`` for one synthetic SE document."""
+
+    body: list[str] = [
+        "BOTSWANA NATIONAL HEALTH QUALITY",
+        "STANDARDS FOR HOSPITALS",
+        f"{se_id}.{se_name}",
+        "GUIDE TO COMPLETION OF FORM",
+    ]
+    crit_ids: list[str] = []
+
+    for sec in range(1, sections + 1):
+        body.append(f"{se_id}.{sec} {_sentence(rng, 2, 4).rstrip('.')}")
+        for std in range(1, standards + 1):
+            std_id = f"{se_id}.{sec}.{std}"
+            body.append(f"{std_id} Standard")
+            body.extend(_wrap(_sentence(rng, 10, 20), 80))
+            intent = _wrap("Standard Intent: " + " ".join(_sentence(rng, 8, 16) for _ in range(rng.randint(2, 5))), 90)
+            body.extend(intent)
+            body.append("  ")
+            body.extend(_wrap(_sentence(rng, 12, 24), 90))
+            body.append("Criterion Comments")
+            body.append("Recommendations")
+            for crit in range(1, criteria + 1):
+                crit_id = f"{std_id}.{crit}"
+                crit_ids.append(crit_id)
+                severity = rng.choices((1, 2, 3, 4), weights=(1, 5, 40, 54))[0]
+                catg, catg_cont = rng.choice(CATEGORIES)
+                body.append(f"Criterion  {crit_id}")
+                body.append("Critical: þ" if rng.random() < 0.1 else "Critical: ¨")
+                body.append(f"Catg: {catg}")
+                if catg_cont:
+                    body.append(catg_cont)
+                body.append("Compliance")
+                body.append(" NA       NC        PC        C")
+                body.append(f"Default Severity for NC or PC = {severity}")
+                body.append(SEVERITY_TEXT[severity])
+                body.extend(_wrap(_sentence(rng, 8, 30)))
+    return body, crit_ids
+
+
+def paginate(body: list[str], se_id: int, se_name: str) -> list[str]:
+    """Wrap body lines in the page markers/headers/footers of the real texts.
+
+    As there, the survey form comes before the SE title on page 1, later
+    pages repeat the title block, and the footer lines start with the page
+    total (`` 30 Page 1 of``).
+    """
+    chunks = [body[i : i + LINES_PER_PAGE] for i in range(0, len(body), LINES_PER_PAGE)] or [[]]
+    total = len(chunks)
+    out: list[str] = []
+    for page_no, chunk in enumerate(chunks, start=1):
+        out.append(f"--- Page {page_no} ---")
+        out.append(" Assessment Instrument Document ")
+        out.append(" Date generated: 24/10/2014")
+        out.append(" ")
+        if page_no == 1:
+            out.extend(FORM_PREAMBLE)
+        else:
+            out.append("")
+            out.append("BOTSWANA NATIONAL HEALTH QUALITY")
+            out.append("STANDARDS FOR HOSPITALS")
+            out.append(f"{se_id}.{se_name}")
+        out.extend(chunk)
+        out.append(f"Page {page_no} of")
+        for _ in range(FOOTER_REPEATS):
+            out.append(f" {total} Page {page_no} of")
+        out.append(f" {total} ")
+    return out
+
+
+def check_corpus(text_paths: list[str], expected: int) -> None:
+    """Parse the written texts and fail unless every criterion comes back."""
+    import parse_hospital_text
+
+    parsed = count_criteria(parse_hospital_text.parse_text(text_paths))
+    if parsed != expected:
+        raise ValueError(f"parse_hospital_text found {parsed} of the {expected} criteria written to {os.path.dirname(text_paths[0])}")
+
+
+def build_matrix_lines(crit_ids: list[str], rng: random.Random, link_ratio: float, max_links: int, noise: float):
+    """Matrix rows in the ``hospital_matrix_text.txt`` layout.
+
+    Each row is ``<id> <description> <linked ids ...>``; long link lists wrap
+    onto continuation lines of bare IDs, and a header row repeats every page.
+    ``noise`` is the probability that a linked ID is rendered with the
+    stray spaces seen in OCR'd matrices (e.g. ``42 . 3 .1. 1``).
+    """
+
+    header = "Criteria Criteria Description Linked Criteria"
+    out = [header]
+    rows = 0
+    for cid in crit_ids:
+        if rng.random() > link_ratio:
+            continue
+        links = rng.sample(crit_ids, min(len(crit_ids), rng.randint(1, max_links)))
+        rendered = []
+        for link in links:
+            if link == cid:
+                continue
+            if rng.random() < noise:
+                a, b, c, d = link.split(".")
+                link = f"{a} . {b} .{c}. {d}"
+            rendered.append(link)
+        if not rendered:
+            continue
+        first, rest = rendered[:MATRIX_WRAP_IDS], rendered[MATRIX_WRAP_IDS:]
+        out.append(f"{cid} {_sentence(rng, 8, 24)} {' '.join(first)}")
+        while rest:
+            out.append(" ".join(rest[:MATRIX_WRAP_IDS]))
+            rest = rest[MATRIX_WRAP_IDS:]
+        rows += 1
+        if rows % 12 == 0:
+            out.append(header)
+    return out
+
+
+def generate_corpus(
+    out_dir: str,
+    scale: float = 1.0,
+    ses: int = DEFAULT_SES,
+    sections: int = DEFAULT_SECTIONS,
+    standards: int = DEFAULT_STANDARDS,
+    criteria: int = DEFAULT_CRITERIA,
+    link_ratio: float = 0.6,
+    max_links: int = 12,
+    noise: float = 0.02,
+    seed: int = 0,
+    check: bool = True,
+) -> dict:
+    """Write ``extracted_text/se_N.txt`` files plus ``matrix_text.txt``.
+
+    ``scale`` multiplies the number of standards per section, so a 10x/100x
+    corpus keeps the SE and section layout of the real books but grows the
+    per-section and per-criterion lists that drive parse and link costs.
+    With ``check`` the texts are parsed back and a ``ValueError`` is raised
+    unless the hospital parser finds every criterion. Returns summary counts.
+    """
+
+    rng = random.Random(seed)
+    standards_per_section = max(1, round(standards * scale))
+    text_dir = os.path.join(out_dir, "extracted_text")
+    os.makedirs(text_dir, exist_ok=True)
+
+    all_ids: list[str] = []
+    text_paths: list[str] = []
+    total_lines = 0
+    for se_id in range(1, ses + 1):
+        se_name = f"Synthetic Service Element {se_id}"
+        body, crit_ids = build_se_lines(se_id, se_name, sections, standards_per_section, criteria, rng)
+        lines = paginate(body, se_id, se_name)
+        text_path = os.path.join(text_dir, f"se_{se_id}.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        text_paths.append(text_path)
+        all_ids.extend(crit_ids)
+        total_lines += len(lines)
+    if check:
+        check_corpus(text_paths, len(all_ids))
+
+    matrix = build_matrix_lines(all_ids, rng, link_ratio, max_links, noise)
+    with open(os.path.join(out_dir, "matrix_text.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(matrix) + "\n")
+
+    return {
+        "ses": ses,
+        "criteria": len(all_ids),
+        "text_lines": total_lines,
+        "matrix_lines": len(matrix),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic standards corpus for benchmarks.")
+    parser.add_argument("out_dir", help="Directory to write extracted_text/ and matrix_text.txt into")
+    parser.add_argument("--scale", type=float, default=1.0, help="Criteria multiplier (e.g. 10, 100)")
+    parser.add_argument("--ses", type=int, default=DEFAULT_SES)
+    parser.add_argument("--sections", type=int, default=DEFAULT_SECTIONS, help="Sections per SE")
+    parser.add_argument("--standards", type=int, default=DEFAULT_STANDARDS, help="Standards per section at scale 1")
+    parser.add_argument("--criteria", type=int, default=DEFAULT_CRITERIA, help="Criteria per standard")
+    parser.add_argument("--noise", type=float, default=0.02, help="Share of OCR-spaced IDs in the matrix")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-check", action="store_true", help="Skip parsing the texts back to count their criteria")
+    args = parser.parse_args()
+
+    stats = generate_corpus(
+        args.out_dir,
+        scale=args.scale,
+        ses=args.ses,
+        sections=args.sections,
+        standards=args.standards,
+        criteria=args.criteria,
+        noise=args.noise,
+        seed=args.seed,
+        check=not args.no_check,
+    )
+    print(
+        f"[SYNTHETIC] Wrote {stats['ses']} SE files ({stats['text_lines']} lines, "
+        f"{stats['criteria']} criteria) and a {stats['matrix_lines']}-line matrix to {args.out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import re
+from functools import lru_cache
+
+# Aho-Corasick automaton over the valid criterion IDs of a facility.
+#
+# Matrix texts write IDs with sloppy separators ("38.1.1. 1", "31.1.1.1.",
+# "3.4 1.1(a)"), so the scanner folds any run of dots and whitespace between
+# two digits into a single separator symbol before feeding the automaton.
+# Only valid IDs are states of the automaton, so every hit is already exact
+# and nothing has to be normalised or looked up afterwards.
+#
+# A separator made of whitespace alone is "loose": it also sits between two
+# IDs, so "1.1.1.1-2 17.1.2.2" contains a loose "2 17.1.2". Hits that need a
+# loose separator only count where they do not overlap a hit without one.
+
+DIGITS = "0123456789"
+SEP = 10
+ALPHABET = 11
+# Characters that may be folded into a separator run.
+SEPARATOR_CHARS = frozenset(". \t\r\n\xa0")
+DOTTED_ID = re.compile(r"^\d+(?:\.\d+)+$")
+# Stretches of digits and separators; everything else resets the automaton,
+# so only these are fed to it symbol by symbol.
+DIGIT_RUN = re.compile(r"\d[\d. \t\r\n\xa0]*")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class IdAutomaton:
+    """Scan text for a fixed set of dotted IDs in one linear pass.
+
+    The goto function is completed into a full transition table, so every
+    input symbol costs one list lookup. A hit must sit on word boundaries
+    (like ``\\b`` in the old regex): the character before it and the one
+    after it are not letters or digits.
+    """
+
+    def __init__(self, ids):
+        self.ids = sorted({cid for cid in ids if cid and DOTTED_ID.match(cid)})
+        delta = [[0] * ALPHABET]
+        depth = [0]
+        output = [None]
+        for index, cid in enumerate(self.ids):
+            node = 0
+            for sym in _symbols(cid):
+                nxt = delta[node][sym]
+                if not nxt:
+                    nxt = len(delta)
+                    delta.append([0] * ALPHABET)
+                    depth.append(depth[node] + 1)
+                    output.append(None)
+                    delta[node][sym] = nxt
+                node = nxt
+            output[node] = index
+
+        # Breadth-first failure links, folded into the transition table.
+        fail = [0] * len(delta)
+        # Nearest state on the failure chain (including the state itself)
+        # that completes an ID.
+        out_link = [n if output[n] is not None else 0 for n in range(len(delta))]
+        queue = []
+        for sym in range(ALPHABET):
+            nxt = delta[0][sym]
+            if nxt:
+                queue.append(nxt)
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            if output[node] is None:
+                out_link[node] = out_link[fail[node]]
+            for sym in range(ALPHABET):
+                nxt = delta[node][sym]
+                if nxt:
+                    fail[nxt] = delta[fail[node]][sym]
+                    queue.append(nxt)
+                else:
+                    delta[node][sym] = delta[fail[node]][sym]
+
+        self.delta = delta
+        self.depth = depth
+        self.output = output
+        self.out_link = out_link
+        self.fail = fail
+        self.max_len = max(depth) if depth else 0
+
+    def scan(self, text: str) -> list[tuple[str, int, int]]:
+        """``(id, start, end)`` for every ID in ``text``, left to right.
+
+        Overlapping candidates are resolved leftmost-longest, as a regex
+        scan would; ``start``/``end`` are offsets into ``text`` covering the
+        ID as written.
+        """
+        delta, output, out_link, depth, fail = self.delta, self.output, self.out_link, self.depth, self.fail
+        ids = self.ids
+        # Text offset where each recent symbol starts, indexed by symbol
+        # number modulo the longest ID.
+        span = self.max_len or 1
+        sym_start = [0] * span
+        # Loose separators seen before each recent symbol.
+        loose_before = [0] * span
+        loose = 0
+        candidates = []
+        n_syms = 0
+        n = len(text)
+        for run in DIGIT_RUN.finditer(text):
+            node = 0
+            i = run.start()
+            stop = run.end()
+            while i < stop:
+                ch = text[i]
+                if ch in SEPARATOR_CHARS:
+                    j = i
+                    has_dot = False
+                    while j < stop and text[j] in SEPARATOR_CHARS:
+                        if text[j] == ".":
+                            has_dot = True
+                        j += 1
+                    # A run of separators only separates between two digits.
+                    if node == 0 or j >= stop:
+                        node = 0
+                        i = j
+                        continue
+                    sym = SEP
+                    loose += not has_dot
+                    start, i = i, j
+                else:
+                    sym = ord(ch) - 48
+                    start = i
+                    i += 1
+
+                sym_start[n_syms % span] = start
+                loose_before[n_syms % span] = loose - (sym == SEP and not has_dot)
+                n_syms += 1
+                node = delta[node][sym]
+
+                if sym == SEP or (i < n and _is_word_char(text[i])):
+                    continue
+                hit = out_link[node]
+                while hit:
+                    first = (n_syms - depth[hit]) % span
+                    begin = sym_start[first]
+                    if begin == 0 or not _is_word_char(text[begin - 1]):
+                        candidates.append((loose > loose_before[first], begin, i, ids[output[hit]]))
+                    hit = out_link[fail[hit]]
+
+        # Leftmost-longest among strict hits, then loose hits in the gaps.
+        taken = []
+        for is_loose, begin, end, cid in sorted(candidates, key=lambda c: (c[0], c[1], -c[2])):
+            if all(end <= b or begin >= e for _, b, e in taken):
+                taken.append((cid, begin, end))
+        taken.sort(key=lambda hit: hit[1])
+        return taken
+
+
+def _symbols(cid: str) -> list[int]:
+    return [SEP if ch == "." else ord(ch) - 48 for ch in cid]
+
+
+@lru_cache(maxsize=8)
+def _cached(ids: frozenset) -> IdAutomaton:
+    return IdAutomaton(ids)
+
+
+def automaton_for(valid_ids) -> IdAutomaton:
+    """Automaton for ``valid_ids``, reused while the same set is passed in."""
+    return _cached(frozenset(valid_ids))
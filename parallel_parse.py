@@ -0,0 +1,137 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from patch_config import FACILITIES, CriterionAttributes, apply_attributes
+
+# Shared driver for the parse_<facility>_text parsers, with a parallel mode.
+#
+# Each parser's parse_files(file_paths, ses, se_ids_seen, attributes) parses
+# files in order into that state; parse_config() runs it and turns the state
+# into the facility config. Every se_N.txt yields its own SE block, so in
+# parallel mode the files are parsed in a process pool, one file per task,
+# and the fragments are concatenated in file order. A file that names an SE
+# an earlier file already opened is parsed again in this process against
+# the merged state, so the result is always the same as a sequential parse.
+#
+# The pool size comes from ``jobs`` or the PARSE_JOBS environment variable
+# (default 1, i.e. sequential), so the generators need no new options.
+
+JOBS_ENV = "PARSE_JOBS"
+
+# Lines the parsers' SE pattern matches that are not SE headings: the
+# "1.NAME OF HOSPITAL/CLINIC/FACILITY:___" field of the survey form at the
+# top of every text, "21 Page 1 of" page footers, and prose that starts with
+# a number ("24 hours a day, ..."). SE names start with a capital letter.
+NOT_SE_HEADING = re.compile(r"^\s*\d+\s*(?:\.\s*NAME OF HOSPITAL\b|Page\s+\d+\s+of\b)", re.IGNORECASE)
+SE_NAME_START = re.compile(r"^\s*(?:SE\s+)?\d+(?:\.|\s+)\s*[A-Z]")
+
+
+def is_se_heading(line: str) -> bool:
+    return SE_NAME_START.match(line) is not None and NOT_SE_HEADING.match(line) is None
+
+
+def default_jobs() -> int:
+    value = os.environ.get(JOBS_ENV, "").strip().lower()
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        return max(1, int(value)) if value else 1
+    except ValueError:
+        return 1
+
+
+def jobs_for(file_paths, jobs: int | None = None) -> int:
+    """Worker count for ``file_paths``: ``jobs`` or the environment, at most one per file."""
+    if jobs is None:
+        jobs = default_jobs()
+    return max(1, min(jobs, len(file_paths)))
+
+
+def _parse_file(parse_files, path: str):
+    return parse_files([path], [], set(), CriterionAttributes())
+
+
+def parse_parallel(parse_files, file_paths, jobs: int | None = None):
+    """Run ``parse_files`` over each file in a pool and concatenate the results in order.
+
+    Returns the same ``(ses, se_ids_seen, attributes)`` a single sequential
+    call would.
+    """
+    file_paths = list(file_paths)
+    with ProcessPoolExecutor(max_workers=jobs_for(file_paths, jobs)) as pool:
+        fragments = list(pool.map(_parse_file, [parse_files] * len(file_paths), file_paths))
+
+    ses: list[dict] = []
+    se_ids_seen: set[int] = set()
+    attributes = CriterionAttributes()
+    reparsed = 0
+    for path, (fragment, fragment_ids, fragment_attributes) in zip(file_paths, fragments):
+        if fragment_ids & se_ids_seen:
+            parse_files([path], ses, se_ids_seen, attributes)
+            reparsed += 1
+            continue
+        ses.extend(fragment)
+        se_ids_seen |= fragment_ids
+        attributes.merge(fragment_attributes.values)
+        attributes.lines += fragment_attributes.lines
+    if reparsed:
+        print(f"[PARSE] {reparsed} of {len(file_paths)} files continue an earlier SE; re-parsed in order")
+    return ses, se_ids_seen, attributes
+
+
+def parse_config(facility: str, parse_files, file_paths, jobs: int | None = None, stage=None) -> dict:
+    """``{"<facility>_full_configuration": [...]}`` from the text files, SEs sorted
+    and severities/critical flags applied.
+
+    ``jobs`` > 1 parses the files in a process pool (default: ``PARSE_JOBS``).
+    ``stage`` (a ``pipeline_stats.StageStats``) gets the number of lines parsed.
+    """
+    if jobs_for(file_paths, jobs) > 1:
+        ses, _, attributes = parse_parallel(parse_files, file_paths, jobs)
+    else:
+        ses, _, attributes = parse_files(file_paths, [], set(), CriterionAttributes())
+    if stage is not None:
+        stage.lines = attributes.lines
+    key = f"{facility}_full_configuration"
+    config = {key: sorted(ses, key=lambda x: x["se_id"])}
+    apply_attributes(config, key, attributes.values, FACILITIES[facility].get("default_text", False))
+    return config
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    import importlib
+    import json
+    import time
+
+    from patch_config import ROOT_DIR, TEXT_SUBDIR
+
+    parser = argparse.ArgumentParser(description="Check that parallel parsing matches a sequential parse.")
+    parser.add_argument("--facility", action="append", choices=sorted(FACILITIES), help="Facility to check (repeatable; default: all)")
+    parser.add_argument("--text-dir", help="Parse these se_N.txt files with the hospital parser instead (e.g. a synthetic corpus)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.text_dir:
+        runs = [("hospital", args.text_dir)]
+    else:
+        runs = [(fac, os.path.join(ROOT_DIR, FACILITIES[fac]["text_dir"], TEXT_SUBDIR)) for fac in args.facility or sorted(FACILITIES)]
+    failed = False
+    for fac, text_dir in runs:
+        module = importlib.import_module(f"parse_{fac}_text")
+        files = sorted(glob.glob(os.path.join(text_dir, "se_*.txt")), key=lambda p: int(re.search(r"se_(\d+)", p).group(1)))
+        if not files:
+            print(f"[PARSE] {fac}: no se_N.txt files in {text_dir}")
+            continue
+        start = time.perf_counter()
+        sequential = json.dumps(module.parse_text(files, jobs=1), ensure_ascii=False)
+        middle = time.perf_counter()
+        parallel = json.dumps(module.parse_text(files, jobs=args.jobs), ensure_ascii=False)
+        end = time.perf_counter()
+        same = sequential == parallel
+        failed |= not same
+        print(f"[PARSE] {fac}: {len(files)} files, sequential {middle - start:.2f}s, "
+              f"{args.jobs} jobs {end - middle:.2f}s, {'identical' if same else 'DIFFERENT'}")
+    raise SystemExit(1 if failed else 0)
@@ -2,9 +2,10 @@ import json
 import re
 import sys
 
-def parse_text(file_paths):
-    config = {"ems_full_configuration": []}
-    se_ids_seen = set()
+import parallel_parse
+
+def parse_files(file_paths, ses, se_ids_seen, attributes):
+    config = {"ems_full_configuration": ses}
     
     # Regex patterns - more permissive
     # Support "1 MANAGEMENT", "SE 2 HUMAN", "10.Patient Care", "10. Patient Care"
@@ -89,6 +90,7 @@ def parse_text(file_paths):
     for file_path in file_paths:
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
+        attributes.feed_lines(lines)
 
         current_se = None
         current_section = None
@@ -111,7 +113,7 @@ def parse_text(file_paths):
 
             # 1. Service Element
             se_match = se_pattern.match(line)
-            if se_match:
+            if se_match and parallel_parse.is_se_heading(line):
                 se_id = int(se_match.group(1))
                 se_name = se_match.group(2).strip()
                 if 1 <= se_id <= 10 and len(se_name) > 5:
@@ -219,9 +221,11 @@ def parse_text(file_paths):
                         current_standard["intent_tooltip"] = combined
                     skip_to = max(skip_to, new_i - 1)
 
-    # Final de-duplication and cleanup
-    config["ems_full_configuration"].sort(key=lambda x: x["se_id"])
-    return config
+    return config["ems_full_configuration"], se_ids_seen, attributes
+
+
+def parse_text(file_paths, jobs=None, stage=None):
+    return parallel_parse.parse_config("ems", parse_files, file_paths, jobs, stage)
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
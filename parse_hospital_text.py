@@ -2,15 +2,19 @@ import json
 import re
 import sys
 
+import parallel_parse
+from source_text import SourceText
 
-def parse_text(file_paths):
-    """Parse extracted Hospital standards text files into structured configuration.
 
-    Output schema mirrors EMS but under key ``hospital_full_configuration``.
+def parse_files(file_paths, ses, se_ids_seen, attributes):
+    """Parse ``file_paths`` in order into ``ses``, ``se_ids_seen`` and ``attributes``.
+
+    Returns them: the SE blocks in the order they were first seen, the SE
+    IDs they cover and the severities/critical flags read so far.
+    ``parallel_parse.parse_config`` drives this and builds the config.
     """
 
-    config = {"hospital_full_configuration": []}
-    se_ids_seen: set[int] = set()
+    config = {"hospital_full_configuration": ses}
 
     # ------------------------------------------------------------------
     # Regex patterns (mirroring EMS parser but adapted for Hospital docs)
@@ -101,7 +105,7 @@ def parse_text(file_paths):
 
         return pure_statement, intent_text
 
-    def collect_following_lines(start_index: int, lines: list[str]) -> tuple[str, int]:
+    def collect_following_lines(start_index: int, lines: SourceText) -> tuple[list[tuple[int, int]], int]:
         """Collect continuation lines until a structural boundary.
 
         For intents we want to preserve paragraphing and bullet layout as
@@ -116,15 +120,15 @@ def parse_text(file_paths):
         We still skip page markers / standalone numbers and stop when we hit a
         new SE/section/standard/criterion/intent.
 
-        Returns ``(joined_text, next_index)`` where ``next_index`` is the first
+        Returns ``(spans, next_index)``: the stripped lines as ``(start, end)``
+        offsets into ``lines.text`` (joined with ``lines.join``) and the first
         line *after* the collected block.
         """
 
-        parts: list[str] = []
+        parts: list[tuple[int, int]] = []
         j = start_index
         while j < len(lines):
-            raw = lines[j]
-            text = raw.strip()
+            text, span = lines.stripped(j)
 
             # Page markers / bare numbers are never part of the prose.
             if text.startswith("--- Page") or re.match(r"^\d+$", text):
@@ -137,12 +141,12 @@ def parse_text(file_paths):
 
             # Preserve paragraphing: blank lines become empty entries so the
             # final join with "\n" yields visible paragraph breaks.
-            parts.append(text)
+            parts.append(span)
             j += 1
 
-        return "\n".join(parts), j
+        return parts, j
 
-    def extract_severity(start_index: int, lines: list[str]) -> int | None:
+    def extract_severity(start_index: int, lines: SourceText) -> int | None:
         """Look ahead from a criterion line for an explicit default severity.
 
         Hospital PDFs encode this as e.g. ``"Default Severity for NC or PC = 4"``
@@ -152,8 +156,8 @@ def parse_text(file_paths):
         """
 
         max_lookahead = 15
-        for j in range(start_index, min(len(lines), start_index + max_lookahead)):
-            text = lines[j].strip()
+        for raw in lines.iter_lines(start_index, start_index + max_lookahead):
+            text = raw.strip()
             if not text:
                 continue
             m = severity_pattern.search(text)
@@ -169,8 +173,8 @@ def parse_text(file_paths):
     # -----------------------
 
     for file_path in file_paths:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        lines = SourceText(file_path)
+        attributes.feed_lines(lines)
 
         current_se: dict | None = None
         current_section: dict | None = None
@@ -191,7 +195,7 @@ def parse_text(file_paths):
 
             # 1) Service Element
             se_match = se_pattern.match(line)
-            if se_match:
+            if se_match and parallel_parse.is_se_heading(line):
                 se_id = int(se_match.group(1))
                 se_name = se_match.group(2).strip()
                 # Hospitals have SE 1..38
@@ -254,7 +258,8 @@ def parse_text(file_paths):
                             s["standard_id"] == std_id
                             for s in current_section["standards"]
                         ):
-                            extra_text, new_i = collect_following_lines(i + 1, lines)
+                            extra_spans, new_i = collect_following_lines(i + 1, lines)
+                            extra_text = lines.join(extra_spans)
                             if extra_text:
                                 statement = (
                                     (statement + " " + extra_text).strip()
@@ -337,7 +342,8 @@ def parse_text(file_paths):
             if intent_m and current_standard:
                 if intent_m.group(1) == current_standard["standard_id"]:
                     intent_text = line.split(intent_m.group(0))[-1].strip()
-                    extra_intent, new_i = collect_following_lines(i + 1, lines)
+                    extra_spans, new_i = collect_following_lines(i + 1, lines)
+                    extra_intent = lines.join(extra_spans)
                     combined = " ".join(
                         t for t in [intent_text, extra_intent] if t
                     ).strip()
@@ -345,8 +351,16 @@ def parse_text(file_paths):
                         current_standard["intent_tooltip"] = combined
                     skip_to = max(skip_to, new_i - 1)
 
-    config["hospital_full_configuration"].sort(key=lambda x: x["se_id"])
-    return config
+    return config["hospital_full_configuration"], se_ids_seen, attributes
+
+
+def parse_text(file_paths, jobs=None, stage=None):
+    """Parse extracted Hospital standards text files into structured configuration.
+
+    Output schema mirrors EMS but under key ``hospital_full_configuration``.
+    """
+
+    return parallel_parse.parse_config("hospital", parse_files, file_paths, jobs, stage)
 
 
 if __name__ == "__main__":
@@ -2,9 +2,10 @@ import json
 import re
 import sys
 
-def parse_text(file_paths):
-    config = {"mortuary_full_configuration": []}
-    se_ids_seen = set()
+import parallel_parse
+
+def parse_files(file_paths, ses, se_ids_seen, attributes):
+    config = {"mortuary_full_configuration": ses}
     
     # Regex patterns - same as EMS
     se_pattern = re.compile(r'^\s*(?:SE\s+)?(\d+)(?:\.|\s+)([A-Za-z][A-Za-z0-9\s,&\-\(\)]{5,})', re.MULTILINE)
@@ -58,6 +59,7 @@ def parse_text(file_paths):
     for file_path in file_paths:
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
+        attributes.feed_lines(lines)
 
         current_se = None
         current_section = None
@@ -75,7 +77,7 @@ def parse_text(file_paths):
 
             # 1. Service Element
             se_match = se_pattern.match(line)
-            if se_match:
+            if se_match and parallel_parse.is_se_heading(line):
                 se_id = int(se_match.group(1))
                 se_name = se_match.group(2).strip()
                 # ADJUSTED: Mortuary has 6 SEs
@@ -191,8 +193,11 @@ def parse_text(file_paths):
                         current_standard["intent_tooltip"] = combined
                     skip_to = max(skip_to, new_i - 1)
 
-    config["mortuary_full_configuration"].sort(key=lambda x: x["se_id"])
-    return config
+    return config["mortuary_full_configuration"], se_ids_seen, attributes
+
+
+def parse_text(file_paths, jobs=None, stage=None):
+    return parallel_parse.parse_config("mortuary", parse_files, file_paths, jobs, stage)
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import re
+
+
+# Severity and critical flags straight from the standards texts, patched into
+# the facility configs. Every criterion block in the texts looks like
+#
+#   Criterion  1.1.1.1
+#   Critical: ¨                          (þ = critical, ¨ = not critical)
+#   ...
+#   Default Severity for NC or PC = 2
+#   Moderate
+#
+# CriterionAttributes reads those lines as the parsers go through a file, so
+# the values are known once the parse is done; patch_facility() is the
+# standalone stage for configs that were built some other way.
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEXT_SUBDIR = "extracted_text"
+
+# Per facility: where its texts live and which configs are patched. EMS
+# criteria also carry the "NC or PC = N Text" default string.
+FACILITIES = {
+    "clinics": {
+        "text_dir": "Botswananhq_clinics",
+        "outputs": ["src/assets/clinics_config.json", "clinics_config_utf8.json"],
+    },
+    "ems": {
+        "text_dir": "Botswananhq_ems",
+        "outputs": ["src/assets/ems_config.json", "ems_config_utf8.json"],
+        "default_text": True,
+    },
+    "hospital": {
+        "text_dir": "Botswananhq_hospital",
+        "outputs": ["src/assets/hospital_config.json", "hospital_config_utf8.json"],
+    },
+    "mortuary": {
+        "text_dir": "Botswanahq_motuary",
+        "outputs": ["src/assets/mortuary_config.json", "mortuary_config_utf8.json"],
+    },
+}
+
+CRITERION_TOKEN = re.compile(r"Criterion\s+(\d+\.\d+\.\d+\.\d+)")
+CRITICAL_TOKEN = re.compile(r"Critical:\s*([þ¨])")
+SEVERITY_TOKEN = re.compile(r"Default Severity.*?=\s*(\d)")
+SEVERITY_TEXT = re.compile(r"^(Very Serious|Minor|Mild|Moderate|Serious|Extreme)", re.IGNORECASE)
+
+
+class CriterionAttributes:
+    """Collects ``severity``, ``severity_text`` and ``is_critical`` per criterion.
+
+    Lines are fed in text order; each value belongs to the last
+    ``Criterion X.X.X.X`` seen, and the first value of each kind in a
+    criterion's block wins. ``lines`` counts the lines fed, which the
+    generators report as the parse stage's line count.
+    """
+
+    def __init__(self):
+        self.values: dict[str, dict] = {}
+        self.lines = 0
+        self._current = None
+        self._awaiting_text = False
+
+    def feed(self, line: str) -> None:
+        if self._awaiting_text:
+            self._awaiting_text = False
+            m = SEVERITY_TEXT.match(line)
+            if m:
+                self._current["severity_text"] = m.group(1)
+                return
+
+        if "Criterion" in line:
+            m = CRITERION_TOKEN.search(line)
+            if m:
+                self._current = self.values.setdefault(m.group(1), {})
+                return
+        if self._current is None:
+            return
+        if "Critical:" in line and "is_critical" not in self._current:
+            m = CRITICAL_TOKEN.search(line)
+            if m:
+                self._current["is_critical"] = m.group(1) == "þ"
+        elif "Default Severity" in line and "severity" not in self._current:
+            m = SEVERITY_TOKEN.search(line)
+            if m:
+                self._current["severity"] = int(m.group(1))
+                self._awaiting_text = True
+
+    def feed_lines(self, lines) -> None:
+        """Feed one file's lines; a criterion never continues into the next file."""
+        for line in lines:
+            self.feed(line)
+            self.lines += 1
+        self._current = None
+        self._awaiting_text = False
+
+    def merge(self, values: dict[str, dict]) -> None:
+        """Fold in ``values`` collected from later files, as if they had been fed here.
+
+        Earlier values win; a severity text only comes along with its severity.
+        """
+        for cid, found in values.items():
+            current = self.values.setdefault(cid, {})
+            if "is_critical" in found:
+                current.setdefault("is_critical", found["is_critical"])
+            if "severity" in found and "severity" not in current:
+                current["severity"] = found["severity"]
+                if "severity_text" in found:
+                    current["severity_text"] = found["severity_text"]
+
+
+def collect_attributes(text_paths) -> dict[str, dict]:
+    attributes = CriterionAttributes()
+    for path in text_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            attributes.feed_lines(f)
+    return attributes.values
+
+
+def criterion_index(config: dict, key: str) -> dict[str, dict]:
+    """Map criterion ID -> the criterion dict inside ``config`` (first one wins)."""
+    index = {}
+    for se in config.get(key, []):
+        for section in se.get("sections", []):
+            for standard in section.get("standards", []):
+                for criterion in standard.get("criteria", []):
+                    cid = criterion.get("id")
+                    if cid and cid not in index:
+                        index[cid] = criterion
+    return index
+
+
+def apply_attributes(config: dict, key: str, values: dict, default_text: bool = False) -> tuple[int, int]:
+    """Patch ``config`` in place; return ``(updated, missing)`` criterion counts.
+
+    Only criteria named in ``values`` are visited. ``missing`` counts the
+    config's criteria with no severity in the texts; they keep what they have.
+    """
+    index = criterion_index(config, key)
+    updated = 0
+    for cid, found in values.items():
+        criterion = index.get(cid)
+        if criterion is None:
+            continue
+        changed = False
+        severity = found.get("severity")
+        if severity is not None and criterion.get("severity") != severity:
+            criterion["severity"] = severity
+            changed = True
+        if default_text and severity is not None and "severity_text" in found:
+            default = f"NC or PC = {severity} {found['severity_text']}"
+            if criterion.get("default") != default:
+                criterion["default"] = default
+                changed = True
+            if "severity_text" in criterion:
+                del criterion["severity_text"]
+                changed = True
+        critical = found.get("is_critical")
+        if critical is not None and criterion.get("is_critical") != critical:
+            criterion["is_critical"] = critical
+            changed = True
+        updated += changed
+    missing = sum(1 for cid in index if values.get(cid, {}).get("severity") is None)
+    return updated, missing
+
+
+def text_paths_for(facility: str) -> list[str]:
+    text_dir = os.path.join(ROOT_DIR, FACILITIES[facility]["text_dir"], TEXT_SUBDIR)
+    if not os.path.isdir(text_dir):
+        return []
+    names = [n for n in os.listdir(text_dir) if n.endswith(".txt")]
+    return [os.path.join(text_dir, n) for n in sorted(names)]
+
+
+def patch_facility(facility: str, paths: list[str] | None = None) -> bool:
+    """Patch one facility's configs from its texts; return True if any file was written.
+
+    ``paths`` (repo-relative or absolute) replaces the facility's asset
+    configs, e.g. for a CSV import under build/csv.
+    """
+    spec = FACILITIES[facility]
+    key = f"{facility}_full_configuration"
+    values = collect_attributes(text_paths_for(facility))
+    print(f"[PATCH] {facility}: found values for {len(values)} criteria")
+
+    written = False
+    for rel_path in paths or spec["outputs"]:
+        path = os.path.join(ROOT_DIR, rel_path)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        updated, missing = apply_attributes(config, key, values, spec.get("default_text", False))
+        if not updated:
+            print(f"[PATCH] {rel_path}: up to date ({missing} criteria without extracted values)")
+            continue
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+        written = True
+        print(f"[PATCH] {rel_path}: updated {updated} criteria ({missing} without extracted values, left as is)")
+    return written
+
+
+def main(facilities=None, paths=None) -> None:
+    for facility in facilities or sorted(FACILITIES):
+        patch_facility(facility, paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Patch severity and critical flags into facility configs from the standards texts.")
+    parser.add_argument("--facility", action="append", choices=sorted(FACILITIES), help="Facility to patch (repeatable; default: all)")
+    parser.add_argument("--config", action="append", help="Patch this config file instead (repeatable; needs one --facility)")
+    args = parser.parse_args()
+    if args.config and len(args.facility or []) != 1:
+        parser.error("--config needs exactly one --facility")
+    main(args.facility, args.config)
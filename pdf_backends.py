@@ -0,0 +1,363 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_PATH = os.path.join(ROOT_DIR, ".pdf_backend_stats.json")
+
+# Force a backend for every document, e.g. PDF_BACKEND=pymupdf.
+BACKEND_ENV = "PDF_BACKEND"
+# Pages timed per backend when choosing automatically.
+SAMPLE_PAGES = 3
+
+
+class PdfDocument:
+    """Page-text access to one PDF through a specific library.
+
+    Subclasses implement ``_open``, ``page_count`` and ``_page_text``.
+    Extraction time is accumulated and written to the backend stats file
+    when the document is closed.
+    """
+
+    name = ""
+
+    def __init__(self, pdf_path: str):
+        self.path = pdf_path
+        self.pages_read = 0
+        self.seconds = 0.0
+        self._open(pdf_path)
+
+    def _open(self, pdf_path: str) -> None:
+        raise NotImplementedError
+
+    @property
+    def page_count(self) -> int:
+        raise NotImplementedError
+
+    def _page_text(self, index: int) -> str:
+        raise NotImplementedError
+
+    def page_text(self, index: int) -> str:
+        """Text of the 0-based page ``index``."""
+        start = time.perf_counter()
+        try:
+            return self._page_text(index)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.pages_read += 1
+
+    def close(self) -> None:
+        if self.pages_read:
+            record_extraction(self.path, self.name, self.pages_read, self.seconds)
+            self.pages_read, self.seconds = 0, 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PypdfDocument(PdfDocument):
+    name = "pypdf"
+
+    def _open(self, pdf_path):
+        import pypdf
+
+        self._reader = pypdf.PdfReader(pdf_path)
+
+    @property
+    def page_count(self):
+        return len(self._reader.pages)
+
+    def _page_text(self, index):
+        return self._reader.pages[index].extract_text()
+
+
+class PymupdfDocument(PdfDocument):
+    name = "pymupdf"
+
+    def _open(self, pdf_path):
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf
+
+        self._doc = pymupdf.open(pdf_path)
+
+    @property
+    def page_count(self):
+        return self._doc.page_count
+
+    def _page_text(self, index):
+        return self._doc[index].get_text("text")
+
+    def close(self):
+        super().close()
+        self._doc.close()
+
+
+BACKENDS = {cls.name: cls for cls in (PypdfDocument, PymupdfDocument)}
+
+
+def available_backends() -> list[str]:
+    """Names of the backends whose library is importable."""
+    names = []
+    for name, module in (("pypdf", "pypdf"), ("pymupdf", "pymupdf"), ("pymupdf", "fitz")):
+        if name in names:
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def normalize_text(text: str) -> list[str]:
+    """Lines as the parsers see them: stripped, NBSPs as spaces, no blanks.
+
+    Line structure is kept on purpose: the parsers work line by line, so two
+    backends that emit the same words with different line breaks (PyMuPDF
+    keeps ``Page 1 of 17`` on one line, pypdf splits it) are not treated as
+    interchangeable.
+    """
+    lines = []
+    for line in text.replace("\xa0", " ").splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def sample_page_indexes(page_count: int, sample: int = SAMPLE_PAGES) -> list[int]:
+    """Evenly spread 0-based page indexes, always including the first page."""
+    if page_count <= sample:
+        return list(range(page_count))
+    step = page_count / sample
+    return sorted({int(i * step) for i in range(sample)})
+
+
+# -----------------------
+# Stats file
+# -----------------------
+
+# The lock serializes threads of this process; the lock file serializes the
+# pipeline stages, which run as separate processes and all update the same
+# stats file.
+_stats_lock = threading.Lock()
+
+
+def _doc_key(pdf_path: str) -> str:
+    path = os.path.abspath(pdf_path)
+    return os.path.relpath(path, ROOT_DIR) if path.startswith(ROOT_DIR + os.sep) else path
+
+
+def _doc_signature(pdf_path: str) -> list[int]:
+    st = os.stat(pdf_path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_stats(path: str = STATS_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def _stats_file_lock():
+    with _stats_lock, open(f"{STATS_PATH}.lock", "a+b") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 s; keep waiting.
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _update_stats(pdf_path: str, update) -> None:
+    with _stats_file_lock():
+        stats = load_stats()
+        entry = stats.setdefault(_doc_key(pdf_path), {})
+        update(entry)
+        tmp = f"{STATS_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=1, sort_keys=True)
+        os.replace(tmp, STATS_PATH)
+
+
+def record_extraction(pdf_path: str, backend: str, pages: int, seconds: float) -> None:
+    """Accumulate real extraction time for ``pdf_path`` under ``backend``."""
+
+    def update(entry):
+        ext = entry.setdefault("extractions", {}).setdefault(backend, {"pages": 0, "seconds": 0.0, "runs": 0})
+        ext["pages"] += pages
+        ext["seconds"] = round(ext["seconds"] + seconds, 6)
+        ext["runs"] += 1
+
+    _update_stats(pdf_path, update)
+
+
+# -----------------------
+# Backend selection
+# -----------------------
+
+# References already reported missing in this process.
+_missing_reference_warned: set[str] = set()
+
+
+def _warn_missing_reference(reference: str, backend: str) -> None:
+    if reference not in _missing_reference_warned:
+        _missing_reference_warned.add(reference)
+        print(f"[PDF] WARNING: reference backend {reference} is not available; using {backend}, "
+              f"whose text is not checked against {reference}. Install {reference} or set {BACKEND_ENV}.")
+
+
+def benchmark_backends(pdf_path: str, candidates: list[str] | None = None, sample: int = SAMPLE_PAGES) -> dict:
+    """Time each candidate on the same sample pages.
+
+    Returns ``{backend: {"seconds": float, "pages": int, "text": [lines...]}}``
+    (or ``{"error": str}`` for a backend that failed to open the file).
+    """
+    results = {}
+    for name in candidates or available_backends():
+        start = time.perf_counter()
+        try:
+            doc = BACKENDS[name](pdf_path)
+            indexes = sample_page_indexes(doc.page_count, sample)
+            # _page_text bypasses the per-document accounting of page_text.
+            text = [normalize_text(doc._page_text(i)) for i in indexes]
+            doc.close()
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = {"seconds": time.perf_counter() - start, "pages": len(indexes), "text": text}
+    return results
+
+
+def choose_backend(pdf_path: str, reference: str = "pypdf") -> str:
+    """Fastest available backend whose sample text matches ``reference``.
+
+    ``reference`` is the backend the downstream parsers were written
+    against; its output defines "equivalent". The decision is cached in the
+    stats file and reused until the PDF's size or mtime changes. A warning
+    is printed when ``reference`` itself is not available, since the
+    parsers may then see different text.
+    """
+    names = available_backends()
+    if not names:
+        raise ImportError("No PDF backend available; install pypdf or pymupdf")
+    if len(names) == 1:
+        if names[0] != reference:
+            _warn_missing_reference(reference, names[0])
+        return names[0]
+
+    signature = _doc_signature(pdf_path)
+    cached = load_stats().get(_doc_key(pdf_path), {}).get("choice")
+    if cached and cached["signature"] == signature and cached["reference"] == reference and cached["backend"] in names:
+        if not cached.get("verified"):
+            _warn_missing_reference(reference, cached["backend"])
+        return cached["backend"]
+
+    trials = benchmark_backends(pdf_path, names)
+    ref_text = trials.get(reference, {}).get("text")
+    usable = [
+        name
+        for name, trial in trials.items()
+        if "error" not in trial and (ref_text is None or trial["text"] == ref_text)
+    ]
+    if not usable:
+        usable = [name for name in names if "error" not in trials.get(name, {})] or names
+    backend = min(usable, key=lambda n: trials.get(n, {}).get("seconds", float("inf")))
+    if ref_text is None:
+        _warn_missing_reference(reference, backend)
+
+    def update(entry):
+        entry["choice"] = {
+            "backend": backend,
+            "reference": reference,
+            "verified": ref_text is not None,
+            "signature": signature,
+            "trials": {
+                name: (
+                    {"error": trial["error"]}
+                    if "error" in trial
+                    else {
+                        "seconds_per_page": round(trial["seconds"] / max(trial["pages"], 1), 6),
+                        "equivalent": ref_text is None or trial["text"] == ref_text,
+                    }
+                )
+                for name, trial in trials.items()
+            },
+        }
+
+    _update_stats(pdf_path, update)
+    return backend
+
+
+def open_document(pdf_path: str, backend: str | None = None, reference: str = "pypdf") -> PdfDocument:
+    """Open ``pdf_path`` with ``backend``, ``$PDF_BACKEND`` or the auto choice.
+
+    Use as a context manager so extraction time is recorded::
+
+        with open_document(path) as doc:
+            for i in range(doc.page_count):
+                text = doc.page_text(i)
+    """
+    backend = backend or os.environ.get(BACKEND_ENV) or "auto"
+    if backend == "auto":
+        backend = choose_backend(pdf_path, reference)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{backend}' (use {', '.join(BACKENDS)} or auto)")
+    return BACKENDS[backend](pdf_path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare PDF text backends and show per-document stats.")
+    parser.add_argument("pdfs", nargs="*", help="PDFs to benchmark (default: just print the stats file)")
+    parser.add_argument("--reference", default="pypdf", choices=sorted(BACKENDS))
+    args = parser.parse_args()
+
+    for pdf in args.pdfs:
+        print(f"{pdf}: {choose_backend(pdf, args.reference)}")
+
+    stats = load_stats()
+    print(f"\n{'document':<70} {'choice':<8} {'backend':<8} {'pages':>6} {'s/page':>9}")
+    for doc, entry in sorted(stats.items()):
+        choice = entry.get("choice", {}).get("backend", "-")
+        for backend, ext in sorted(entry.get("extractions", {}).items()):
+            per_page = ext["seconds"] / ext["pages"] if ext["pages"] else 0.0
+            print(f"{doc[-70:]:<70} {choice:<8} {backend:<8} {ext['pages']:>6} {per_page:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(ROOT_DIR, ".pipeline_state.json")
+PY = sys.executable
+
+
+class Stage:
+    """One pipeline step: a command plus the files it reads and writes.
+
+    ``inputs``/``outputs`` are repo-relative paths or glob patterns. A stage
+    depends on the closest earlier stage that outputs one of its inputs, so
+    in-place steps (e.g. tagging ``ems_links.json``) chain naturally.
+    ``after`` names extra stages to wait for, e.g. checks that write nothing.
+    """
+
+    def __init__(self, name: str, cmd: list[str], inputs: list[str], outputs: list[str], facility: str,
+                 after: list[str] | None = None):
+        self.name = name
+        self.cmd = cmd
+        self.inputs = inputs
+        self.outputs = outputs
+        self.facility = facility
+        self.deps: set[str] = set(after or [])
+
+
+def _script(path: str) -> list[str]:
+    return [PY, path]
+
+
+def build_stages(strings: bool = False) -> list[Stage]:
+    stages = [
+        # Hospital
+        Stage(
+            "hospital:extract",
+            _script("extract_hospital_texts.py"),
+            ["extract_hospital_texts.py", "extract_pdf_v2.py", "Botswananhq_hospital/*.pdf"],
+            ["Botswananhq_hospital/extracted_text/se_*.txt"],
+            "hospital",
+        ),
+        Stage(
+            "hospital:config",
+            _script("generate_hospital_config_from_pdfs.py"),
+            [
+                "generate_hospital_config_from_pdfs.py",
+                "parse_hospital_text.py",
+                "patch_config.py",
+                "parallel_parse.py",
+                "source_text.py",
+                "Botswananhq_hospital/*.pdf",
+                "Botswananhq_hospital/extracted_text/se_*.txt",
+            ],
+            ["src/assets/hospital_config.json", "hospital_config_utf8.json"],
+            "hospital",
+        ),
+        Stage(
+            "hospital:links",
+            _script("Matrix/extract_hospital_links.py"),
+            [
+                "Matrix/extract_hospital_links.py",
+                "Matrix/Matrix-NHQS_Hospital_Version_2025.docx",
+                "Matrix/build_compute_criteria.py",
+                "Matrix/hospital_compute_criteria_source.json",
+                "src/assets/hospital_config.json",
+            ],
+            ["Matrix/hospital_matrix_text.txt", "src/assets/hospital_links.json",
+             "src/assets/hospital_compute_criteria.json"],
+            "hospital",
+        ),
+        # Mortuary
+        Stage(
+            "mortuary:extract",
+            _script("extract_mortuary_texts.py"),
+            ["extract_mortuary_texts.py", "extract_pdf_v2.py", "Botswanahq_motuary/*.pdf"],
+            ["Botswanahq_motuary/extracted_text/se_*.txt"],
+            "mortuary",
+        ),
+        Stage(
+            "mortuary:config",
+            _script("generate_mortuary_config.py"),
+            [
+                "generate_mortuary_config.py",
+                "parse_mortuary_text.py",
+                "patch_config.py",
+                "parallel_parse.py",
+                "Botswanahq_motuary/*.pdf",
+                "Botswanahq_motuary/extracted_text/se_*.txt",
+            ],
+            ["src/assets/mortuary_config.json", "mortuary_config_utf8.json"],
+            "mortuary",
+        ),
+        Stage(
+            "mortuary:links",
+            _script("Matrix/extract_mortuary_links.py"),
+            [
+                "Matrix/extract_mortuary_links.py",
+                "Matrix/mortuary_matrix_text.txt",
+                "src/assets/mortuary_config.json",
+            ],
+            ["src/assets/mortuary_links.json"],
+            "mortuary",
+        ),
+        # Clinics (texts are extracted once by hand; there is no extract script)
+        Stage(
+            "clinics:config",
+            _script("generate_clinics_config.py"),
+            [
+                "generate_clinics_config.py",
+                "parse_clinics_text.py",
+                "patch_config.py",
+                "parallel_parse.py",
+                "Botswananhq_clinics/*.pdf",
+                "Botswananhq_clinics/extracted_text/se_*.txt",
+            ],
+            ["src/assets/clinics_config.json", "clinics_config_utf8.json"],
+            "clinics",
+        ),
+        Stage(
+            "clinics:links",
+            _script("Matrix/extract_clinics_links.py"),
+            [
+                "Matrix/extract_clinics_links.py",
+                "Matrix/clinics_matrix_text.txt",
+                "src/assets/clinics_config.json",
+            ],
+            ["src/assets/clinics_links.json"],
+            "clinics",
+        ),
+        # EMS (the generator extracts the PDFs itself)
+        Stage(
+            "ems:config",
+            _script("generate_ems_config_from_pdfs.py"),
+            [
+                "generate_ems_config_from_pdfs.py",
+                "parse_ems_text.py",
+                "patch_config.py",
+                "parallel_parse.py",
+                "extract_pdf_v2.py",
+                "Botswananhq_ems/*.pdf",
+            ],
+            ["Botswananhq_ems/extracted_text/se_*.txt", "src/assets/ems_config.json", "ems_config_utf8.json"],
+            "ems",
+        ),
+        Stage(
+            "ems:links",
+            _script("Matrix/extract_and_build.py"),
+            [
+                "Matrix/extract_and_build.py",
+                "Matrix/Matrix-NHQS-for-Emergency-Medical-Services-06.01.2026 (2).pdf",
+                "src/assets/ems_config.json",
+            ],
+            ["src/assets/ems_links.json"],
+            "ems",
+        ),
+        Stage(
+            "ems:hierarchy",
+            _script("Matrix/apply_correct_hierarchy.py"),
+            ["Matrix/apply_correct_hierarchy.py", "src/assets/ems_links.json", "Matrix/reextracted_ems_links.json"],
+            ["src/assets/ems_links.json", "Matrix/reextracted_ems_links.json"],
+            "ems",
+        ),
+    ]
+    # Once a facility's assets are final: check their cross references, then
+    # publish delta patches for offline clients and rebuild the search index.
+    # A failed check stops both from going out.
+    for fac in ["hospital", "mortuary", "clinics", "ems"]:
+        assets = [f"src/assets/{fac}_config.json", f"src/assets/{fac}_links.json"]
+        if fac == "hospital":
+            assets.append("src/assets/hospital_compute_criteria.json")
+        stages.append(
+            Stage(
+                f"{fac}:validate",
+                [PY, "validate_assets.py", "--facility", fac],
+                ["validate_assets.py", *assets],
+                [],
+                fac,
+            )
+        )
+        stages.append(
+            Stage(
+                f"{fac}:deltas",
+                [PY, "delta_packages.py", "--facility", fac],
+                ["delta_packages.py", "config_diff.py", *assets[:2]],
+                [f"public/deltas/{fac}_config/*", f"public/deltas/{fac}_links/*"],
+                fac,
+                after=[f"{fac}:validate"],
+            )
+        )
+        stages.append(
+            Stage(
+                f"{fac}:search",
+                [PY, "search_index.py", "--facility", fac],
+                ["search_index.py", assets[0]],
+                [f"public/search/{fac}_search.json"],
+                fac,
+                after=[f"{fac}:validate"],
+            )
+        )
+    # Optional: all four configs as one shared string table.
+    if strings:
+        stages.append(
+            Stage(
+                "strings",
+                [PY, "string_table.py"],
+                ["string_table.py", *(f"src/assets/{fac}_config.json" for fac in ["clinics", "ems", "hospital", "mortuary"])],
+                ["public/strings/index.json"],
+                "all",
+                after=[f"{fac}:validate" for fac in ["hospital", "mortuary", "clinics", "ems"]],
+            )
+        )
+    link_dependencies(stages)
+    return stages
+
+
+def link_dependencies(stages: list[Stage]) -> None:
+    """Wire each stage to the latest earlier producer of each of its inputs."""
+    for idx, stage in enumerate(stages):
+        for pattern in stage.inputs:
+            for earlier in reversed(stages[:idx]):
+                if pattern in earlier.outputs:
+                    stage.deps.add(earlier.name)
+                    break
+
+
+# -----------------------
+# Hashing & state
+# -----------------------
+
+class FileHasher:
+    """SHA-256 of files, reusing the previous run's digest when size+mtime match."""
+
+    def __init__(self, cache: dict):
+        self.cache = cache
+        self._lock = threading.Lock()
+
+    def digest(self, rel_path: str) -> str | None:
+        path = os.path.join(ROOT_DIR, rel_path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            cached = self.cache.get(rel_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self.cache[rel_path] = [key, digest]
+        return digest
+
+
+def expand(patterns: list[str]) -> list[str]:
+    files: list[str] = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = glob.glob(os.path.join(glob.escape(ROOT_DIR), pattern))
+            files.extend(sorted(os.path.relpath(m, ROOT_DIR) for m in matches))
+        else:
+            files.append(pattern)
+    return files
+
+
+def _exists(pattern: str) -> bool:
+    files = expand([pattern])
+    return bool(files) and all(os.path.exists(os.path.join(ROOT_DIR, f)) for f in files)
+
+
+def fingerprint(stage: Stage, hasher: FileHasher) -> dict[str, str | None]:
+    return {path: hasher.digest(path) for path in expand(stage.inputs)}
+
+
+def load_state(path: str = STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"files": {}, "stages": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state: dict, path: str = STATE_PATH) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def staleness(stage: Stage, state: dict, hasher: FileHasher) -> str | None:
+    """Return why ``stage`` must run, or ``None`` when it is up to date."""
+    recorded = state["stages"].get(stage.name)
+    if recorded is None:
+        return "never run"
+    current = fingerprint(stage, hasher)
+    changed = sorted(p for p in set(current) | set(recorded) if current.get(p) != recorded.get(p))
+    if changed:
+        return "changed: " + ", ".join(changed[:3]) + (" ..." if len(changed) > 3 else "")
+    missing = [p for p in stage.outputs if not _exists(p)]
+    if missing:
+        return "missing output: " + ", ".join(missing)
+    return None
+
+
+# -----------------------
+# Runner
+# -----------------------
+
+def _run_command(stage: Stage) -> tuple[int, str, float]:
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            stage.cmd,
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+        )
+        return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - start
+    except OSError as e:
+        return 127, f"{e}\n", time.perf_counter() - start
+
+
+def run_pipeline(stages: list[Stage], state: dict, force: bool = False, jobs: int = 4, dry_run: bool = False) -> int:
+    """Run stale stages in dependency order, independent branches concurrently."""
+
+    hasher = FileHasher(state.setdefault("files", {}))
+    by_name = {s.name: s for s in stages}
+    pending = {s.name for s in stages}
+    done: set[str] = set()
+    ran: set[str] = set()
+    failed: set[str] = set()
+    lock = threading.Lock()
+
+    def ready(name: str) -> bool:
+        return all(d in done or d not in by_name for d in by_name[name].deps)
+
+    def execute(name: str) -> tuple[str, str, str]:
+        stage = by_name[name]
+        reason = "forced" if force else staleness(stage, state, hasher)
+        # Real runs see upstream rewrites through the input hashes; a dry run
+        # has to assume that anything downstream of a stale stage is stale.
+        if reason is None and dry_run and any(d in ran for d in stage.deps):
+            reason = "upstream stale"
+        if reason is None:
+            return name, "fresh", ""
+
+        missing = [p for p in stage.inputs if not _exists(p)]
+        if missing:
+            return name, "blocked", "missing input: " + ", ".join(missing)
+        if dry_run:
+            return name, "would-run", reason
+
+        code, output, elapsed = _run_command(stage)
+        if code != 0:
+            return name, "failed", f"exit {code} after {elapsed:.1f}s\n{output}"
+        with lock:
+            state["stages"][name] = fingerprint(stage, hasher)
+        return name, "ran", f"{reason} ({elapsed:.1f}s)"
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        while pending or running:
+            for name in sorted(pending):
+                blocked_by_failure = any(d in failed for d in by_name[name].deps)
+                if blocked_by_failure:
+                    pending.discard(name)
+                    failed.add(name)
+                    print(f"[PIPELINE] {name:<18} skipped (upstream failed)")
+                elif ready(name):
+                    pending.discard(name)
+                    running[pool.submit(execute, name)] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                running.pop(fut)
+                name, status, detail = fut.result()
+                if status == "failed":
+                    failed.add(name)
+                else:
+                    done.add(name)
+                if status in ("ran", "would-run"):
+                    ran.add(name)
+                first, _, rest = detail.partition("\n")
+                print(f"[PIPELINE] {name:<18} {status:<9} {first}")
+                if rest.strip():
+                    for line in rest.rstrip().splitlines()[-20:]:
+                        print(f"    {line}")
+            if not dry_run:
+                save_state(state)
+
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate configs and links, re-running only stale stages.")
+    parser.add_argument("--facility", nargs="+", choices=["clinics", "ems", "hospital", "mortuary"])
+    parser.add_argument("--stage", nargs="+", help="Only these stages (e.g. hospital:links)")
+    parser.add_argument("--force", action="store_true", help="Re-run selected stages even if fresh")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would run")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent stages")
+    parser.add_argument("--list", action="store_true", help="Print the stage graph and exit")
+    parser.add_argument("--watch", action="store_true", help="Bring stages up to date, then rebuild on every change")
+    parser.add_argument("--strings", action="store_true", help="Also build the shared string table (public/strings)")
+    args = parser.parse_args()
+
+    stages = build_stages(strings=args.strings)
+    if args.facility:
+        stages = [s for s in stages if s.facility in args.facility]
+    if args.stage:
+        stages = [s for s in stages if s.name in args.stage]
+
+    if args.list:
+        for s in stages:
+            deps = ", ".join(sorted(s.deps)) or "-"
+            print(f"{s.name:<18} after: {deps}")
+            print(f"{'':<18} cmd:   {' '.join(os.path.basename(c) if c == PY else c for c in s.cmd)}")
+        return 0
+
+    start = time.perf_counter()
+    state = load_state()
+    code = run_pipeline(stages, state, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    print(f"[PIPELINE] finished in {time.perf_counter() - start:.2f}s")
+    if args.watch and not args.dry_run:
+        import watch_pipeline
+
+        watch_pipeline.watch(args.facility)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
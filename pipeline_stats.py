@@ -0,0 +1,154 @@
+import cProfile
+import os
+import resource
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Opt-in profiling, e.g.:
+#   PIPELINE_PROFILE=parse=cprofile python generate_hospital_config_from_pdfs.py
+#   PIPELINE_PROFILE=parse=tracemalloc,write=cprofile PIPELINE_PROFILE_DIR=/tmp/prof ...
+PROFILE_ENV = "PIPELINE_PROFILE"
+PROFILE_DIR_ENV = "PIPELINE_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+def parse_profile_spec(spec: str | None) -> dict[str, str]:
+    """Parse ``"parse=cprofile,write=tracemalloc"`` into ``{stage: mode}``."""
+    modes: dict[str, str] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        stage, _, mode = item.partition("=")
+        mode = (mode or "cprofile").strip().lower()
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' for stage '{stage}' (use {'/'.join(PROFILE_MODES)})")
+        modes[stage.strip()] = mode
+    return modes
+
+
+def count_lines(paths) -> int:
+    """Count lines across text files without decoding them."""
+    total = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            total += sum(1 for _ in f)
+    return total
+
+
+def count_criteria(config: dict) -> int:
+    """Number of criteria in a ``*_full_configuration`` config dict."""
+    return sum(
+        len(standard.get("criteria", []))
+        for key, ses in config.items()
+        if key.endswith("_full_configuration")
+        for se in ses
+        for section in se.get("sections", [])
+        for standard in section.get("standards", [])
+    )
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of the whole process so far, in MiB (ru_maxrss is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class StageStats:
+    """Measurements for one pipeline stage; callers fill ``lines``/``criteria``.
+
+    ``peak_rss_mb`` is the process peak at the end of the stage, so it
+    includes every earlier stage. ``rss_growth_mb`` is how much this stage
+    raised that peak; a stage that stays below an earlier peak shows 0.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.elapsed = 0.0
+        self.lines: int | None = None
+        self.criteria: int | None = None
+        self.peak_rss_mb = 0.0
+        self.rss_growth_mb = 0.0
+        self.profile_path: str | None = None
+
+
+class StageRecorder:
+    """Times named pipeline stages and prints a summary table.
+
+    Usage::
+
+        stats = StageRecorder("HOSPITAL")
+        with stats.stage("parse") as st:
+            config = parse_text(paths, stage=st)  # sets st.lines
+            st.criteria = count_criteria(config)
+        stats.report()
+
+    Stages named in ``$PIPELINE_PROFILE`` additionally run under cProfile
+    (``.prof`` files, loadable by pstats/snakeviz/flameprof) or tracemalloc
+    (a ``.tracemalloc`` snapshot plus a ``.txt`` top-allocations summary).
+    """
+
+    def __init__(self, label: str, profile: dict[str, str] | None = None, profile_dir: str | None = None):
+        self.label = label
+        self.stages: list[StageStats] = []
+        self.profile = parse_profile_spec(os.environ.get(PROFILE_ENV)) if profile is None else profile
+        self.profile_dir = profile_dir or os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+        self._started = time.perf_counter()
+
+    def _profile_base(self, name: str) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        return os.path.join(self.profile_dir, f"{self.label.lower()}_{name}")
+
+    @contextmanager
+    def stage(self, name: str):
+        st = StageStats(name)
+        mode = self.profile.get(name)
+        profiler = None
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif mode == "tracemalloc":
+            tracemalloc.start(25)
+
+        peak_before = _peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield st
+        finally:
+            st.elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                st.profile_path = self._profile_base(name) + ".prof"
+                profiler.dump_stats(st.profile_path)
+            elif mode == "tracemalloc":
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                base = self._profile_base(name)
+                snapshot.dump(base + ".tracemalloc")
+                with open(base + ".txt", "w", encoding="utf-8") as f:
+                    for stat in snapshot.statistics("traceback")[:25]:
+                        f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                        for line in stat.traceback.format():
+                            f.write(f"  {line}\n")
+                st.profile_path = base + ".tracemalloc"
+            st.peak_rss_mb = _peak_rss_mb()
+            st.rss_growth_mb = st.peak_rss_mb - peak_before
+            self.stages.append(st)
+
+    def report(self) -> None:
+        total = time.perf_counter() - self._started
+        print(f"\n[{self.label} TIMINGS]")
+        print(f"  {'stage':<14} {'time':>10} {'lines':>9} {'criteria':>9} {'lines/s':>11} {'proc peak':>10} {'+peak':>9}")
+        for st in self.stages:
+            lines = "-" if st.lines is None else str(st.lines)
+            crits = "-" if st.criteria is None else str(st.criteria)
+            rate = f"{st.lines / st.elapsed:,.0f}" if st.lines and st.elapsed > 0 else "-"
+            print(
+                f"  {st.name:<14} {st.elapsed * 1000:8.1f}ms {lines:>9} {crits:>9} {rate:>11} {st.peak_rss_mb:8.1f}MB {st.rss_growth_mb:7.1f}MB"
+            )
+        print(f"  {'total':<14} {total * 1000:8.1f}ms")
+        for st in self.stages:
+            if st.profile_path:
+                print(f"  profile for '{st.name}' written to {st.profile_path}")
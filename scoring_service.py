@@ -0,0 +1,563 @@
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "assets")
+COMPUTE_CRITERIA_PATH = os.path.join(ASSETS_DIR, "hospital_compute_criteria.json")
+
+# facility -> (config file, top-level config key, links file)
+FACILITIES = {
+    "clinics": ("clinics_config.json", "clinics_full_configuration", "clinics_links.json"),
+    "ems": ("ems_config.json", "ems_full_configuration", "ems_links.json"),
+    "hospital": ("hospital_config.json", "hospital_full_configuration", "hospital_links.json"),
+    "mortuary": ("mortuary_config.json", "mortuary_full_configuration", "mortuary_links.json"),
+}
+
+# Upper bounds (milliseconds) of the latency histogram buckets.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_C_RE = re.compile(r"^([A-Z]+_)?(C|FC|FULL|COMPLIANT)$")
+_PC_RE = re.compile(r"^([A-Z]+_)?(PC|PARTIAL|SUBSTANTIAL)$")
+_NC_RE = re.compile(r"^([A-Z]+_)?(NC|NON|NON_COMPLIANT|NON-COMPLIANT|NOT_MET|FAIL)$")
+
+
+# -----------------------
+# Scoring rules (mirrors src/utils/scoring.js)
+# -----------------------
+
+def normalize_criterion_code(raw_code) -> str:
+    """Python port of ``normalizeCriterionCode`` from src/utils/normalization.js."""
+    if not raw_code:
+        return ""
+    code = str(raw_code).strip()
+    m = re.match(r".*_(?=\d)", code)
+    if m:
+        code = code[m.end():]
+    elif code.startswith("SE "):
+        code = code[3:].strip()
+    code = re.sub(r"-root\(.*\)$", "", code)
+    parts = code.split()
+    return parts[0] if parts else ""
+
+
+def _is_compliant(res: str) -> bool:
+    return (bool(_C_RE.match(res)) and "NON" not in res) or (
+        "COMPLIANT" in res and "NON" not in res and "PARTIAL" not in res
+    )
+
+
+def _is_partial(res: str) -> bool:
+    return bool(_PC_RE.match(res)) or "PARTIAL" in res
+
+
+def _is_non_compliant(res: str) -> bool:
+    return bool(_NC_RE.match(res)) or "NON" in res or "FAIL" in res
+
+
+def _severity_number(severity) -> int:
+    m = re.match(r"\s*([+-]?\d+)", str(severity))
+    return int(m.group(1)) if m else 1
+
+
+def calculate_points_for_link(response, severity):
+    """Points for a single leaf response; ``None`` for NA or unknown values."""
+    if not response or response == "NA":
+        return None
+    res = str(response).upper().strip()
+    if _is_compliant(res):
+        return 80
+    if _is_partial(res):
+        return 75 - (_severity_number(severity) - 1) * 10
+    if _is_non_compliant(res):
+        return 35 - (_severity_number(severity) - 1) * 10
+    return None
+
+
+def compute_graph_scores(criteria_map: dict, subcriteria_map: dict | None = None) -> dict:
+    """Resolve root/leaf scores for every criterion in ``criteria_map``.
+
+    ``criteria_map`` maps normalized codes to dicts with ``response``,
+    ``is_root``, ``links``, ``severity`` and ``is_critical``. The rules are a
+    line-for-line port of ``computeGraphScores`` so that server-side results
+    agree with what surveyors see on the tablet.
+    """
+
+    subcriteria_map = subcriteria_map or {}
+    scores: dict = {}
+    resolving: set[str] = set()
+
+    def unscored() -> dict:
+        return {
+            "points": None,
+            "response": "NA",
+            "raw_response": "NA",
+            "is_root": False,
+            "is_draft": True,
+            "critical_fail": False,
+            "is_scored": False,
+            "is_critical": False,
+        }
+
+    def compute(code: str) -> dict:
+        if code in scores:
+            return scores[code]
+        criterion = criteria_map.get(code)
+        if criterion is None or code in resolving:
+            return unscored()
+        resolving.add(code)
+
+        response = criterion.get("response") or "NA"
+        is_root = bool(criterion.get("is_root"))
+        links = criterion.get("links") or []
+        severity = criterion.get("severity", 1)
+        is_critical = bool(criterion.get("is_critical"))
+
+        if response == "NA" and not is_root:
+            res = {
+                "points": None,
+                "response": "NA",
+                "raw_response": response,
+                "is_root": is_root,
+                "is_draft": False,
+                "critical_fail": False,
+                "is_scored": False,
+                "is_critical": False,
+                "root_sources": [],
+            }
+            scores[code] = res
+            resolving.discard(code)
+            return res
+
+        points = None
+        is_scored = False
+        is_draft = False
+        critical_fail = False
+        calculated = response
+        sum_linked = 0.0
+        count_scored = 0
+        root_sources = []
+
+        upper = str(response).upper().strip()
+        if is_critical and _is_partial(upper):
+            calculated = "NC"
+        if is_critical and _is_non_compliant(str(calculated).upper().strip()):
+            critical_fail = True
+
+        if links:
+            nc_pc_count = 0
+            any_child_critical_fail = False
+            for link in links:
+                child = compute(normalize_criterion_code(link))
+                root_sources.append(
+                    {
+                        "code": link,
+                        "points": child["points"],
+                        "response": child["response"],
+                        "is_scored": child["is_scored"],
+                        "is_critical": child["is_critical"],
+                    }
+                )
+                if child["critical_fail"] or (
+                    child["is_critical"] and "NC" in str(child["response"]).upper()
+                ):
+                    any_child_critical_fail = True
+                if child["is_draft"] or not child["is_scored"]:
+                    is_draft = True
+                if child["is_scored"] and child["points"] is not None:
+                    count_scored += 1
+                    sum_linked += child["points"]
+                    if not _is_compliant(str(child["response"]).upper()):
+                        nc_pc_count += 1
+
+            if is_root:
+                is_scored = not is_draft
+
+            if count_scored > 0:
+                draft_avg = sum_linked / count_scored
+                final_points = draft_avg
+                if count_scored > 1 and nc_pc_count > count_scored / 2:
+                    c_threshold = calculate_points_for_link("C", severity) or 80
+                    pc_threshold = calculate_points_for_link("PC", severity) or 55
+                    if nc_pc_count > count_scored * 0.75:
+                        final_points = min(final_points, pc_threshold - 1)
+                    else:
+                        final_points = min(final_points, c_threshold - 1)
+
+                configured_subs = subcriteria_map.get(code)
+                if configured_subs:
+                    cfg_sum = 0.0
+                    cfg_count = 0
+                    for sub in configured_subs:
+                        sub_res = compute(sub)
+                        if sub_res["is_scored"] and sub_res["points"] is not None:
+                            cfg_sum += sub_res["points"]
+                            cfg_count += 1
+                    if cfg_count:
+                        final_points = (cfg_sum / cfg_count + draft_avg) / 2
+                    else:
+                        final_points = draft_avg
+
+                if not is_draft:
+                    points = final_points
+
+            if any_child_critical_fail:
+                critical_fail = True
+                points = 0
+                is_scored = True
+                is_draft = False
+        else:
+            leaf_points = calculate_points_for_link(calculated, severity)
+            if leaf_points is not None:
+                points = leaf_points
+                is_scored = True
+
+        display = calculated if is_scored else "NA"
+        if is_scored and (is_root or critical_fail):
+            if critical_fail:
+                display = "NC"
+            elif is_root and is_draft:
+                display = "Pending"
+            elif points >= calculate_points_for_link("C", severity):
+                display = "C"
+            elif points >= calculate_points_for_link("PC", severity):
+                display = "PC"
+            else:
+                display = "NC"
+        elif is_scored:
+            disp = str(display).upper()
+            if _is_compliant(disp):
+                display = "C"
+            elif _is_partial(disp):
+                display = "PC"
+            elif _is_non_compliant(disp):
+                display = "NC"
+
+        res = {
+            "points": points if is_scored else None,
+            "response": display,
+            "raw_response": response,
+            "is_root": is_root,
+            "is_draft": is_draft,
+            "critical_fail": critical_fail,
+            "is_scored": is_scored,
+            "is_critical": is_critical,
+            "draft_avg": sum_linked / count_scored if count_scored else None,
+            "count_scored_links": count_scored,
+            "root_sources": root_sources,
+        }
+        scores[code] = res
+        resolving.discard(code)
+        return res
+
+    for code in criteria_map:
+        compute(code)
+    return scores
+
+
+def aggregate(standards: list[dict]) -> dict:
+    """Section/overall roll-up, mirroring ``calculateSectionScore``."""
+    total = 0.0
+    maximum = 0.0
+    critical_fail = False
+    for std in standards:
+        total += std.get("total_score") or 0
+        maximum += std.get("max_score") or 0
+        critical_fail = critical_fail or bool(std.get("critical_fail"))
+    percent = 0.0 if maximum == 0 else total / maximum * 100
+    if critical_fail:
+        percent = 0.0
+        total = 0.0
+    return {
+        "percent": round(percent, 2),
+        "total_score": total,
+        "max_score": maximum,
+        "critical_fail": critical_fail,
+    }
+
+
+# -----------------------
+# Preloaded facility models
+# -----------------------
+
+def load_compute_criteria(path: str = COMPUTE_CRITERIA_PATH) -> dict:
+    """Return ``{root_code: [sub_codes]}`` from hospital_compute_criteria.json.
+
+    The file is written already normalized by Matrix/build_compute_criteria.py.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FacilityModel:
+    """Immutable, per-process view of one facility's config and links."""
+
+    def __init__(self, name: str, assets_dir: str = ASSETS_DIR, subcriteria: dict | None = None):
+        config_file, config_key, links_file = FACILITIES[name]
+        with open(os.path.join(assets_dir, config_file), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        with open(os.path.join(assets_dir, links_file), "r", encoding="utf-8") as f:
+            links = json.load(f)
+
+        self.name = name
+        self.subcriteria = subcriteria or {}
+        self.links = {
+            item["criteria"]: list(item.get("linked_criteria") or [])
+            for item in links
+            if item.get("criteria")
+        }
+        # [(se_id, section_id, standard_id, [criterion dicts])] in config order.
+        self.standards = []
+        self.criteria = {}
+        for se in config.get(config_key, []):
+            for section in se.get("sections", []):
+                for standard in section.get("standards", []):
+                    crits = [c for c in standard.get("criteria", []) if c.get("id")]
+                    for crit in crits:
+                        self.criteria[crit["id"]] = crit
+                    self.standards.append(
+                        (se.get("se_id"), section.get("section_pi_id"), standard.get("standard_id"), crits)
+                    )
+
+    def score(self, payload: dict) -> dict:
+        """Score a posted assessment.
+
+        ``payload["responses"]`` maps criterion codes (any prefix the app uses)
+        to C/PC/NC/NA values. ``payload["critical"]`` optionally overrides the
+        critical flag per code; otherwise the config's ``is_critical`` is used.
+        """
+
+        responses = {
+            normalize_criterion_code(k): v for k, v in (payload.get("responses") or {}).items()
+        }
+        critical = {
+            normalize_criterion_code(k): bool(v) for k, v in (payload.get("critical") or {}).items()
+        }
+
+        criteria_map = {}
+        for cid, crit in self.criteria.items():
+            links = self.links.get(cid, [])
+            criteria_map[cid] = {
+                "response": responses.get(cid) or "NA",
+                "is_root": len(links) > 0,
+                "links": links,
+                "severity": crit.get("severity") or 1,
+                "is_critical": critical.get(cid, bool(crit.get("is_critical"))),
+            }
+        scores = compute_graph_scores(criteria_map, self.subcriteria)
+
+        sections: dict = {}
+        for se_id, section_id, standard_id, crits in self.standards:
+            total = 0.0
+            maximum = 0.0
+            critical_fail = False
+            criteria_scores = {}
+            for crit in crits:
+                score = scores[crit["id"]]
+                criteria_scores[crit["id"]] = {
+                    k: score.get(k)
+                    for k in ("points", "response", "is_root", "is_draft", "critical_fail", "is_scored")
+                }
+                if score["is_scored"] and score["points"] is not None:
+                    total += score["points"]
+                    maximum += 100
+                critical_fail = critical_fail or score["critical_fail"]
+            if critical_fail:
+                total = 0.0
+            sections.setdefault(section_id, []).append(
+                {
+                    "id": standard_id,
+                    "total_score": total,
+                    "max_score": maximum,
+                    "percent": 0.0 if maximum == 0 else total / maximum * 100,
+                    "critical_fail": critical_fail,
+                    "criteria_scores": criteria_scores,
+                }
+            )
+
+        section_results = [
+            dict(id=section_id, **aggregate(stds), standards=stds)
+            for section_id, stds in sections.items()
+        ]
+        return {
+            "facility": self.name,
+            "overall": aggregate(section_results),
+            "sections": section_results,
+        }
+
+
+def preload_models(assets_dir: str = ASSETS_DIR) -> dict:
+    """Load every facility model once; the handler only ever reads these."""
+    subcriteria = load_compute_criteria(os.path.join(assets_dir, "hospital_compute_criteria.json"))
+    return {
+        name: FacilityModel(name, assets_dir, subcriteria if name == "hospital" else None)
+        for name in FACILITIES
+    }
+
+
+# -----------------------
+# Metrics
+# -----------------------
+
+class LatencyHistogram:
+    """Thread-safe cumulative latency histogram keyed by route."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._routes: dict = {}
+
+    def observe(self, route: str, elapsed_ms: float) -> None:
+        idx = bisect.bisect_left(self.buckets_ms, elapsed_ms)
+        with self._lock:
+            entry = self._routes.setdefault(
+                route, {"counts": [0] * (len(self.buckets_ms) + 1), "count": 0, "sum_ms": 0.0}
+            )
+            entry["counts"][idx] += 1
+            entry["count"] += 1
+            entry["sum_ms"] += elapsed_ms
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}ms" for b in self.buckets_ms] + ["le_inf"]
+        with self._lock:
+            out = {}
+            for route, entry in self._routes.items():
+                out[route] = {
+                    "count": entry["count"],
+                    "sum_ms": round(entry["sum_ms"], 3),
+                    "buckets": dict(zip(labels, entry["counts"])),
+                }
+            return out
+
+
+# -----------------------
+# HTTP server
+# -----------------------
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each accepted connection to a fixed worker pool."""
+
+    def __init__(self, address, handler, models: dict, workers: int):
+        super().__init__(address, handler)
+        self.models = models
+        self.metrics = LatencyHistogram()
+        self.started_at = time.time()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="score")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    server_version = "PWASurveyScoring/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _timed(self, route: str, func) -> None:
+        start = time.perf_counter()
+        try:
+            func()
+        finally:
+            self.server.metrics.observe(route, (time.perf_counter() - start) * 1000)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(
+                200,
+                {
+                    "status": "ok",
+                    "facilities": sorted(self.server.models),
+                    "uptime_s": round(time.time() - self.server.started_at, 1),
+                },
+            )
+        elif self.path == "/metrics":
+            self._send_json(
+                200,
+                {"buckets_ms": list(self.server.metrics.buckets_ms), "routes": self.server.metrics.snapshot()},
+            )
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        m = re.match(r"^/score/([a-z]+)/?$", self.path)
+        if not m:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        facility = m.group(1)
+        model = self.server.models.get(facility)
+        if model is None:
+            self._send_json(404, {"error": f"Unknown facility '{facility}'"})
+            return
+
+        def handle():
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("payload must be a JSON object")
+            except ValueError as e:
+                self._send_json(400, {"error": f"Invalid JSON body: {e}"})
+                return
+            for key in ("responses", "critical"):
+                if payload.get(key) is not None and not isinstance(payload[key], dict):
+                    self._send_json(400, {"error": f"'{key}' must be a JSON object of criterion code -> value"})
+                    return
+            self._send_json(200, model.score(payload))
+
+        self._timed(f"POST /score/{facility}", handle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local assessment scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--assets", default=ASSETS_DIR, help="Directory holding *_config.json / *_links.json")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    models = preload_models(args.assets)
+    print(
+        f"[SCORING] Preloaded {', '.join(sorted(models))} in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+
+    server = PooledHTTPServer((args.host, args.port), ScoringHandler, models, args.workers)
+    print(f"[SCORING] Listening on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
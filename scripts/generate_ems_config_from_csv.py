@@ -1,168 +1,402 @@
+import codecs
 import csv
+import heapq
 import json
+import marshal
 import os
 import re
-from collections import defaultdict
+import sys
+import tempfile
 
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CSV_PATH = os.path.join(ROOT_DIR, "SE_Import_File .csv")
-OUT_PATHS = [
-    os.path.join(ROOT_DIR, "src", "assets", "ems_config.json"),
-    os.path.join(ROOT_DIR, "ems_config_utf8.json"),
-]
+sys.path.insert(0, ROOT_DIR)
 
+from criterion_ids import pack_parts, unpack  # noqa: E402
+CSV_PATH = os.path.join(ROOT_DIR, "SE_Import_File .csv")
 
-def parse_section_title(name_value: str, se_token: str) -> str | None:
+# DHIS2 program code prefix -> facility; one export carries all of them.
+FACILITY_PREFIXES = {
+    "CLINIC": "clinics",
+    "EMS": "ems",
+    "Hospital": "hospital",
+    "Mortuary": "mortuary",
+}
+FACILITIES = sorted(FACILITY_PREFIXES.values())
+# The CSV configs are flat (severity 3, no intents, no critical flags, and far
+# fewer criteria than the PDFs), so they never replace the PDF-derived
+# src/assets configs; they go to their own directory.
+OUT_DIR = os.path.join(ROOT_DIR, "build", "csv")
+
+# {PREFIX}-Standards-SE{n}-{SE Name}-{a}.{b}.{c}.{d}; the SE name may itself
+# contain hyphens ("Pre-Operative and Operative Care"), so the ID is taken
+# from the last segment.
+CODE_PATTERN = re.compile(
+    r"^(" + "|".join(map(re.escape, FACILITY_PREFIXES)) + r")-Standards-"
+    r"(SE(\d+))-(.+)-\s*((\d+)\.(\d+)\.(\d+)\.(\d+))\s*$"
+)
+# "1.2 Facility Management": a section ID followed by its title.
+SECTION_TITLE_PATTERN = re.compile(r"^\d+(?:\.\d+)*\s+(.+)$")
+# Rows per sorted run (per facility) when the input has to be sorted externally.
+RUN_SIZE = 200_000
+
+
+def config_key(facility: str) -> str:
+    return f"{facility}_full_configuration"
+
+
+def out_path(facility: str, out_dir: str = OUT_DIR) -> str:
+    return os.path.join(out_dir, f"{facility}_config.json")
+
+
+def parse_section_title(name_value: str, se_token: str, se_name: str | None = None) -> str | None:
     """Extract section title from the CSV `name` column.
 
     Expected pattern (split on '-'):
       CLINIC - Standards - SE{n} - {SE Name} - {section_id} {section_title} - {criterion text}
+
+    Names without a numbered section part (the Hospital, EMS and Mortuary
+    programs go straight to the criterion text) have no title.
     """
     if not name_value:
         return None
-    parts = name_value.split("-")
-    try:
-        idx = parts.index(se_token)
-        section_part = parts[idx + 2].strip()
-    except (ValueError, IndexError):
-        return None
+    marker = f"{se_token}-{se_name}-" if se_name else None
+    if marker and marker in name_value:
+        section_part = name_value.split(marker, 1)[1].split("-", 1)[0].strip()
+    else:
+        parts = name_value.split("-")
+        try:
+            idx = parts.index(se_token)
+            section_part = parts[idx + 2].strip()
+        except (ValueError, IndexError):
+            return None
 
     # section_part like "1.2 Facility Management"
-    if " " in section_part:
-        return section_part.split(" ", 1)[1].strip()
-    return section_part or None
+    m = SECTION_TITLE_PATTERN.match(section_part)
+    return m.group(1).strip() if m else None
 
 
-def build_config_from_csv() -> dict:
-    se_map: dict[int, dict] = {}
+def read_csv_lines(csv_path: str):
+    """Decoded lines of the CSV, UTF-8 where valid and cp1252 otherwise.
 
-    with open(CSV_PATH, "r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            code = (row.get("code") or "").strip()
-            name = (row.get("name") or "").strip()
-            desc = (row.get("Description") or "").strip()
+    Exports edited in Excel mix the two (curly apostrophes arrive as a bare
+    0x92 byte), so the fallback is decided per line rather than per file.
+    """
+    with open(csv_path, "rb") as f:
+        for line_no, raw in enumerate(f):
+            if line_no == 0 and raw.startswith(codecs.BOM_UTF8):
+                raw = raw[len(codecs.BOM_UTF8):]
+            try:
+                yield raw.decode("utf-8")
+            except UnicodeDecodeError:
+                yield raw.decode("cp1252", errors="replace")
+
+
+class SortedRuns:
+    """Records of one facility, handed back in sort-key order.
+
+    Records are buffered up to ``run_size``; each full buffer is sorted and
+    spilled to a temporary file, and the runs are merged with ``heapq`` on
+    the way out. With ``assume_sorted`` the input order is checked instead
+    and the runs are simply concatenated.
+    """
 
-            if not code.startswith("CLINIC-Standards-SE"):
-                continue
+    def __init__(self, run_size: int = RUN_SIZE, assume_sorted: bool = False):
+        self.run_size = run_size
+        self.assume_sorted = assume_sorted
+        self.count = 0
+        self._chunk = []
+        self._runs = []
+        self._last = None
+
+    def add(self, rec: tuple) -> None:
+        if self.assume_sorted:
+            key = rec[0]
+            if self._last is not None and key < self._last:
+                raise ValueError(f"CSV row {rec[1] + 2} ({rec[2]}) is out of order; drop --sorted")
+            self._last = key
+        self._chunk.append(rec)
+        self.count += 1
+        if len(self._chunk) >= self.run_size:
+            self._runs.append(_spill_run(self._chunk, self.assume_sorted))
+            self._chunk = []
+
+    def records(self):
+        try:
+            if not self._runs:
+                if not self.assume_sorted:
+                    self._chunk.sort()
+                yield from self._chunk
+                return
+            if self._chunk:
+                self._runs.append(_spill_run(self._chunk, self.assume_sorted))
+                self._chunk = []
+            runs = [_read_run(f) for f in self._runs]
+            if self.assume_sorted:
+                for run in runs:
+                    yield from run
+            else:
+                yield from heapq.merge(*runs)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for f in self._runs:
+            f.close()
+        self._runs = []
+        self._chunk = []
+
+
+def _spill_run(chunk: list, presorted: bool = False):
+    if not presorted:
+        chunk.sort()
+    # marshal: the run files only live as long as this process.
+    f = tempfile.TemporaryFile("w+b")
+    for rec in chunk:
+        marshal.dump(rec, f)
+    f.seek(0)
+    return f
+
+
+def _read_run(f):
+    while True:
+        try:
+            yield marshal.load(f)
+        except EOFError:
+            return
+
+
+class FacilityRows:
+    """One facility's share of the CSV.
+
+    Each record is ``(key, seq, criterion_id, description)``: ``key`` packs
+    ``(se_id, a, b, c)`` with :func:`criterion_ids.pack_parts` once per row,
+    so sorting and merging compare plain integers, and ``seq`` keeps criteria
+    of one standard in file order. SE names and section titles are
+    collected on the side, the first one seen winning; they grow with the
+    number of SEs and sections, not with the number of rows.
+    """
 
-            code_parts = code.split("-")
-            if len(code_parts) < 5:
-                continue
+    def __init__(self, facility: str, run_size: int = RUN_SIZE, assume_sorted: bool = False):
+        self.facility = facility
+        self.se_names: dict[int, str] = {}
+        self.titles: dict[tuple[int, int, int], str] = {}
+        self.runs = SortedRuns(run_size, assume_sorted)
+
+
+class StandardsCsv:
+    """Routes the criterion rows of the import CSV to per-facility builders.
+
+    :meth:`read` goes through the file once; afterwards
+    :meth:`iter_se_entries` yields each facility's SEs.
+    """
 
-            se_token = code_parts[2]  # e.g. "SE1"
-            m = re.match(r"SE(\d+)", se_token)
+    def __init__(
+        self,
+        csv_path: str = CSV_PATH,
+        facilities: list[str] | None = None,
+        run_size: int = RUN_SIZE,
+        assume_sorted: bool = False,
+    ):
+        self.csv_path = csv_path
+        self.facilities = {
+            fac: FacilityRows(fac, run_size, assume_sorted) for fac in (facilities or FACILITIES)
+        }
+        self.skipped = 0
+
+    def read(self) -> dict[str, int]:
+        """Single pass over the file; returns the row count per facility."""
+        reader = csv.DictReader(read_csv_lines(self.csv_path))
+        for seq, row in enumerate(reader):
+            m = CODE_PATTERN.match((row.get("code") or "").strip())
             if not m:
                 continue
-            se_id = int(m.group(1))
-            se_name = code_parts[3].strip()
-
-            numeric = code_parts[4].strip()  # e.g. "1.2.1.3"
-            nums = numeric.split(".")
-            if len(nums) != 4 or not all(n.isdigit() for n in nums):
+            prefix, se_token, se_num, se_name, crit_id, a, b, c, _ = m.groups()
+            target = self.facilities.get(FACILITY_PREFIXES[prefix])
+            if target is None:
+                self.skipped += 1
                 continue
-            a, b, c, d = nums
-
-            section_id = f"{a}.{b}"
-            standard_id = f"{a}.{b}.{c}"
-            crit_id = f"{a}.{b}.{c}.{d}"
-
-            se_entry = se_map.setdefault(
-                se_id,
-                {
-                    "se_id": se_id,
-                    "se_name": se_name,
-                    "sections": {},  # section_id -> section dict
-                },
-            )
-
-            # If we ever see a different se_name for same se_id, prefer the first one.
-            if se_entry["se_name"] != se_name:
-                # Keep the original, ignore later variations.
-                pass
-
-            sections = se_entry["sections"]
-            section = sections.setdefault(
-                section_id,
-                {
-                    "section_pi_id": section_id,
-                    "title": None,
-                    "standards": {},  # standard_id -> standard dict
-                },
-            )
-
-            if section["title"] is None:
-                title = parse_section_title(name, se_token)
+            se_id, a, b, c = int(se_num), int(a), int(b), int(c)
+            try:
+                key = pack_parts((se_id, a, b, c))
+            except ValueError as e:
+                print(f"[CSV] skipping {crit_id} in SE {se_id}: {e}")
+                self.skipped += 1
+                continue
+            se_name = se_name.strip()
+            target.se_names.setdefault(se_id, se_name)
+
+            section_key = (se_id, a, b)
+            name = row.get("name") or ""
+            # Only names with a numbered section part ("-1.2 Title-") carry a title.
+            if section_key not in target.titles and f"-{a}.{b} " in name:
+                title = parse_section_title(name.strip(), se_token, se_name)
                 if title:
-                    section["title"] = title
-
-            standards = section["standards"]
-            std = standards.setdefault(
-                standard_id,
-                {
-                    "standard_id": standard_id,
-                    "statement": desc or "",
-                    "intent_tooltip": "",
-                    "criteria": [],
-                },
-            )
+                    target.titles[section_key] = title
 
-            # If statement is empty, backfill with first non-empty description.
+            target.runs.add((key, seq, crit_id, (row.get("Description") or "").strip()))
+        return {fac: rows.runs.count for fac, rows in self.facilities.items()}
+
+    def iter_se_entries(self, facility: str):
+        rows = self.facilities[facility]
+        return merge_config(rows.runs.records(), rows)
+
+    def close(self) -> None:
+        for rows in self.facilities.values():
+            rows.runs.close()
+
+
+def merge_config(records, source: FacilityRows):
+    """Build SE entries from sorted records in a single pass.
+
+    Yields one finished SE dict at a time; SE names and section titles are
+    looked up when the SE is complete, by which point every row of it has
+    been read.
+    """
+    se_entry = section = std = None
+    std_key = None
+    for key, _seq, crit_id, desc in records:
+        if key == std_key:
+            # Same standard as the previous row: no need to unpack the key.
             if not std["statement"] and desc:
                 std["statement"] = desc
+            std["criteria"].append(_criterion(crit_id, desc))
+            continue
+        std_key = key
+        se_id, a, b, c = unpack(key, 4)
+        if se_entry is None or se_entry["se_id"] != se_id:
+            if se_entry is not None:
+                yield _finish_se(se_entry, source)
+            se_entry = {"se_id": se_id, "se_name": "", "sections": []}
+            section = std = None
+
+        section_id = f"{a}.{b}"
+        if section is None or section["section_pi_id"] != section_id:
+            section = {"section_pi_id": section_id, "title": None, "standards": []}
+            se_entry["sections"].append(section)
+            std = None
+
+        standard_id = f"{a}.{b}.{c}"
+        if std is None or std["standard_id"] != standard_id:
+            std = {"standard_id": standard_id, "statement": desc or "", "intent_tooltip": "", "criteria": []}
+            section["standards"].append(std)
+        elif not std["statement"] and desc:
+            # If statement is empty, backfill with first non-empty description.
+            std["statement"] = desc
 
-            std["criteria"].append(
-                {
-                    "id": crit_id,
-                    "description": desc,
-                    "is_critical": False,
-                    "category": "Basic Process + Patient Care",
-                    "severity": 3,
-                }
-            )
+        std["criteria"].append(_criterion(crit_id, desc))
 
-    # Normalise to the final structure expected by the app.
-    ems_full_configuration: list[dict] = []
+    if se_entry is not None:
+        yield _finish_se(se_entry, source)
 
-    for se_id in sorted(se_map.keys()):
-        se_entry = se_map[se_id]
-        sections_out: list[dict] = []
 
-        for section_id in sorted(se_entry["sections"].keys(), key=lambda x: tuple(int(p) for p in x.split("."))):
-            section = se_entry["sections"][section_id]
-            standards_map = section["standards"]
+def _criterion(crit_id: str, desc: str) -> dict:
+    return {
+        "id": crit_id,
+        "description": desc,
+        "is_critical": False,
+        "category": "Basic Process + Patient Care",
+        "severity": 3,
+    }
 
-            standards_out: list[dict] = []
-            for std_id in sorted(standards_map.keys(), key=lambda x: tuple(int(p) for p in x.split("."))):
-                standards_out.append(standards_map[std_id])
 
-            section["standards"] = standards_out
-            if section["title"] is None:
-                section["title"] = ""
-            sections_out.append(section)
+def _finish_se(se_entry: dict, source: FacilityRows) -> dict:
+    se_id = se_entry["se_id"]
+    se_entry["se_name"] = source.se_names.get(se_id, "")
+    for section in se_entry["sections"]:
+        a, b = (int(p) for p in section["section_pi_id"].split("."))
+        section["title"] = source.titles.get((se_id, a, b), "")
+    return se_entry
 
-        ems_full_configuration.append(
-            {
-                "se_id": se_entry["se_id"],
-                "se_name": se_entry["se_name"],
-                "sections": sections_out,
-            }
-        )
 
-    return {"ems_full_configuration": ems_full_configuration}
+def build_configs_from_csv(
+    csv_path: str = CSV_PATH,
+    facilities: list[str] | None = None,
+    assume_sorted: bool = False,
+    run_size: int = RUN_SIZE,
+) -> dict[str, dict]:
+    """All requested facility configs from one read of the CSV."""
+    source = StandardsCsv(csv_path, facilities, run_size, assume_sorted)
+    try:
+        source.read()
+        return {fac: {config_key(fac): list(source.iter_se_entries(fac))} for fac in source.facilities}
+    finally:
+        source.close()
 
 
-def main() -> None:
-    config = build_config_from_csv()
-    json_text = json.dumps(config, indent=2, ensure_ascii=False)
+def build_config_from_csv(
+    csv_path: str = CSV_PATH,
+    facility: str = "ems",
+    assume_sorted: bool = False,
+    run_size: int = RUN_SIZE,
+) -> dict:
+    return build_configs_from_csv(csv_path, [facility], assume_sorted, run_size)[facility]
 
-    for path in OUT_PATHS:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(json_text + "\n")
-        print(f"Wrote EMS config to {path}")
 
+def write_config(entries, paths: list[str], key: str) -> int:
+    """Write ``{key: [entries...]}`` as it is produced.
 
-if __name__ == "__main__":
-    main()
+    The text is identical to ``json.dumps(config, indent=2,
+    ensure_ascii=False)`` but only one SE is serialized at a time.
+    """
+    files = [open(path, "w", encoding="utf-8") for path in paths]
+    count = 0
+    try:
+
+        def emit(text):
+            for f in files:
+                f.write(text)
+
+        emit("{\n  " + json.dumps(key) + ": [")
+        for entry in entries:
+            body = json.dumps(entry, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+            emit(("\n    " if count == 0 else ",\n    ") + body)
+            count += 1
+        emit("\n  ]\n}\n" if count else "]\n}\n")
+    finally:
+        for f in files:
+            f.close()
+    return count
+
+
+def main(
+    csv_path: str = CSV_PATH,
+    facilities: list[str] | None = None,
+    assume_sorted: bool = False,
+    run_size: int = RUN_SIZE,
+    out_dir: str = OUT_DIR,
+) -> list[str]:
+    """Import every requested facility from one read; return the paths written.
+
+    Configs go to ``out_dir`` as ``<facility>_config.json``. A facility with
+    no rows in the CSV keeps its existing file there.
+    """
+    source = StandardsCsv(csv_path, facilities, run_size, assume_sorted)
+    written = []
+    try:
+        counts = source.read()
+        os.makedirs(out_dir, exist_ok=True)
+        for fac in source.facilities:
+            if not counts[fac]:
+                print(f"[CSV] {fac}: no rows in {os.path.basename(csv_path)}; config left as it is")
+                continue
+            path = out_path(fac, out_dir)
+            ses = write_config(source.iter_se_entries(fac), [path], config_key(fac))
+            written.append(path)
+            print(f"[CSV] {fac}: {counts[fac]} criteria in {ses} SEs -> {path}")
+    finally:
+        source.close()
+    return written
 
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build facility configs from the DHIS2 import CSV in one pass.")
+    parser.add_argument("--csv", default=CSV_PATH, help="Import CSV (default: SE_Import_File .csv)")
+    parser.add_argument("--facility", action="append", choices=FACILITIES, help="Only these facilities (repeatable)")
+    parser.add_argument("--sorted", action="store_true", help="Rows are already ordered by code; stream without sorting")
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE, help="Rows per sorted run for unsorted input")
+    parser.add_argument("--out", default=OUT_DIR, help="Output directory (default: build/csv)")
+    args = parser.parse_args()
+    main(args.csv, args.facility, args.sorted, args.run_size, args.out)
@@ -0,0 +1,199 @@
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Prebuilt keyword search over a facility's criteria.
+#
+# Built once per facility as public/search/<facility>_search.json, so that a
+# client can load and query it as is instead of indexing the full config on
+# the device. The app has no criteria search yet; SearchIndex (below) and
+# --query are the current readers. The layout:
+#
+#   {"format", "facility", "k1", "b", "scale", "stopwords", "fields",
+#    "ids":            ["1.1.1.1", ...],          criterion ID per document
+#    "terms":          {"hygiene": [doc, weight, doc, weight, ...], ...},
+#    "standards":      [["1.1.1", first doc, end doc], ...],
+#    "standard_terms": {"hygiene": [standard, weight, ...], ...}}
+#
+# Criterion descriptions are indexed per criterion. Statements and intents
+# are indexed once per standard, not copied into each of its criteria; a
+# standard's weight for a term counts for every criterion in its
+# [first, end) document range. Each posting already holds the term's full
+# BM25 weight, including the field weights of FIELD_WEIGHTS, times "scale"
+# and rounded. So a query is just: tokenize it the same way, drop
+# stopwords, add up the weights of its terms per criterion and sort. Tokens
+# are lowercase runs of letters and digits ([a-z0-9]+ after lowercasing).
+# SearchIndex is the Python side of that query, for tests and offline tools.
+
+ASSETS_DIR = os.path.join(ROOT_DIR, "src", "assets")
+SEARCH_DIR = os.path.join(ROOT_DIR, "public", "search")
+FACILITIES = ["clinics", "ems", "hospital", "mortuary"]
+INDEX_FORMAT = 1
+
+K1 = 1.2
+B = 0.75
+SCALE = 1000
+FIELD_WEIGHTS = {"description": 1.0, "statement": 0.5, "intent": 0.25}
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their there these this to "
+    "was were which with all any been not such".split()
+)
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def standard_documents(config: dict, key: str):
+    """``(standard id, statement, intent, [(criterion id, description), ...])`` in config order."""
+    for se in config.get(key, []):
+        for section in se.get("sections", []):
+            for standard in section.get("standards", []):
+                criteria = [(c["id"], c.get("description") or "") for c in standard.get("criteria", []) if c.get("id")]
+                if criteria:
+                    yield standard.get("standard_id", ""), standard.get("statement") or "", standard.get("intent_tooltip") or "", criteria
+
+
+def bm25_postings(docs: list[Counter]) -> dict[str, list[int]]:
+    """Scaled BM25 weight of every term in every document of ``docs``.
+
+    ``docs`` are (field-weighted) term frequencies; the weights are the
+    document lengths too.
+    """
+    n = len(docs)
+    lengths = [sum(tf.values()) for tf in docs]
+    avg_length = (sum(lengths) / n) if n else 0.0
+    df: Counter = Counter()
+    for tf in docs:
+        df.update(tf.keys())
+
+    postings: dict[str, list[int]] = {}
+    for doc, tf in enumerate(docs):
+        norm = K1 * (1 - B + B * lengths[doc] / avg_length) if avg_length else K1
+        for term, f in tf.items():
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            weight = round(SCALE * idf * f * (K1 + 1) / (f + norm))
+            if weight > 0:
+                postings.setdefault(term, []).extend((doc, weight))
+    return {term: postings[term] for term in sorted(postings)}
+
+
+def _frequencies(parts) -> Counter:
+    tf: Counter = Counter()
+    for text, weight in parts:
+        for token in tokenize(text):
+            tf[token] += weight
+    return tf
+
+
+def build_index(standards, facility: str = "") -> dict:
+    """BM25 index of ``standards`` (as from ``standard_documents``) in the asset layout."""
+    ids: list[str] = []
+    criterion_docs: list[Counter] = []
+    ranges: list[list] = []
+    standard_docs: list[Counter] = []
+    for standard_id, statement, intent, criteria in standards:
+        ranges.append([standard_id, len(ids), len(ids) + len(criteria)])
+        standard_docs.append(_frequencies([(statement, FIELD_WEIGHTS["statement"]), (intent, FIELD_WEIGHTS["intent"])]))
+        for cid, description in criteria:
+            ids.append(cid)
+            criterion_docs.append(_frequencies([(description, FIELD_WEIGHTS["description"])]))
+
+    return {
+        "format": INDEX_FORMAT,
+        "facility": facility,
+        "k1": K1,
+        "b": B,
+        "scale": SCALE,
+        "stopwords": sorted(STOPWORDS),
+        "fields": FIELD_WEIGHTS,
+        "ids": ids,
+        "terms": bm25_postings(criterion_docs),
+        "standards": ranges,
+        "standard_terms": bm25_postings(standard_docs),
+    }
+
+
+class SearchIndex:
+    """Queries a prebuilt index the way the client does."""
+
+    def __init__(self, index: dict):
+        if index.get("format") != INDEX_FORMAT:
+            raise ValueError(f"unsupported search index format {index.get('format')!r}")
+        self.facility = index.get("facility", "")
+        self.ids: list[str] = index["ids"]
+        self.terms: dict[str, list[int]] = index["terms"]
+        self.standards: list[list] = index["standards"]
+        self.standard_terms: dict[str, list[int]] = index["standard_terms"]
+        self.scale: int = index["scale"]
+        self.stopwords = frozenset(index["stopwords"])
+
+    @classmethod
+    def load(cls, facility: str, search_dir: str = SEARCH_DIR) -> "SearchIndex":
+        with open(os.path.join(search_dir, f"{facility}_search.json"), "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def tokens(self, query: str) -> list[str]:
+        return [t for t in TOKEN.findall(query.lower()) if t not in self.stopwords]
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """Best ``limit`` ``(criterion id, score)`` matches, highest score first.
+
+        A term repeated in the query counts once; ties keep config order.
+        """
+        scores: dict[int, int] = {}
+        for term in dict.fromkeys(self.tokens(query)):
+            posting = self.terms.get(term, ())
+            for k in range(0, len(posting), 2):
+                doc = posting[k]
+                scores[doc] = scores.get(doc, 0) + posting[k + 1]
+            posting = self.standard_terms.get(term, ())
+            for k in range(0, len(posting), 2):
+                _, first, end = self.standards[posting[k]]
+                for doc in range(first, end):
+                    scores[doc] = scores.get(doc, 0) + posting[k + 1]
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.ids[doc], score / self.scale) for doc, score in best]
+
+
+def build_facility(facility: str, assets_dir: str = ASSETS_DIR, out_dir: str = SEARCH_DIR) -> dict:
+    """Write ``<facility>_search.json`` from the facility config; return the index."""
+    with open(os.path.join(assets_dir, f"{facility}_config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+    start = time.perf_counter()
+    index = build_index(standard_documents(config, f"{facility}_full_configuration"), facility)
+    text = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, f"{facility}_search.json"), "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"[SEARCH] {facility}: {len(index['ids'])} criteria, {len(index['terms'])} description terms, "
+          f"{len(index['standards'])} standards with {len(index['standard_terms'])} terms, "
+          f"{len(text.encode('utf-8')) / 1024:.0f} KB ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the per-facility criteria search indexes, or query one.")
+    parser.add_argument("--facility", action="append", choices=FACILITIES, help="Facility (repeatable; default: all)")
+    parser.add_argument("--query", help="Search the built index(es) for this text instead of building")
+    parser.add_argument("--limit", type=int, default=10, help="Matches shown per facility")
+    args = parser.parse_args()
+
+    if args.query is None:
+        for fac in args.facility or FACILITIES:
+            build_facility(fac)
+        sys.exit(0)
+    for fac in args.facility or FACILITIES:
+        index = SearchIndex.load(fac)
+        for cid, score in index.search(args.query, args.limit):
+            print(f"[SEARCH] {fac} {cid:<12} {score:7.3f}")
@@ -0,0 +1,96 @@
+import mmap
+import os
+import re
+from array import array
+from itertools import chain
+
+# Extracted standards texts held as one buffer per file.
+#
+# The parsers used to readlines() a file and copy continuation lines into
+# lists of stripped strings before joining them. SourceText maps the file,
+# decodes it once into a single string, and addresses lines by offset, so
+# continuation lines are collected as (start, end) spans of stripped lines
+# and joined once.
+
+_NEWLINE = re.compile("\n")
+
+
+def _decode(path: str) -> str:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8")
+
+
+class SourceText:
+    """Lines of one text file, sliced on demand from a single decoded buffer.
+
+    Behaves like the list ``readlines()`` returned, minus the trailing
+    newlines: ``len()``, indexing and iteration give line strings. ``span(i)``
+    is the ``(start, end)`` of line ``i`` with surrounding whitespace removed,
+    as ``line.strip()`` would.
+    """
+
+    def __init__(self, path: str):
+        text = _decode(path)
+        # open() in text mode turns \r\n and \r into \n; do the same.
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        self.text = text
+        starts = array("q", [0])
+        starts.extend(map(re.Match.end, _NEWLINE.finditer(text)))
+        if starts[-1] == len(text):
+            starts.pop()
+        self._starts = starts
+        # End of the last line, before a final newline.
+        self._end = len(text) - text.endswith("\n")
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def bounds(self, i: int) -> tuple[int, int]:
+        """``(start, end)`` of line ``i`` without its newline."""
+        start = self._starts[i]
+        end = self._starts[i + 1] - 1 if i + 1 < len(self._starts) else self._end
+        return start, end
+
+    def __getitem__(self, i: int) -> str:
+        starts = self._starts
+        return self.text[starts[i]:starts[i + 1] - 1 if i + 1 < len(starts) else self._end]
+
+    def __iter__(self):
+        return self.iter_lines()
+
+    def iter_lines(self, start: int = 0, stop: int | None = None):
+        """Lines ``start`` up to ``stop``, sliced without a Python-level loop."""
+        starts = self._starts
+        stop = len(starts) if stop is None else min(stop, len(starts))
+        ends = chain(map((-1).__add__, starts[start + 1:stop + 1]), (self._end,))
+        return map(self.text.__getitem__, map(slice, starts[start:stop], ends))
+
+    def stripped(self, i: int) -> tuple[str, tuple[int, int]]:
+        """``line.strip()`` of line ``i`` and where that text sits in the buffer."""
+        starts = self._starts
+        start = starts[i]
+        end = starts[i + 1] - 1 if i + 1 < len(starts) else self._end
+        line = self.text[start:end]
+        text = line.strip()
+        if not text:
+            return text, (end, end)
+        # The stripped text starts with a non-space, so its first occurrence
+        # is right after the leading whitespace.
+        start += line.find(text)
+        return text, (start, start + len(text))
+
+    def span(self, i: int) -> tuple[int, int]:
+        return self.stripped(i)[1]
+
+    def slice(self, span: tuple[int, int]) -> str:
+        return self.text[span[0]:span[1]]
+
+    def join(self, spans, sep: str = "\n") -> str:
+        """The spans' text joined with ``sep``."""
+        text = self.text
+        return sep.join(text[start:end] for start, end in spans)
+
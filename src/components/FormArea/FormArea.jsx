@@ -79,33 +79,11 @@ import { calculatePointsForLink } from '../../utils/scoring';
 	// Default index for helper functions that don't have access to component state
 	const DEFAULT_CRITERION_INDEX = buildCriterionIndex(emsConfig);
 
-// Pre-compute a map of root criterion -> sub-criteria for Hospital,
-// based on the "Criteria and Sub Criteria for computation" settings.
+// Map of root criterion -> sub-criteria for Hospital, based on the
+// "Criteria and Sub Criteria for computation" settings.
 // Shape: { "7.1.1.1": ["7.1.1.2", "7.1.1.3", ...], ... }
-const HOSPITAL_SUBCRITERIA_MAP = (() => {
-    const map = {};
-    try {
-        const seList = hospitalComputeCriteria?.hospital_standards_config?.service_elements || [];
-        seList.forEach(se => {
-            (se.root_criteria || []).forEach(root => {
-                if (!root || !root.id) return;
-                const rootCode = normalizeCriterionCode(root.id);
-                if (!rootCode) return;
-                const subs = Array.isArray(root.sub_criteria)
-                    ? root.sub_criteria.map(code => normalizeCriterionCode(code)).filter(Boolean)
-                    : [];
-                if (subs.length > 0) {
-                    map[rootCode] = subs;
-                }
-            });
-        });
-    } catch (e) {
-        // Fail quietly; tooltips will just omit sub-criteria if config is invalid
-        // eslint-disable-next-line no-console
-        console.error('FormArea: Failed to build hospital sub-criteria map', e);
-    }
-    return map;
-})();
+// Generated already normalized by Matrix/build_compute_criteria.py.
+const HOSPITAL_SUBCRITERIA_MAP = hospitalComputeCriteria || {};
 
 // Shared utility normalizeCriterionCode is now imported
 
@@ -68,7 +68,34 @@ export function Dashboard() {
     const [isEditingLinks, setIsEditingLinks] = useState(false);
     const [editedLinksJson, setEditedLinksJson] = useState('');
     const [showLinksEditor, setShowLinksEditor] = useState(false);
-	    const hospitalComputeServiceElements = (hospitalComputeCriteria?.hospital_standards_config?.service_elements) || [];
+	    // Settings view of the hospital compute map (root -> sub-criteria, written
+	    // by Matrix/build_compute_criteria.py), grouped by service element. SE
+	    // names and each root's standard statement come from hospital_config.json.
+	    const hospitalComputeServiceElements = useMemo(() => {
+	        const seNames = {};
+	        const statements = {};
+	        (hospitalConfig.hospital_full_configuration || []).forEach(se => {
+	            seNames[se.se_id] = se.se_name;
+	            (se.sections || []).forEach(section => {
+	                (section.standards || []).forEach(standard => {
+	                    statements[standard.standard_id] = (standard.statement || '').replace(/^Standard\s+/, '');
+	                });
+	            });
+	        });
+	        const bySe = new Map();
+	        Object.entries(hospitalComputeCriteria || {}).forEach(([root, subs]) => {
+	            const seId = Number(root.split('.')[0]);
+	            if (!bySe.has(seId)) {
+	                bySe.set(seId, { se_id: `SE ${seId}`, name: seNames[seId] || '', root_criteria: [] });
+	            }
+	            bySe.get(seId).root_criteria.push({
+	                id: root,
+	                description: statements[root.split('.').slice(0, 3).join('.')] || '',
+	                sub_criteria: subs,
+	            });
+	        });
+	        return Array.from(bySe.values());
+	    }, []);
 
     // Integrated Hook for new scheduling-based assignments. When this hook
     // is unavailable or fails, we gracefully fall back to the legacy
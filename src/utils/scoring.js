@@ -14,33 +14,10 @@ import hospitalComputeCriteria from '../assets/hospital_compute_criteria.json';
  * NA = Excluded from maxScore
  */
 
-// Pre-compute a map of root criterion -> configured sub-criteria codes for Hospital.
+// Map of root criterion -> configured sub-criteria codes for Hospital.
 // Shape: { "7.1.1.1": ["7.1.1.2", "7.1.1.3", ...], ... }
-const HOSPITAL_SUBCRITERIA_MAP = (() => {
-    const map = {};
-    try {
-        const seList = hospitalComputeCriteria?.hospital_standards_config?.service_elements || [];
-        seList.forEach(se => {
-            (se.root_criteria || []).forEach(root => {
-                if (!root || !root.id) return;
-                const rootCode = normalizeCriterionCode(root.id);
-                if (!rootCode) return;
-                const subs = Array.isArray(root.sub_criteria)
-                    ? root.sub_criteria.map(code => normalizeCriterionCode(code)).filter(Boolean)
-                    : [];
-                if (subs.length > 0) {
-                    map[rootCode] = subs;
-                }
-            });
-        });
-    } catch (e) {
-        // Fail quietly; scoring will simply ignore configured sub-criteria
-        // if the configuration JSON is missing or malformed.
-        // eslint-disable-next-line no-console
-        console.error('scoring: failed to build hospital sub-criteria map', e);
-    }
-    return map;
-})();
+// Generated already normalized by Matrix/build_compute_criteria.py.
+const HOSPITAL_SUBCRITERIA_MAP = hospitalComputeCriteria || {};
 
 /**
  * Helper to calculate points for a single Linked criterion based on severity and response
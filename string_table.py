@@ -0,0 +1,211 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Shared string table for the facility configs (optional build output).
+#
+# The four configs repeat a lot of text: category labels, the management and
+# leadership standards, intents copied between facility types. This collects
+# every string value of src/assets/<facility>_config.json into one
+# deduplicated table and writes each config with its strings replaced by
+# their index in that table:
+#
+#   public/strings/strings.<hash>.json     ["...", "...", ...]
+#   public/strings/<facility>_config.json  {"format", "table", "refs", "data"}
+#   public/strings/index.json              current table + per-config sizes
+#
+# The table file is named by the hash of its content, so a client or an
+# analytics job can cache it once for all facilities and keep it until the
+# hash changes. "refs" lists the keys whose values are string indices; every
+# other value (se_id, severity, is_critical) is stored as is. Strings are
+# ordered by how often they occur, so the most common ones get the shortest
+# indices. load_config() is the reference loader.
+
+ASSETS_DIR = os.path.join(ROOT_DIR, "src", "assets")
+STRINGS_DIR = os.path.join(ROOT_DIR, "public", "strings")
+FACILITIES = ["clinics", "ems", "hospital", "mortuary"]
+TABLE_FORMAT = 1
+
+# Tables already loaded in this process, by hash.
+_TABLES: dict[str, list[str]] = {}
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def count_strings(doc, counts: Counter) -> None:
+    if isinstance(doc, dict):
+        for value in doc.values():
+            count_strings(value, counts)
+    elif isinstance(doc, list):
+        for value in doc:
+            count_strings(value, counts)
+    elif isinstance(doc, str):
+        counts[doc] += 1
+
+
+def build_table(docs) -> list[str]:
+    """The distinct string values of ``docs``, most frequent first."""
+    counts: Counter = Counter()
+    for doc in docs:
+        count_strings(doc, counts)
+    return sorted(counts, key=lambda s: (-counts[s], s))
+
+
+def table_hash(table: list[str]) -> str:
+    return hashlib.sha256(_dumps(table).encode("utf-8")).hexdigest()[:16]
+
+
+def ref_keys(doc, key: str | None = None, keys: set | None = None, others: set | None = None) -> set[str]:
+    """Keys of ``doc`` that hold strings (directly or in lists).
+
+    Raises ValueError for a key that holds both strings and numbers, since
+    an index could not be told apart from the number.
+    """
+    top = keys is None
+    if top:
+        keys, others = set(), set()
+    if isinstance(doc, dict):
+        for k, value in doc.items():
+            ref_keys(value, k, keys, others)
+    elif isinstance(doc, list):
+        for value in doc:
+            ref_keys(value, key, keys, others)
+    elif isinstance(doc, str):
+        keys.add(key)
+    elif isinstance(doc, (int, float)) and not isinstance(doc, bool):
+        others.add(key)
+    if top:
+        mixed = keys & others
+        if mixed:
+            raise ValueError(f"keys hold both strings and numbers: {', '.join(sorted(map(str, mixed)))}")
+    return keys
+
+
+def pack(doc, index: dict[str, int]):
+    """``doc`` with every string replaced by its position in the table."""
+    if isinstance(doc, dict):
+        return {k: pack(value, index) for k, value in doc.items()}
+    if isinstance(doc, list):
+        return [pack(value, index) for value in doc]
+    if isinstance(doc, str):
+        return index[doc]
+    return doc
+
+
+def unpack(doc, table: list[str], refs, key: str | None = None):
+    if isinstance(doc, dict):
+        return {k: unpack(value, table, refs, k) for k, value in doc.items()}
+    if isinstance(doc, list):
+        return [unpack(value, table, refs, key) for value in doc]
+    if key in refs and isinstance(doc, int) and not isinstance(doc, bool):
+        return table[doc]
+    return doc
+
+
+def load_table(table_id: str, strings_dir: str = STRINGS_DIR) -> list[str]:
+    """The table ``table_id`` with every string interned, loaded once per process."""
+    table = _TABLES.get(table_id)
+    if table is None:
+        with open(os.path.join(strings_dir, f"strings.{table_id}.json"), "r", encoding="utf-8") as f:
+            table = [sys.intern(s) for s in json.load(f)]
+        if table_hash(table) != table_id:
+            raise ValueError(f"string table {table_id} does not match its hash")
+        _TABLES[table_id] = table
+    return table
+
+
+def load_config(facility: str, strings_dir: str = STRINGS_DIR) -> dict:
+    """Rebuild ``<facility>_config.json`` from the packed config and the shared table.
+
+    Equal strings are the same object, within a config and across configs
+    loaded in the same process.
+    """
+    with open(os.path.join(strings_dir, f"{facility}_config.json"), "r", encoding="utf-8") as f:
+        packed = json.load(f)
+    if packed.get("format") != TABLE_FORMAT:
+        raise ValueError(f"{facility}_config.json: unsupported format {packed.get('format')!r}")
+    table = load_table(packed["table"], strings_dir)
+    return unpack(packed["data"], table, frozenset(packed["refs"]))
+
+
+def build(assets_dir: str = ASSETS_DIR, out_dir: str = STRINGS_DIR) -> dict:
+    """Write the shared table and the packed configs of every facility; return the index.
+
+    The table always covers all facilities and every packed config is
+    rewritten with it, so no packed config can point at a table that was
+    replaced.
+    """
+    docs = {}
+    sizes = {}
+    for fac in FACILITIES:
+        path = os.path.join(assets_dir, f"{fac}_config.json")
+        with open(path, "r", encoding="utf-8") as f:
+            docs[fac] = json.load(f)
+        sizes[fac] = os.path.getsize(path)
+
+    table = build_table(docs.values())
+    table_id = table_hash(table)
+    index = {s: n for n, s in enumerate(table)}
+    table_text = _dumps(table)
+
+    os.makedirs(out_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(glob.escape(out_dir), "strings.*.json")):
+        if os.path.basename(stale) != f"strings.{table_id}.json":
+            os.remove(stale)
+    with open(os.path.join(out_dir, f"strings.{table_id}.json"), "w", encoding="utf-8") as f:
+        f.write(table_text)
+
+    manifest = {
+        "format": TABLE_FORMAT,
+        "table": table_id,
+        "strings": len(table),
+        "bytes": len(table_text.encode("utf-8")),
+        "configs": {},
+    }
+    for fac, doc in docs.items():
+        refs = sorted(ref_keys(doc))
+        text = _dumps({"format": TABLE_FORMAT, "table": table_id, "refs": refs, "data": pack(doc, index)})
+        with open(os.path.join(out_dir, f"{fac}_config.json"), "w", encoding="utf-8") as f:
+            f.write(text)
+        manifest["configs"][fac] = {"file": f"{fac}_config.json", "bytes": len(text.encode("utf-8")), "source_bytes": sizes[fac]}
+        print(f"[STRINGS] {fac}_config.json: {sizes[fac] / 1024:.0f} KB -> {len(text.encode('utf-8')) / 1024:.0f} KB + shared table")
+
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    total = manifest["bytes"] + sum(c["bytes"] for c in manifest["configs"].values())
+    print(f"[STRINGS] table {table_id}: {len(table)} strings, {manifest['bytes'] / 1024:.0f} KB; "
+          f"{len(docs)} configs {sum(sizes.values()) / 1024:.0f} KB -> {total / 1024:.0f} KB in total")
+    return manifest
+
+
+def check(facilities=None, assets_dir: str = ASSETS_DIR, strings_dir: str = STRINGS_DIR) -> bool:
+    """True when every packed config loads back to its source config."""
+    ok = True
+    for fac in facilities or FACILITIES:
+        with open(os.path.join(assets_dir, f"{fac}_config.json"), "r", encoding="utf-8") as f:
+            source = json.load(f)
+        same = load_config(fac, strings_dir) == source
+        ok &= same
+        print(f"[STRINGS] {fac}: {'round trip ok' if same else 'DIFFERS from the source config'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the facility configs as one shared string table plus packed configs.")
+    parser.add_argument("--facility", action="append", choices=FACILITIES,
+                        help="Facility to check (repeatable; default: all). The build always covers all of them")
+    parser.add_argument("--out", default=STRINGS_DIR, help="Output directory (default: public/strings)")
+    parser.add_argument("--check", action="store_true", help="Only check that the packed configs load back to the sources")
+    args = parser.parse_args()
+    if not args.check:
+        build(out_dir=args.out)
+    sys.exit(0 if check(args.facility, strings_dir=args.out) else 1)
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from criterion_ids import ROOT_TAG, normalize_code
+from patch_config import criterion_index
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cross-file checks for the generated assets, run after every rebuild.
+#
+# Every criterion code in src/assets/<facility>_links.json ("criteria",
+# "linked_criteria", "root" and the targets of "-root(...)" tags) must be a
+# criterion of <facility>_config.json, and every code in
+# <facility>_compute_criteria.json must be too. Scoring silently treats
+# unknown codes as unscored, so without this a dangling reference only shows
+# up as a wrong score in the browser.
+#
+# Errors fail the stage. Warnings are things scoring tolerates but that are
+# probably mistakes (duplicate link entries, self links, compute roots that
+# have no links and so never use their sub-criteria); --strict fails on those
+# too.
+
+ASSETS_DIR = os.path.join(ROOT_DIR, "src", "assets")
+FACILITIES = ["clinics", "ems", "hospital", "mortuary"]
+ROOT_TARGET = re.compile(re.escape(ROOT_TAG) + r"\(([^)]*)\)")
+
+
+def _load(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Report:
+    """Violations of one facility, in the order they were found."""
+
+    def __init__(self, facility: str):
+        self.facility = facility
+        self.errors: list[dict] = []
+        self.warnings: list[dict] = []
+
+    def error(self, asset: str, code: str, message: str) -> None:
+        self.errors.append({"asset": asset, "criterion": code, "message": message})
+
+    def warn(self, asset: str, code: str, message: str) -> None:
+        self.warnings.append({"asset": asset, "criterion": code, "message": message})
+
+    def to_json(self) -> dict:
+        return {"facility": self.facility, "errors": self.errors, "warnings": self.warnings}
+
+
+def check_links(report: Report, asset: str, links: list, ids) -> None:
+    seen = set()
+    for n, item in enumerate(links):
+        code = item.get("criteria")
+        if not code:
+            report.error(asset, "", f"entry {n} has no criteria code")
+            continue
+        if code not in ids:
+            report.error(asset, code, "criteria is not in the config")
+        if code in seen:
+            report.warn(asset, code, "duplicate entry (scoring keeps the last one)")
+        seen.add(code)
+
+        for field in ("linked_criteria", "root"):
+            for ref in item.get(field) or []:
+                base = normalize_code(ref)
+                if base not in ids:
+                    report.error(asset, code, f"{field} {ref!r} is not in the config")
+                elif base == code and field == "linked_criteria":
+                    report.warn(asset, code, "links to itself")
+                for target in ROOT_TARGET.findall(ref):
+                    if normalize_code(target) not in ids:
+                        report.error(asset, code, f"{field} {ref!r} has a -root target that is not in the config")
+
+
+def check_compute(report: Report, asset: str, compute: dict, links: list, ids) -> None:
+    linked = {item.get("criteria") for item in links if item.get("linked_criteria")}
+    for root, subs in compute.items():
+        if root not in ids:
+            report.error(asset, root, "root is not in the config")
+        elif root not in linked:
+            report.warn(asset, root, f"root has no linked_criteria, so its sub-criteria ({len(subs)}) are never used")
+        for sub in subs:
+            if sub not in ids:
+                report.error(asset, root, f"sub-criterion {sub!r} is not in the config")
+            elif sub == root:
+                report.warn(asset, root, "lists itself as a sub-criterion")
+
+
+def validate_facility(facility: str, assets_dir: str = ASSETS_DIR) -> Report:
+    """Check one facility's links and compute map against its config."""
+    report = Report(facility)
+    config_asset = f"{facility}_config.json"
+    config = _load(os.path.join(assets_dir, config_asset))
+    if config is None:
+        report.error(config_asset, "", "file not found")
+        return report
+    ids = frozenset(criterion_index(config, f"{facility}_full_configuration"))
+
+    links_asset = f"{facility}_links.json"
+    links = _load(os.path.join(assets_dir, links_asset))
+    if links is None:
+        report.error(links_asset, "", "file not found")
+        links = []
+    check_links(report, links_asset, links, ids)
+
+    compute_asset = f"{facility}_compute_criteria.json"
+    compute = _load(os.path.join(assets_dir, compute_asset))
+    if compute is not None:
+        check_compute(report, compute_asset, compute, links, ids)
+    return report
+
+
+def print_report(report: Report, elapsed: float, limit: int = 50) -> None:
+    for kind, items in (("ERROR", report.errors), ("WARN", report.warnings)):
+        for item in items[:limit]:
+            where = f" {item['criterion']}" if item["criterion"] else ""
+            print(f"[VALIDATE] {kind} {item['asset']}{where}: {item['message']}")
+        if len(items) > limit:
+            print(f"[VALIDATE] ... {len(items) - limit} more {kind.lower()}s in {report.facility}")
+    print(f"[VALIDATE] {report.facility}: {len(report.errors)} errors, {len(report.warnings)} warnings "
+          f"({elapsed * 1000:.0f} ms)")
+
+
+def main(facilities=None, strict: bool = False, as_json: bool = False, limit: int = 50) -> int:
+    reports = []
+    for facility in facilities or FACILITIES:
+        start = time.perf_counter()
+        report = validate_facility(facility)
+        elapsed = time.perf_counter() - start
+        reports.append(report)
+        if not as_json:
+            print_report(report, elapsed, limit)
+    if as_json:
+        json.dump([r.to_json() for r in reports], sys.stdout, indent=2)
+        print()
+    failed = any(r.errors or (strict and r.warnings) for r in reports)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that links and compute maps only reference criteria of the config.")
+    parser.add_argument("--facility", action="append", choices=FACILITIES, help="Facility to check (repeatable; default: all)")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings as well as errors")
+    parser.add_argument("--json", action="store_true", help="Print the violations as JSON")
+    parser.add_argument("--limit", type=int, default=50, help="Violations printed per kind and facility")
+    args = parser.parse_args()
+    sys.exit(main(args.facility, args.strict, args.json, args.limit))
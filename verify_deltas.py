@@ -0,0 +1,134 @@
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+
+from config_diff import build_tree
+from delta_packages import (ASSETS_DIR, DELTAS_DIR, FACILITIES, apply_patch, assets_for, dumps_patch, load_index,
+                            load_snapshot, make_patch)
+
+# Checks that delta patches reproduce the new asset exactly:
+#
+#   1. Random edits of every src/assets config and links file (changed,
+#      added, removed, duplicated and reordered nodes at every level) are
+#      diffed, patched and compared with the edited document.
+#   2. The published chains in public/deltas lead to the current asset, and
+#      the snapshot of the current version is there to diff the next one
+#      against.
+#
+# Exits non-zero if any check fails.
+
+
+def _lists(doc):
+    """Every non-empty list of dicts inside ``doc`` (SEs, sections, standards, criteria, links)."""
+    found = []
+
+    def walk(value):
+        if isinstance(value, list):
+            if value and all(isinstance(v, dict) for v in value):
+                found.append(value)
+            for v in value:
+                walk(v)
+        elif isinstance(value, dict):
+            for v in value.values():
+                walk(v)
+
+    walk(doc)
+    return found
+
+
+def mutate(doc, rng: random.Random, edits: int):
+    doc = copy.deepcopy(doc)
+    for _ in range(edits):
+        lists = _lists(doc)
+        if not lists:
+            break
+        items = rng.choice(lists)
+        idx = rng.randrange(len(items))
+        action = rng.choice(["field", "field", "remove", "insert", "duplicate", "swap", "drop_field"])
+        if action == "field":
+            scalar = [k for k, v in items[idx].items() if not isinstance(v, list)]
+            key = rng.choice(scalar) if scalar else "note"
+            items[idx][key] = f"edited {rng.random():.6f}"
+        elif action == "drop_field":
+            scalar = [k for k, v in items[idx].items() if not isinstance(v, list)]
+            if len(scalar) > 1:
+                del items[idx][rng.choice(scalar[1:])]
+        elif action == "remove":
+            del items[idx]
+        elif action == "insert":
+            item = copy.deepcopy(items[idx])
+            for k, v in item.items():
+                if isinstance(v, str):
+                    item[k] = f"{v}-new{rng.randrange(10**6)}"
+                    break
+            items.insert(rng.randrange(len(items) + 1), item)
+        elif action == "duplicate":
+            items.insert(idx + 1, copy.deepcopy(items[idx]))
+            items[idx + 1][next(iter(items[idx + 1]))] = items[idx][next(iter(items[idx]))]
+        else:
+            j = rng.randrange(len(items))
+            items[idx], items[j] = items[j], items[idx]
+    return doc
+
+
+def check_mutations(asset: str, rounds: int, seed: int) -> int:
+    with open(os.path.join(ASSETS_DIR, asset), "r", encoding="utf-8") as f:
+        base = json.load(f)
+    full_size = len(json.dumps(base, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    rng = random.Random(f"{seed}:{asset}")
+    biggest = 0
+    for n in range(rounds):
+        old = mutate(base, rng, rng.randint(0, 3))
+        new = mutate(old, rng, rng.randint(0, 12))
+        patch = make_patch(old, new, asset)
+        result = apply_patch(old, patch)
+        if result != new or build_tree(result).hash != patch["to"]:
+            print(f"[VERIFY] {asset}: round {n} FAILED ({len(patch['ops'])} ops)")
+            return 1
+        biggest = max(biggest, len(dumps_patch(patch).encode("utf-8")))
+    print(f"[VERIFY] {asset}: {rounds} random edits OK (largest patch {biggest / 1024:.1f} KB, "
+          f"full asset {full_size / 1024:.0f} KB)")
+    return 0
+
+
+def check_published(asset: str) -> int:
+    index = load_index(asset)
+    if not index.get("current"):
+        return 0
+    with open(os.path.join(ASSETS_DIR, asset), "r", encoding="utf-8") as f:
+        current = build_tree(json.load(f)).hash
+    if index["current"] != current:
+        print(f"[VERIFY] {asset}: published {index['current']} but the asset is {current}; run delta_packages.py")
+        return 1
+    if load_snapshot(asset, current) is None:
+        print(f"[VERIFY] {asset}: no snapshot of the published version {current}; run delta_packages.py")
+        return 1
+    out_dir = os.path.join(DELTAS_DIR, os.path.splitext(asset)[0])
+    for start in index["patches"]:
+        seen, version = set(), start
+        while version != current:
+            step = index["patches"].get(version)
+            if step is None or version in seen or not os.path.exists(os.path.join(out_dir, step["file"])):
+                print(f"[VERIFY] {asset}: chain from {start} breaks at {version}")
+                return 1
+            seen.add(version)
+            version = step["to"]
+    print(f"[VERIFY] {asset}: {len(index['patches'])} published patches lead to {current}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify delta patches against random edits and the published chains.")
+    parser.add_argument("--facility", action="append", choices=FACILITIES, help="Facility to check (repeatable; default: all)")
+    parser.add_argument("--rounds", type=int, default=20, help="Random edit rounds per asset")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    failures = 0
+    for fac in args.facility or FACILITIES:
+        for asset in assets_for(fac):
+            failures += check_mutations(asset, args.rounds, args.seed)
+            failures += check_published(asset)
+    sys.exit(1 if failures else 0)
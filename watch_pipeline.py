@@ -0,0 +1,306 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+import sys
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+for _path in (ROOT_DIR, os.path.join(ROOT_DIR, "Matrix"), os.path.join(ROOT_DIR, "scripts")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+TEXT_SUBDIR = "extracted_text"
+WATCH_PATTERNS = ["Botswananhq_*", "Botswanahq_motuary", "Matrix"]
+
+# Per facility: where its standards live, which modules build it and which
+# matrix files feed its links. Paths are repo-relative, as in pipeline.py.
+FACILITIES = {
+    "hospital": {
+        "pdf_dir": "Botswananhq_hospital",
+        "generator": "generate_hospital_config_from_pdfs",
+        "outputs": ["src/assets/hospital_config.json", "hospital_config_utf8.json"],
+        "links_module": "extract_hospital_links",
+        "matrix_docx": "Matrix/Matrix-NHQS_Hospital_Version_2025.docx",
+        "matrix_text": "Matrix/hospital_matrix_text.txt",
+        "links_out": "src/assets/hospital_links.json",
+        "compute_source": "Matrix/hospital_compute_criteria_source.json",
+    },
+    "mortuary": {
+        "pdf_dir": "Botswanahq_motuary",
+        "generator": "generate_mortuary_config",
+        "outputs": ["src/assets/mortuary_config.json", "mortuary_config_utf8.json"],
+        "links_module": "extract_mortuary_links",
+        "matrix_text": "Matrix/mortuary_matrix_text.txt",
+        "links_out": "src/assets/mortuary_links.json",
+    },
+    "clinics": {
+        "pdf_dir": "Botswananhq_clinics",
+        "generator": "generate_clinics_config",
+        # Texts are extracted once by hand, as in pipeline.py; a PDF change
+        # only refreshes the SE names.
+        "extract": False,
+        "outputs": ["src/assets/clinics_config.json", "clinics_config_utf8.json"],
+        "links_module": "extract_clinics_links",
+        "matrix_text": "Matrix/clinics_matrix_text.txt",
+        "links_out": "src/assets/clinics_links.json",
+    },
+    "ems": {
+        "pdf_dir": "Botswananhq_ems",
+        "generator": "generate_ems_config_from_pdfs",
+        "outputs": ["src/assets/ems_config.json", "ems_config_utf8.json"],
+        "links_module": "extract_and_build",
+        "matrix_pdf": "Matrix/Matrix-NHQS-for-Emergency-Medical-Services-06.01.2026 (2).pdf",
+        "links_out": "src/assets/ems_links.json",
+        # Mutual-link breaking and -root tags, as pipeline.py's ems:hierarchy stage.
+        "hierarchy_module": "apply_correct_hierarchy",
+    },
+}
+
+
+# -----------------------
+# Change detection
+# -----------------------
+
+def snapshot(patterns: list[str] = WATCH_PATTERNS) -> dict[str, tuple[int, int]]:
+    """Map every watched file to ``(size, mtime_ns)``."""
+    files: dict[str, tuple[int, int]] = {}
+    for pattern in patterns:
+        for top in glob.glob(os.path.join(glob.escape(ROOT_DIR), pattern)):
+            if os.path.isfile(top):
+                candidates = [top]
+            else:
+                candidates = [os.path.join(d, name) for d, _, names in os.walk(top) for name in names]
+            for path in candidates:
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[os.path.relpath(path, ROOT_DIR).replace(os.sep, "/")] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def diff_snapshots(before: dict, after: dict) -> set[str]:
+    return {p for p in set(before) | set(after) if before.get(p) != after.get(p)}
+
+
+def classify(rel_path: str) -> list[tuple[str, str, object]]:
+    """Return the ``(facility, action, arg)`` work items a changed file triggers."""
+    items = []
+    for fac, spec in FACILITIES.items():
+        pdf_dir = spec["pdf_dir"]
+        if rel_path.startswith(pdf_dir + "/"):
+            rest = rel_path[len(pdf_dir) + 1 :]
+            if rest.lower().endswith(".pdf") and "/" not in rest:
+                if spec.get("extract", True):
+                    gen = importlib.import_module(spec["generator"])
+                    for se_id, path in gen.find_pdf_files(pdf_dir):
+                        if os.path.basename(path) == rest:
+                            items.append((fac, "extract", se_id))
+                # A renamed/new PDF also changes the SE name map.
+                items.append((fac, "config", None))
+            elif rest.startswith(TEXT_SUBDIR + "/se_") and rest.endswith(".txt"):
+                items.append((fac, "config", None))
+        elif rel_path == spec.get("matrix_docx"):
+            items.append((fac, "export", None))
+        elif rel_path in (spec.get("matrix_text"), spec.get("matrix_pdf"), spec.get("compute_source")):
+            items.append((fac, "links", None))
+    return items
+
+
+# -----------------------
+# In-process rebuilds
+# -----------------------
+
+def _valid_ids(config: dict) -> frozenset[str]:
+    return frozenset(
+        crit["id"]
+        for key, ses in config.items()
+        if key.endswith("_full_configuration")
+        for se in ses
+        for section in se.get("sections", [])
+        for standard in section.get("standards", [])
+        for crit in standard.get("criteria", [])
+        if crit.get("id")
+    )
+
+
+class Workspace:
+    """Keeps modules, configs and valid-ID sets warm between rebuilds."""
+
+    def __init__(self):
+        self.valid_ids: dict[str, frozenset[str]] = {}
+        # Files we rewrote ourselves, with the stat we left them in, so that
+        # the next poll does not treat our own output as an edit.
+        self.own_writes: dict[str, tuple[int, int]] = {}
+
+    def _remember(self, rel_path: str) -> None:
+        st = os.stat(os.path.join(ROOT_DIR, rel_path))
+        self.own_writes[rel_path] = (st.st_size, st.st_mtime_ns)
+
+    def ids_for(self, fac: str) -> frozenset[str]:
+        if fac not in self.valid_ids:
+            with open(os.path.join(ROOT_DIR, FACILITIES[fac]["outputs"][0]), "r", encoding="utf-8") as f:
+                self.valid_ids[fac] = _valid_ids(json.load(f))
+        return self.valid_ids[fac]
+
+    def extract(self, fac: str, se_ids: set[int]) -> None:
+        from extract_pdf_v2 import extract_to_file
+
+        spec = FACILITIES[fac]
+        gen = importlib.import_module(spec["generator"])
+        text_dir = os.path.join(spec["pdf_dir"], TEXT_SUBDIR)
+        os.makedirs(text_dir, exist_ok=True)
+        for se_id, pdf_path in gen.find_pdf_files(spec["pdf_dir"]):
+            if se_id not in se_ids:
+                continue
+            out_txt = os.path.join(text_dir, f"se_{se_id}.txt")
+            extract_to_file(pdf_path, start_page=1, end_page=999, output_path=out_txt)
+            self._remember(out_txt.replace(os.sep, "/"))
+            print(f"[WATCH] {fac}: re-extracted SE {se_id} -> {out_txt}")
+
+    def rebuild_config(self, fac: str) -> bool:
+        """Re-parse the facility texts; return True when the criterion IDs changed."""
+        spec = FACILITIES[fac]
+        gen = importlib.import_module(spec["generator"])
+
+        pdf_files = gen.find_pdf_files(spec["pdf_dir"])
+        text_dir = os.path.join(spec["pdf_dir"], TEXT_SUBDIR)
+        text_paths = [
+            os.path.join(text_dir, f"se_{se_id}.txt")
+            for se_id, _ in pdf_files
+            if os.path.exists(os.path.join(text_dir, f"se_{se_id}.txt"))
+        ]
+        config = gen.build_config(pdf_files, text_paths)
+
+        old_ids = self.valid_ids.get(fac)
+        self.valid_ids[fac] = new_ids = _valid_ids(config)
+        return old_ids is None or old_ids != new_ids
+
+    def rebuild_links(self, fac: str, from_docx: bool = False) -> None:
+        spec = FACILITIES[fac]
+        valid_ids = set(self.ids_for(fac))
+        if from_docx:
+            # Rows stream from the DOCX into the parser; the text copy is a by-product.
+            links_mod = importlib.import_module(spec["links_module"])
+            links = links_mod.extract_links_from_docx(spec["matrix_docx"], valid_ids, spec["matrix_text"])
+            self._remember(spec["matrix_text"])
+        elif spec.get("matrix_pdf"):
+            if not os.path.exists(spec["matrix_pdf"]):
+                print(f"[WATCH] {fac}: {spec['matrix_pdf']} not found; links left as they are")
+                return
+            links_mod = importlib.import_module(spec["links_module"])
+            links = links_mod.build_schema(links_mod.parse_pdf_columns(spec["matrix_pdf"], valid_ids), valid_ids)
+        else:
+            links_mod = importlib.import_module(spec["links_module"])
+            links = links_mod.parse_links(spec["matrix_text"], valid_ids)
+        if spec.get("hierarchy_module"):
+            links = importlib.import_module(spec["hierarchy_module"]).transform_links(links)
+        with open(spec["links_out"], "w", encoding="utf-8") as f:
+            json.dump(links, f, indent=4)
+        print(f"[WATCH] {fac}: wrote {spec['links_out']} ({len(links)} entries)")
+        if spec.get("compute_source"):
+            importlib.import_module("build_compute_criteria").generate(fac, links=links)
+
+    def validate(self, fac: str) -> None:
+        """Report links or compute-map codes that are not in the rebuilt config."""
+        validator = importlib.import_module("validate_assets")
+        start = time.perf_counter()
+        report = validator.validate_facility(fac)
+        validator.print_report(report, time.perf_counter() - start, limit=10)
+
+    def process(self, items: list[tuple[str, str, object]]) -> None:
+        """Run one debounced batch: extract -> config -> links per facility."""
+        plan: dict[str, dict] = {}
+        for fac, action, arg in items:
+            entry = plan.setdefault(fac, {"extract": set(), "actions": set()})
+            if action == "extract":
+                entry["extract"].add(arg)
+            entry["actions"].add(action)
+
+        for fac in sorted(plan):
+            entry = plan[fac]
+            actions = entry["actions"]
+            start = time.perf_counter()
+            try:
+                if entry["extract"]:
+                    self.extract(fac, entry["extract"])
+                needs_links = bool(actions & {"links", "export"})
+                if "config" in actions or entry["extract"]:
+                    if self.rebuild_config(fac):
+                        needs_links = True
+                    else:
+                        print(f"[WATCH] {fac}: criterion IDs unchanged; links are still valid")
+                if needs_links:
+                    self.rebuild_links(fac, from_docx="export" in actions)
+                self.validate(fac)
+            except Exception as e:  # keep watching after a bad save
+                print(f"[WATCH] {fac}: rebuild failed: {type(e).__name__}: {e}")
+                continue
+            print(f"[WATCH] {fac}: done in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def watch(facilities: list[str] | None = None, interval: float = 0.25, debounce: float = 0.3) -> None:
+    """Poll the standards folders and rebuild affected assets until interrupted.
+
+    Polling keeps this stdlib-only and works the same on network drives and
+    Windows shares, where inotify events are unreliable. A batch is processed
+    once no further change has been seen for ``debounce`` seconds, so a save
+    that touches several files (or an editor's write-and-rename) rebuilds once.
+    """
+    os.chdir(ROOT_DIR)
+    ws = Workspace()
+    for fac in facilities or FACILITIES:
+        try:
+            ws.ids_for(fac)
+        except FileNotFoundError:
+            pass
+    for name in ("extract_hospital_links", "extract_clinics_links", "extract_mortuary_links"):
+        importlib.import_module(name)
+
+    seen = snapshot()
+    pending: set[str] = set()
+    last_change = 0.0
+    print(f"[WATCH] Watching {len(seen)} files under {', '.join(WATCH_PATTERNS)} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot()
+            changed = {
+                p for p in diff_snapshots(seen, current) if ws.own_writes.get(p) is None or ws.own_writes[p] != current.get(p)
+            }
+            seen = current
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+                continue
+            if not pending or time.monotonic() - last_change < debounce:
+                continue
+
+            items = []
+            for path in sorted(pending):
+                for item in classify(path):
+                    if facilities is None or item[0] in facilities:
+                        items.append(item)
+                print(f"[WATCH] changed: {path}")
+            pending.clear()
+            ws.own_writes.clear()
+            if items:
+                ws.process(items)
+    except KeyboardInterrupt:
+        print("\n[WATCH] Stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild configs and links whenever their sources change.")
+    parser.add_argument("--facility", nargs="+", choices=sorted(FACILITIES))
+    parser.add_argument("--interval", type=float, default=0.25, help="Polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Quiet period before rebuilding")
+    args = parser.parse_args()
+    watch(args.facility, interval=args.interval, debounce=args.debounce)
+
+
+if __name__ == "__main__":
+    main()